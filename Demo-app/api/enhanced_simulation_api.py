@@ -38,7 +38,7 @@ def create_simulation():
             }), 400
         
         # Create cellular automaton engine
-        engine = CellularAutomatonEngine(grid_size=grid_size)
+        engine = CellularAutomatonEngine(grid_size=grid_size, device=data.get('device', 'cpu'))
         engine.initialize_from_terrain_grid(grid_classification)
         
         # Set initial environmental conditions
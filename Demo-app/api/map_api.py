@@ -7,12 +7,26 @@ from flask import Blueprint, request, jsonify
 from services.terrain_service import TerrainExtractor
 from services.visualization_service import VisualizationService
 import numpy as np
+import asyncio
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
 
 map_bp = Blueprint('map', __name__)
 
+_async_loop = None
+_async_loop_lock = threading.Lock()
+
+def _run_async(coro):
+    """Run a coroutine on the shared background event loop, so pooled HTTP sessions outlive a request"""
+    global _async_loop
+    with _async_loop_lock:
+        if _async_loop is None:
+            _async_loop = asyncio.new_event_loop()
+            threading.Thread(target=_async_loop.run_forever, name='map-api-loop', daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _async_loop).result()
+
 @map_bp.route('/select-area', methods=['POST'])
 def select_area():
     """Handle map area selection from coordinates"""
@@ -36,25 +50,17 @@ def select_area():
         
         # Import here to avoid circular imports
         from services.vector_tile_service import VectorTileClassifier
-        import asyncio
         
         # Create classifier and run async classification to get 2D cell grid
         logger.info("Creating VectorTileClassifier...")
         classifier = VectorTileClassifier()
         
-        # Run the async function in a new event loop
-        logger.info("Starting async grid classification...")
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            logger.info("Running classify_grid_area...")
-            grid_classification = loop.run_until_complete(
-                classifier.classify_grid_area(lat, lon, grid_size, cell_size_degrees)
-            )
-            logger.info(f"Grid classification completed. Grid size: {len(grid_classification)}x{len(grid_classification[0])}")
-        finally:
-            loop.close()
-            logger.info("Event loop closed")
+        # Run the async function on the shared event loop
+        logger.info("Running classify_grid_arrays...")
+        grid = _run_async(
+            classifier.classify_grid_arrays(lat, lon, grid_size, cell_size_degrees)
+        )
+        logger.info(f"Grid classification completed. Grid shape: {grid['terrain_id'].shape}")
         
         # Calculate grid bounds
         half_lat = (cell_size_degrees * grid_size) / 2
@@ -69,7 +75,8 @@ def select_area():
         
         # Calculate statistics
         logger.info("Calculating statistics...")
-        terrain_counts = classifier.get_terrain_statistics(grid_classification)
+        terrain_counts = classifier.get_terrain_statistics(grid)
+        grid_classification = classifier.grid_to_cells(grid)
         total_cells = grid_size * grid_size
         
         # Convert to percentages
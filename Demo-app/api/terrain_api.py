@@ -13,6 +13,7 @@ import tempfile
 import uuid
 import asyncio
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -195,24 +196,23 @@ def classify_grid():
         asyncio.set_event_loop(loop)
         try:
             logger.info("Running classify_grid_area...")
-            grid_classification = loop.run_until_complete(
-                classifier.classify_grid_area(lat, lon, grid_size, cell_size)
+            grid = loop.run_until_complete(
+                classifier.classify_grid_arrays(lat, lon, grid_size, cell_size)
             )
-            logger.info(f"Grid classification completed. Result type: {type(grid_classification)}")
-            logger.info(f"Grid classification length: {len(grid_classification) if grid_classification else 'None'}")
+            logger.info(f"Grid classification completed. Grid shape: {grid['terrain_id'].shape}")
         finally:
             loop.close()
             logger.info("Event loop closed")
         
         # Calculate statistics
         logger.info("Calculating statistics...")
-        terrain_counts = {}
         total_cells = grid_size * grid_size
-        
-        for row in grid_classification:
-            for cell in row:
-                terrain_type = cell['terrain_type']
-                terrain_counts[terrain_type] = terrain_counts.get(terrain_type, 0) + 1
+        counts = np.bincount(grid['terrain_id'].ravel(), minlength=len(grid['names']))
+        terrain_counts = {
+            terrain: int(count)
+            for terrain, count in zip(grid['names'].tolist(), counts.tolist()) if count
+        }
+        grid_classification = classifier.grid_to_cells(grid)
         
         # Convert to percentages
         terrain_percentages = {
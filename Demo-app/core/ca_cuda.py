@@ -0,0 +1,187 @@
+"""
+Optional CUDA backend for the cellular automaton fire engine
+Runs one thread per cell with a shared-memory tile holding the neighborhood
+"""
+
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import cuda, float64
+    from numba.cuda.random import create_xoroshiro128p_states, xoroshiro128p_uniform_float32
+    NUMBA_CUDA_IMPORTED = True
+except ImportError:
+    NUMBA_CUDA_IMPORTED = False
+
+# Burn state codes, matching the order of _BURN_STATES in cellular_automata_engine
+UNBURNED = 0
+BURNING = 1
+BURNED = 2
+NUM_STATES = 4
+
+TILE = 16                # Threads per block along each axis
+HALO_TILE = TILE + 2     # Shared tile including the one-cell halo
+
+def cuda_available() -> bool:
+    """Check whether numba.cuda is installed and a CUDA device is present"""
+    return NUMBA_CUDA_IMPORTED and cuda.is_available()
+
+if NUMBA_CUDA_IMPORTED:
+
+    @cuda.jit
+    def _step_kernel(state, next_state, intensity, next_intensity, duration, moisture,
+                     fuel_load, temperature, terrain_id, max_burn, spread_prob, fuel_rate,
+                     heat_gen, moisture_loss, offsets, wind_effects, env_factor,
+                     ambient_temperature, rng_states, counters):
+        """Advance every cell by one tick, writing state/intensity into the next buffers"""
+        n = state.shape[0]
+        tile = cuda.shared.array((HALO_TILE, HALO_TILE), dtype=float64)
+
+        tx = cuda.threadIdx.x
+        ty = cuda.threadIdx.y
+        row0 = cuda.blockIdx.y * TILE - 1
+        col0 = cuda.blockIdx.x * TILE - 1
+
+        # Cooperatively load burning source intensities for the tile plus halo
+        for i in range(ty * TILE + tx, HALO_TILE * HALO_TILE, TILE * TILE):
+            r = row0 + i // HALO_TILE
+            c = col0 + i % HALO_TILE
+            value = 0.0
+            if 0 <= r < n and 0 <= c < n and state[r, c] == BURNING:
+                value = intensity[r, c]
+            tile[i // HALO_TILE, i % HALO_TILE] = value
+        cuda.syncthreads()
+
+        row = row0 + 1 + ty
+        col = col0 + 1 + tx
+        if row >= n or col >= n:
+            return
+
+        s = state[row, col]
+        t = terrain_id[row, col]
+        new_state = s
+        new_intensity = intensity[row, col]
+
+        if s == BURNING:
+            b = intensity[row, col]
+            fuel = max(0.0, fuel_load[row, col] - fuel_rate[t] * b)
+            fuel_load[row, col] = fuel
+            temperature[row, col] = min(1000.0, temperature[row, col] + heat_gen[t] * b * 50)
+            moisture[row, col] = max(0.0, moisture[row, col] - moisture_loss[t] * b)
+            d = duration[row, col] + 1
+            duration[row, col] = d
+            cuda.atomic.add(counters, 0, 1)
+
+            if d >= max_burn[t] or fuel <= 0.1:
+                new_state = BURNED
+                new_intensity = 0.0
+                temperature[row, col] = ambient_temperature
+
+        elif s == UNBURNED and fuel_load[row, col] > 0:
+            target_factor = (spread_prob[t] * (1.0 - moisture[row, col]) *
+                             fuel_load[row, col] * env_factor)
+            survival = 1.0
+            max_source = 0.0
+            for k in range(offsets.shape[0]):
+                # Source cell sits at (row - dr, col - dc)
+                source = tile[ty + 1 - offsets[k, 0], tx + 1 - offsets[k, 1]]
+                p = min(1.0, max(0.0, target_factor * source * wind_effects[k]))
+                survival *= 1.0 - p
+                max_source = max(max_source, source)
+
+            if xoroshiro128p_uniform_float32(rng_states, row * n + col) < 1.0 - survival:
+                new_state = BURNING
+                new_intensity = min(1.0, max_source * 0.8)
+                duration[row, col] = 1
+                cuda.atomic.add(counters, 1, 1)
+
+        next_state[row, col] = new_state
+        next_intensity[row, col] = new_intensity
+
+    @cuda.jit
+    def _count_states_kernel(state, counts):
+        """Histogram of burn states"""
+        row, col = cuda.grid(2)
+        if row < state.shape[0] and col < state.shape[1]:
+            cuda.atomic.add(counts, state[row, col], 1)
+
+    @cuda.reduce
+    def _sum_reduce(a, b):
+        return a + b
+
+class CudaStepper:
+    """Device-resident copy of the engine arrays and the CUDA step kernel"""
+
+    def __init__(self, grid_size: int, seed: int = None):
+        self.grid_size = grid_size
+        blocks = (grid_size + TILE - 1) // TILE
+        self.blocks_per_grid = (blocks, blocks)
+        self.threads_per_block = (TILE, TILE)
+
+        if seed is None:
+            seed = int(np.random.default_rng().integers(0, 2**63 - 1))
+        self.rng_states = create_xoroshiro128p_states(grid_size * grid_size, seed=seed)
+        self.counters = cuda.device_array(2, dtype=np.int64)
+
+    def upload(self, engine):
+        """Copy the engine's host arrays and terrain LUTs to the device"""
+        self.state = cuda.to_device(engine.burn_state)
+        self.next_state = cuda.device_array_like(self.state)
+        self.intensity = cuda.to_device(engine.burn_intensity)
+        self.next_intensity = cuda.device_array_like(self.intensity)
+        self.duration = cuda.to_device(engine.burn_duration)
+        self.moisture = cuda.to_device(engine.moisture)
+        self.fuel_load = cuda.to_device(engine.fuel_load)
+        self.temperature = cuda.to_device(engine.temperature)
+        self.terrain_id = cuda.to_device(engine.terrain_id)
+
+        self.max_burn = cuda.to_device(engine._max_burn_lut)
+        self.spread_prob = cuda.to_device(engine._spread_prob_lut)
+        self.fuel_rate = cuda.to_device(engine._fuel_rate_lut)
+        self.heat_gen = cuda.to_device(engine._heat_gen_lut)
+        self.moisture_loss = cuda.to_device(engine._moisture_loss_lut)
+
+    def download(self, engine):
+        """Copy the device state back into the engine's host arrays"""
+        self.state.copy_to_host(engine.burn_state)
+        self.intensity.copy_to_host(engine.burn_intensity)
+        self.duration.copy_to_host(engine.burn_duration)
+        self.moisture.copy_to_host(engine.moisture)
+        self.fuel_load.copy_to_host(engine.fuel_load)
+        self.temperature.copy_to_host(engine.temperature)
+
+    def step(self, offsets: np.ndarray, wind_effects: np.ndarray,
+             env_factor: float, ambient_temperature: float):
+        """Run one tick on the device, returns (burning_count, newly_ignited_count)"""
+        self.counters.copy_to_device(np.zeros(2, dtype=np.int64))
+
+        _step_kernel[self.blocks_per_grid, self.threads_per_block](
+            self.state, self.next_state, self.intensity, self.next_intensity,
+            self.duration, self.moisture, self.fuel_load, self.temperature,
+            self.terrain_id, self.max_burn, self.spread_prob, self.fuel_rate,
+            self.heat_gen, self.moisture_loss, cuda.to_device(offsets),
+            cuda.to_device(wind_effects), env_factor, ambient_temperature,
+            self.rng_states, self.counters
+        )
+
+        # Swap the ping-pong buffers
+        self.state, self.next_state = self.next_state, self.state
+        self.intensity, self.next_intensity = self.next_intensity, self.intensity
+
+        burning_count, newly_ignited = self.counters.copy_to_host()
+        return int(burning_count), int(newly_ignited)
+
+    def totals(self):
+        """Return (state_counts, intensity_sum, temperature_sum, fuel_sum) computed on the device"""
+        counts = cuda.to_device(np.zeros(NUM_STATES, dtype=np.int64))
+        _count_states_kernel[self.blocks_per_grid, self.threads_per_block](self.state, counts)
+
+        # Intensity is zero everywhere except burning cells
+        return (
+            counts.copy_to_host(),
+            float(_sum_reduce(self.intensity.ravel())),
+            float(_sum_reduce(self.temperature.ravel())),
+            float(_sum_reduce(self.fuel_load.ravel()))
+        )
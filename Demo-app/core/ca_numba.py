@@ -0,0 +1,91 @@
+"""
+Numba CPU kernel for the cellular automaton fire engine
+Kernels are generated per neighborhood so the offsets are compile-time constants
+"""
+
+import functools
+import logging
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Burn state codes, matching the order of _BURN_STATES in cellular_automata_engine
+UNBURNED = 0
+BURNING = 1
+BURNED = 2
+
+@functools.lru_cache(maxsize=None)
+def make_step_kernel(offsets: Tuple[Tuple[int, int], ...]):
+    """
+    Build a step kernel specialized for a fixed neighborhood.
+
+    The offsets are baked into the compiled function as literals, so LLVM can
+    fully unroll the neighbor loop. Kernels are memoized per neighborhood.
+    uniforms holds one [0, 1) draw per cell, taken from the engine's seeded generator.
+    """
+    offsets = tuple((int(dr), int(dc)) for dr, dc in offsets)
+    num_offsets = len(offsets)
+
+    @njit(fastmath=True)
+    def step_kernel(state, next_state, intensity, next_intensity, duration, moisture,
+                    fuel_load, temperature, terrain_id, max_burn, spread_prob, fuel_rate,
+                    heat_gen, moisture_loss, wind_effects, env_factor, ambient_temperature, uniforms):
+        n = state.shape[0]
+        burning_count = 0
+        newly_ignited = 0
+
+        for row in range(n):
+            for col in range(n):
+                s = state[row, col]
+                t = terrain_id[row, col]
+                new_state = s
+                new_intensity = intensity[row, col]
+
+                if s == BURNING:
+                    b = intensity[row, col]
+                    fuel = max(0.0, fuel_load[row, col] - fuel_rate[t] * b)
+                    fuel_load[row, col] = fuel
+                    temperature[row, col] = min(1000.0, temperature[row, col] + heat_gen[t] * b * 50)
+                    moisture[row, col] = max(0.0, moisture[row, col] - moisture_loss[t] * b)
+                    d = duration[row, col] + 1
+                    duration[row, col] = d
+                    burning_count += 1
+
+                    if d >= max_burn[t] or fuel <= 0.1:
+                        new_state = BURNED
+                        new_intensity = 0.0
+                        temperature[row, col] = ambient_temperature
+
+                elif s == UNBURNED and fuel_load[row, col] > 0:
+                    target_factor = (spread_prob[t] * (1.0 - moisture[row, col]) *
+                                     fuel_load[row, col] * env_factor)
+                    survival = 1.0
+                    max_source = 0.0
+                    for k in range(num_offsets):
+                        # Source cell sits at (row - dr, col - dc)
+                        sr = row - offsets[k][0]
+                        sc = col - offsets[k][1]
+                        if 0 <= sr < n and 0 <= sc < n and state[sr, sc] == BURNING:
+                            source = intensity[sr, sc]
+                            p = min(1.0, max(0.0, target_factor * source * wind_effects[k]))
+                            survival *= 1.0 - p
+                            max_source = max(max_source, source)
+
+                    if survival < 1.0 and uniforms[row, col] < 1.0 - survival:
+                        new_state = BURNING
+                        new_intensity = min(1.0, max_source * 0.8)
+                        duration[row, col] = 1
+                        newly_ignited += 1
+
+                next_state[row, col] = new_state
+                next_intensity[row, col] = new_intensity
+
+        return burning_count, newly_ignited
+
+    return step_kernel
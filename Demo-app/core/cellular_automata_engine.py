@@ -4,13 +4,14 @@ Works with OSM-based terrain classification and realistic fire spread properties
 """
 
 import numpy as np
-import random
 import math
 from typing import List, Dict, Tuple, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 import logging
 
+from core import ca_cuda, ca_numba
+
 logger = logging.getLogger(__name__)
 
 class BurnState(Enum):
@@ -51,16 +52,31 @@ class CellState:
     moisture: float = 0.5        # 0.0 - 1.0
     fuel_load: float = 1.0       # Remaining combustible material
     temperature: float = 20.0    # Cell temperature
-    
+
+# Integer codes used for the per-cell burn state array
+_BURN_STATES = (BurnState.UNBURNED, BurnState.BURNING, BurnState.BURNED, BurnState.ASH)
+_STATE_CODES = {state: code for code, state in enumerate(_BURN_STATES)}
+
 class CellularAutomatonEngine:
     """Enhanced cellular automaton engine for fire simulation"""
     
-    def __init__(self, grid_size: int = 50):
+    def __init__(self, grid_size: int = 50, device: str = 'cpu', seed: Optional[int] = None):
         self.grid_size = grid_size
-        self.grid: List[List[CellState]] = []
+        self.terrain_types: List[str] = []
         self.tick_count = 0
         self.conditions = EnvironmentalConditions()
         
+        # Optional CUDA backend; host arrays are synced lazily in both directions
+        self.device = 'cpu'
+        if device == 'cuda':
+            if ca_cuda.cuda_available():
+                self.device = 'cuda'
+            else:
+                logger.warning("CUDA device not available, falling back to CPU engine")
+        self._cuda: Optional[ca_cuda.CudaStepper] = None
+        self._host_stale = False
+        self._device_stale = False
+        
         # Neighborhood patterns
         self.moore_neighbors = [
             (-1, -1), (-1, 0), (-1, 1),
@@ -75,6 +91,8 @@ class CellularAutomatonEngine:
         # Use Moore neighborhood by default
         self.neighborhood = self.moore_neighbors
         
+        self.rng = np.random.default_rng(seed)
+        
         # Fire spread parameters by terrain type
         self.terrain_fire_params = {
             'forest': {
@@ -146,64 +164,111 @@ class CellularAutomatonEngine:
         """Initialize the cellular automaton from terrain classification data"""
         logger.info(f"Initializing {self.grid_size}x{self.grid_size} fire simulation grid")
         
-        self.grid = []
+        shape = (self.grid_size, self.grid_size)
+        
+        # Per-cell state is stored as parallel arrays (structure of arrays)
+        self.terrain_types: List[str] = []
+        terrain_index: Dict[str, int] = {}
+        self.terrain_id = np.zeros(shape, dtype=np.uint8)
+        self.burn_state = np.full(shape, _STATE_CODES[BurnState.UNBURNED], dtype=np.uint8)
+        self.burn_intensity = np.zeros(shape, dtype=np.float64)
+        self.burn_duration = np.zeros(shape, dtype=np.int32)
+        self.moisture = np.zeros(shape, dtype=np.float64)
+        self.fuel_load = np.ones(shape, dtype=np.float64)
+        self.temperature = np.full(shape, self.conditions.temperature, dtype=np.float64)
+        
+        # Second buffers so compiled kernels can update all cells simultaneously
+        self._next_burn_state = np.empty_like(self.burn_state)
+        self._next_burn_intensity = np.empty_like(self.burn_intensity)
+        
         for row in range(self.grid_size):
-            grid_row = []
             for col in range(self.grid_size):
                 terrain_data = terrain_grid[row][col]
                 terrain_type = terrain_data['terrain_type']
                 properties = terrain_data.get('properties', {})
                 
-                # Initialize cell state
-                cell = CellState(
-                    terrain_type=terrain_type,
-                    burn_state=BurnState.UNBURNED,
-                    burn_intensity=0.0,
-                    burn_duration=0,
-                    moisture=properties.get('moisture_retention', 0.5),
-                    fuel_load=1.0,
-                    temperature=self.conditions.temperature
-                )
+                if terrain_type not in terrain_index:
+                    terrain_index[terrain_type] = len(self.terrain_types)
+                    self.terrain_types.append(terrain_type)
                 
-                grid_row.append(cell)
-            self.grid.append(grid_row)
+                self.terrain_id[row, col] = terrain_index[terrain_type]
+                self.moisture[row, col] = properties.get('moisture_retention', 0.5)
+        
+        self._build_terrain_luts()
+        
+        if self.device == 'cuda':
+            self._cuda = ca_cuda.CudaStepper(self.grid_size, seed=int(self.rng.integers(0, 2**63 - 1)))
+            self._host_stale = False
+            self._device_stale = True
         
         logger.info("Fire simulation grid initialized")
     
+    def _build_terrain_luts(self):
+        """Build per-terrain parameter lookup tables indexed by terrain id"""
+        params = [
+            self.terrain_fire_params.get(terrain_type, self.terrain_fire_params['grass'])
+            for terrain_type in self.terrain_types
+        ]
+        
+        self._max_burn_lut = np.array([p['max_burn_duration'] for p in params], dtype=np.int32)
+        self._spread_prob_lut = np.array([p['spread_probability'] for p in params], dtype=np.float64)
+        self._fuel_rate_lut = np.array([p['fuel_consumption_rate'] for p in params], dtype=np.float64)
+        self._heat_gen_lut = np.array([p['heat_generation'] for p in params], dtype=np.float64)
+        self._moisture_loss_lut = np.array([p['moisture_loss_rate'] for p in params], dtype=np.float64)
+    
+    def _sync_host(self):
+        """Pull the latest cell arrays back from the CUDA device if they are newer"""
+        if self._cuda is not None and self._host_stale:
+            self._cuda.download(self)
+            self._host_stale = False
+    
+    def _sync_device(self):
+        """Push host-side modifications to the CUDA device"""
+        if self._cuda is not None and self._device_stale:
+            self._cuda.upload(self)
+            self._device_stale = False
+    
     def ignite_cell(self, row: int, col: int, intensity: float = 1.0) -> bool:
         """Ignite a specific cell if possible"""
         if not self._is_valid_position(row, col):
             return False
         
-        cell = self.grid[row][col]
+        self._sync_host()
         
         # Can only ignite unburned cells with fuel
-        if cell.burn_state == BurnState.UNBURNED and cell.fuel_load > 0:
+        if (self.burn_state[row, col] == _STATE_CODES[BurnState.UNBURNED] and
+                self.fuel_load[row, col] > 0):
             # Check if ignition is possible based on moisture and terrain
-            ignition_threshold = cell.moisture * 0.8
+            ignition_threshold = self.moisture[row, col] * 0.8
             
             if intensity > ignition_threshold:
-                cell.burn_state = BurnState.BURNING
-                cell.burn_intensity = min(1.0, intensity)
-                cell.burn_duration = 1
-                logger.info(f"Ignited cell at ({row}, {col}) - {cell.terrain_type}")
+                self.burn_state[row, col] = _STATE_CODES[BurnState.BURNING]
+                self.burn_intensity[row, col] = min(1.0, intensity)
+                self.burn_duration[row, col] = 1
+                self._device_stale = True
+                terrain_type = self.terrain_types[self.terrain_id[row, col]]
+                logger.info(f"Ignited cell at ({row}, {col}) - {terrain_type}")
                 return True
         
         return False
     
+    def get_cell(self, row: int, col: int) -> CellState:
+        """Get a snapshot of a single cell's state"""
+        self._sync_host()
+        return CellState(
+            terrain_type=self.terrain_types[self.terrain_id[row, col]],
+            burn_state=_BURN_STATES[self.burn_state[row, col]],
+            burn_intensity=float(self.burn_intensity[row, col]),
+            burn_duration=int(self.burn_duration[row, col]),
+            moisture=float(self.moisture[row, col]),
+            fuel_load=float(self.fuel_load[row, col]),
+            temperature=float(self.temperature[row, col])
+        )
+    
     def _is_valid_position(self, row: int, col: int) -> bool:
         """Check if position is within grid bounds"""
         return 0 <= row < self.grid_size and 0 <= col < self.grid_size
     
-    def _get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get valid neighbor positions"""
-        neighbors = []
-        for dr, dc in self.neighborhood:
-            new_row, new_col = row + dr, col + dc
-            if self._is_valid_position(new_row, new_col):
-                neighbors.append((new_row, new_col))
-        return neighbors
-    
     def _calculate_wind_effect(self, from_row: int, from_col: int, 
                              to_row: int, to_col: int) -> float:
         """Calculate wind effect on fire spread between two cells"""
@@ -238,188 +303,202 @@ class CellularAutomatonEngine:
         wind_effect = 1.0 + (alignment * wind_factor * 0.5)
         return max(0.1, wind_effect)  # Minimum 10% chance even against wind
     
-    def _calculate_spread_probability(self, source_cell: CellState, 
-                                    target_cell: CellState,
-                                    source_row: int, source_col: int,
-                                    target_row: int, target_col: int) -> float:
-        """Calculate probability of fire spreading from source to target cell"""
-        
-        if target_cell.burn_state != BurnState.UNBURNED or target_cell.fuel_load <= 0:
-            return 0.0
-        
-        # Base spread probability from terrain
-        terrain_params = self.terrain_fire_params.get(
-            target_cell.terrain_type, 
-            self.terrain_fire_params['grass']
-        )
-        base_prob = terrain_params['spread_probability']
-        
-        # Modify by source intensity
-        intensity_factor = source_cell.burn_intensity
-        
-        # Modify by target moisture (dry = easier to ignite)
-        moisture_factor = 1.0 - target_cell.moisture
-        
-        # Modify by fuel load
-        fuel_factor = target_cell.fuel_load
-        
-        # Environmental factors
+    def _calculate_environment_factor(self) -> float:
+        """Combined temperature, humidity and rain multiplier for fire spread"""
         temp_factor = 1.0 + (self.conditions.temperature - 20) * 0.02  # 2% per degree above 20C
         humidity_factor = 1.0 - (self.conditions.humidity - 50) * 0.01  # 1% per % humidity above 50%
         rain_factor = 1.0 - self.conditions.rain_probability * 0.8  # Rain greatly reduces spread
+        return temp_factor * humidity_factor * rain_factor
+    
+    def _update_burning_cells(self, burning: np.ndarray) -> np.ndarray:
+        """
+        Consume fuel, heat up and dry out all burning cells in one fused pass.
         
-        # Wind effect
-        wind_effect = self._calculate_wind_effect(source_row, source_col, target_row, target_col)
+        Returns the mask of burning cells that have burned out this step.
+        """
+        tid = self.terrain_id
+        intensity_b = self.burn_intensity * burning
         
-        # Combine all factors
-        total_probability = (base_prob * intensity_factor * moisture_factor * 
-                           fuel_factor * temp_factor * humidity_factor * 
-                           rain_factor * wind_effect)
+        self.fuel_load -= self._fuel_rate_lut[tid] * intensity_b
+        np.clip(self.fuel_load, 0.0, None, out=self.fuel_load)
         
-        return min(1.0, max(0.0, total_probability))
-    
-    def _update_burning_cell(self, cell: CellState, row: int, col: int) -> List[Tuple[int, int]]:
-        """Update a burning cell and return list of newly ignited neighbors"""
-        terrain_params = self.terrain_fire_params.get(
-            cell.terrain_type, 
-            self.terrain_fire_params['grass']
-        )
+        self.temperature += self._heat_gen_lut[tid] * intensity_b * 50
+        np.minimum(self.temperature, 1000, out=self.temperature)
         
-        newly_burning = []
+        self.moisture -= self._moisture_loss_lut[tid] * intensity_b
+        np.clip(self.moisture, 0.0, None, out=self.moisture)
         
-        # Consume fuel
-        fuel_consumption = terrain_params['fuel_consumption_rate'] * cell.burn_intensity
-        cell.fuel_load = max(0.0, cell.fuel_load - fuel_consumption)
+        self.burn_duration += burning
         
-        # Increase temperature
-        heat_gen = terrain_params['heat_generation'] * cell.burn_intensity
-        cell.temperature = min(1000, cell.temperature + heat_gen * 50)
+        return burning & ((self.burn_duration >= self._max_burn_lut[tid]) | (self.fuel_load <= 0.1))
+    
+    def _spread_fire(self, burning: np.ndarray) -> np.ndarray:
+        """Spread fire from burning cells to their neighbors, returns newly ignited mask"""
+        n = self.grid_size
         
-        # Reduce moisture from heat
-        moisture_loss = terrain_params['moisture_loss_rate'] * cell.burn_intensity
-        cell.moisture = max(0.0, cell.moisture - moisture_loss)
+        # Target-side factors are shared by every direction
+        susceptible = (self.burn_state == _STATE_CODES[BurnState.UNBURNED]) & (self.fuel_load > 0)
+        target_factor = (self._spread_prob_lut[self.terrain_id] * (1.0 - self.moisture) *
+                         self.fuel_load * self._calculate_environment_factor())
+        target_factor[~susceptible] = 0.0
         
-        # Increment burn duration
-        cell.burn_duration += 1
+        source_intensity = self.burn_intensity * burning
+        survival = np.ones((n, n), dtype=np.float64)
+        max_source_intensity = np.zeros((n, n), dtype=np.float64)
+        shifted = np.empty((n, n), dtype=np.float64)
         
-        # Try to spread to neighbors
-        neighbors = self._get_neighbors(row, col)
-        for neighbor_row, neighbor_col in neighbors:
-            neighbor_cell = self.grid[neighbor_row][neighbor_col]
-            
-            spread_prob = self._calculate_spread_probability(
-                cell, neighbor_cell, row, col, neighbor_row, neighbor_col
-            )
+        for dr, dc in self.neighborhood:
+            # shifted[r, c] holds the intensity of the source cell at (r - dr, c - dc)
+            shifted.fill(0.0)
+            shifted[max(0, dr):n + min(0, dr), max(0, dc):n + min(0, dc)] = \
+                source_intensity[max(0, -dr):n + min(0, -dr), max(0, -dc):n + min(0, -dc)]
             
-            if random.random() < spread_prob:
-                neighbor_cell.burn_state = BurnState.BURNING
-                neighbor_cell.burn_intensity = min(1.0, cell.burn_intensity * 0.8)
-                neighbor_cell.burn_duration = 1
-                newly_burning.append((neighbor_row, neighbor_col))
-        
-        # Check if cell should burn out
-        max_duration = terrain_params['max_burn_duration']
-        if cell.burn_duration >= max_duration or cell.fuel_load <= 0.1:
-            cell.burn_state = BurnState.BURNED
-            cell.burn_intensity = 0.0
-            cell.temperature = self.conditions.temperature  # Cool down
-        
-        return newly_burning
+            wind_effect = self._calculate_wind_effect(0, 0, dr, dc)
+            spread_prob = np.clip(target_factor * shifted * wind_effect, 0.0, 1.0)
+            survival *= 1.0 - spread_prob
+            np.maximum(max_source_intensity, shifted, out=max_source_intensity)
+        
+        ignited = susceptible & (self.rng.random((n, n)) < 1.0 - survival)
+        
+        self.burn_state[ignited] = _STATE_CODES[BurnState.BURNING]
+        self.burn_intensity[ignited] = np.minimum(1.0, max_source_intensity[ignited] * 0.8)
+        self.burn_duration[ignited] = 1
+        
+        return ignited
     
     def step(self) -> Dict[str, Any]:
         """Execute one simulation step"""
         self.tick_count += 1
         
-        # Find all currently burning cells
-        burning_cells = []
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                if self.grid[row][col].burn_state == BurnState.BURNING:
-                    burning_cells.append((row, col))
-        
-        # Update all burning cells
-        newly_ignited = []
-        for row, col in burning_cells:
-            cell = self.grid[row][col]
-            new_fires = self._update_burning_cell(cell, row, col)
-            newly_ignited.extend(new_fires)
+        if self._cuda is not None:
+            burning_count, newly_ignited_count = self._step_cuda()
+        elif ca_numba.NUMBA_AVAILABLE:
+            burning_count, newly_ignited_count = self._step_numba()
+        else:
+            # Find all currently burning cells
+            burning = self.burn_state == _STATE_CODES[BurnState.BURNING]
+            burning_count = int(np.count_nonzero(burning))
+            
+            # Update all burning cells, then let them spread before burning out
+            burnout = self._update_burning_cells(burning)
+            newly_ignited = self._spread_fire(burning)
+            
+            self.burn_state[burnout] = _STATE_CODES[BurnState.BURNED]
+            self.burn_intensity[burnout] = 0.0
+            self.temperature[burnout] = self.conditions.temperature  # Cool down
+            
+            newly_ignited_count = int(np.count_nonzero(newly_ignited))
         
         # Calculate statistics
         stats = self._calculate_statistics()
         
-        logger.info(f"Simulation step {self.tick_count}: {len(burning_cells)} burning, "
-                   f"{len(newly_ignited)} newly ignited, "
+        logger.info(f"Simulation step {self.tick_count}: {burning_count} burning, "
+                   f"{newly_ignited_count} newly ignited, "
                    f"{stats['total_burned']} total burned")
         
         return {
             'tick': self.tick_count,
-            'burning_cells': len(burning_cells),
-            'newly_ignited': len(newly_ignited),
+            'burning_cells': burning_count,
+            'newly_ignited': newly_ignited_count,
             'statistics': stats,
-            'is_active': len(burning_cells) > 0
+            'is_active': burning_count > 0
         }
     
+    def _neighborhood_wind_effects(self) -> np.ndarray:
+        """Wind effect for each neighborhood offset under the current conditions"""
+        return np.array([self._calculate_wind_effect(0, 0, dr, dc)
+                         for dr, dc in self.neighborhood], dtype=np.float64)
+    
+    def _step_numba(self) -> Tuple[int, int]:
+        """Run one step with the compiled CPU kernel, returns (burning_count, newly_ignited_count)"""
+        # Kernels are specialized (and memoized) per neighborhood
+        kernel = ca_numba.make_step_kernel(tuple(self.neighborhood))
+        
+        counts = kernel(
+            self.burn_state, self._next_burn_state,
+            self.burn_intensity, self._next_burn_intensity,
+            self.burn_duration, self.moisture, self.fuel_load, self.temperature,
+            self.terrain_id, self._max_burn_lut, self._spread_prob_lut,
+            self._fuel_rate_lut, self._heat_gen_lut, self._moisture_loss_lut,
+            self._neighborhood_wind_effects(), self._calculate_environment_factor(),
+            float(self.conditions.temperature),
+            self.rng.random(self.burn_state.shape)
+        )
+        
+        self.burn_state, self._next_burn_state = self._next_burn_state, self.burn_state
+        self.burn_intensity, self._next_burn_intensity = self._next_burn_intensity, self.burn_intensity
+        return counts
+    
+    def _step_cuda(self) -> Tuple[int, int]:
+        """Run one step on the CUDA device, returns (burning_count, newly_ignited_count)"""
+        self._sync_device()
+        
+        offsets = np.array(self.neighborhood, dtype=np.int64)
+        wind_effects = self._neighborhood_wind_effects()
+        
+        counts = self._cuda.step(offsets, wind_effects,
+                                 self._calculate_environment_factor(),
+                                 self.conditions.temperature)
+        self._host_stale = True
+        return counts
+    
     def _calculate_statistics(self) -> Dict[str, Any]:
         """Calculate simulation statistics"""
+        if self._cuda is not None and self._host_stale:
+            counts, intensity_sum, temperature_sum, fuel_sum = self._cuda.totals()
+        else:
+            counts = np.bincount(self.burn_state.ravel(), minlength=len(_BURN_STATES))
+            # Intensity is zero everywhere except burning cells
+            intensity_sum = float(self.burn_intensity.sum())
+            temperature_sum = float(self.temperature.sum())
+            fuel_sum = float(self.fuel_load.sum())
+        
+        total_cells = self.grid_size * self.grid_size
+        burning_count = int(counts[_STATE_CODES[BurnState.BURNING]])
+        
         stats = {
-            'unburned': 0,
-            'burning': 0,
-            'burned': 0,
-            'total_cells': self.grid_size * self.grid_size,
+            'unburned': int(counts[_STATE_CODES[BurnState.UNBURNED]]),
+            'burning': burning_count,
+            'burned': int(counts[_STATE_CODES[BurnState.BURNED]] + counts[_STATE_CODES[BurnState.ASH]]),
+            'total_cells': total_cells,
             'total_burned': 0,
             'avg_intensity': 0.0,
-            'avg_temperature': 0.0,
-            'fuel_remaining': 0.0
+            'avg_temperature': temperature_sum / total_cells,
+            'fuel_remaining': fuel_sum / total_cells
         }
         
-        total_intensity = 0.0
-        total_temperature = 0.0
-        total_fuel = 0.0
-        burning_count = 0
-        
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                cell = self.grid[row][col]
-                
-                if cell.burn_state == BurnState.UNBURNED:
-                    stats['unburned'] += 1
-                elif cell.burn_state == BurnState.BURNING:
-                    stats['burning'] += 1
-                    burning_count += 1
-                    total_intensity += cell.burn_intensity
-                else:  # BURNED or ASH
-                    stats['burned'] += 1
-                
-                total_temperature += cell.temperature
-                total_fuel += cell.fuel_load
-        
         stats['total_burned'] = stats['burned']
         
         if burning_count > 0:
-            stats['avg_intensity'] = total_intensity / burning_count
-        
-        stats['avg_temperature'] = total_temperature / stats['total_cells']
-        stats['fuel_remaining'] = total_fuel / stats['total_cells']
+            stats['avg_intensity'] = intensity_sum / burning_count
         
         return stats
     
     def get_grid_state(self) -> List[List[Dict]]:
         """Get current grid state for visualization"""
+        self._sync_host()
+        
+        terrain_ids = self.terrain_id.tolist()
+        burn_states = self.burn_state.tolist()
+        intensities = self.burn_intensity.tolist()
+        durations = self.burn_duration.tolist()
+        moistures = self.moisture.tolist()
+        fuel_loads = self.fuel_load.tolist()
+        temperatures = self.temperature.tolist()
+        
         grid_state = []
         
         for row in range(self.grid_size):
             row_state = []
             for col in range(self.grid_size):
-                cell = self.grid[row][col]
-                
                 cell_state = {
-                    'terrain_type': cell.terrain_type,
-                    'burn_state': cell.burn_state.value,
-                    'burn_intensity': cell.burn_intensity,
-                    'burn_duration': cell.burn_duration,
-                    'moisture': cell.moisture,
-                    'fuel_load': cell.fuel_load,
-                    'temperature': cell.temperature,
+                    'terrain_type': self.terrain_types[terrain_ids[row][col]],
+                    'burn_state': _BURN_STATES[burn_states[row][col]].value,
+                    'burn_intensity': intensities[row][col],
+                    'burn_duration': durations[row][col],
+                    'moisture': moistures[row][col],
+                    'fuel_load': fuel_loads[row][col],
+                    'temperature': temperatures[row][col],
                     'row': row,
                     'col': col
                 }
@@ -466,16 +545,12 @@ class CellularAutomatonEngine:
     def reset(self):
         """Reset the simulation"""
         self.tick_count = 0
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                cell = self.grid[row][col]
-                cell.burn_state = BurnState.UNBURNED
-                cell.burn_intensity = 0.0
-                cell.burn_duration = 0
-                cell.fuel_load = 1.0
-                cell.temperature = self.conditions.temperature
-                # Reset moisture to terrain-based default
-                if hasattr(cell, 'original_moisture'):
-                    cell.moisture = cell.original_moisture
+        self._sync_host()
+        self.burn_state.fill(_STATE_CODES[BurnState.UNBURNED])
+        self.burn_intensity.fill(0.0)
+        self.burn_duration.fill(0)
+        self.fuel_load.fill(1.0)
+        self.temperature.fill(self.conditions.temperature)
+        self._device_stale = True
         
         logger.info("Simulation reset")
@@ -29,6 +29,7 @@ class Config:
     SPREAD_PROBABILITY = 0.4      # Fire spread probability
     BURN_TIME = 5                 # Steps a cell burns before becoming ash
     WIND_FACTOR = 1.2            # Wind influence multiplier
+    SPREAD_NEIGHBORHOOD = '4'     # Fire spread neighbors: '4' (von Neumann) or '8' (Moore)
     
     # Terrain types and their fire properties
     TERRAIN_TYPES = {
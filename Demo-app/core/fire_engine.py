@@ -4,11 +4,17 @@ Combines cellular automata with real terrain data and weather conditions
 """
 
 import numpy as np
-import random
+import math
 from typing import Tuple, List, Dict, Optional
 from dataclasses import dataclass
 from core.config import Config
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 @dataclass
 class WeatherConditions:
     """Weather parameters affecting fire spread"""
@@ -18,6 +24,83 @@ class WeatherConditions:
     temperature: float = 25.0     # celsius
     precipitation: float = 0.0    # mm/hour
 
+# Neighbor offsets (dx, dy) used for fire spread, keyed by Config.SPREAD_NEIGHBORHOOD
+SPREAD_DIRECTIONS = {
+    '4': ((-1, 0), (1, 0), (0, -1), (0, 1)),
+    '8': ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1))
+}
+
+# Per-terrain lookup tables, indexed by terrain id
+TERRAIN_NAMES = list(Config.TERRAIN_TYPES.keys())
+TERRAIN_IDS = {name: i for i, name in enumerate(TERRAIN_NAMES)}
+SPREAD_RATE_LUT = np.array([props['spread_rate'] for props in Config.TERRAIN_TYPES.values()], dtype=np.float32)
+FUEL_LOAD_LUT = np.array([props['fuel_load'] for props in Config.TERRAIN_TYPES.values()], dtype=np.float32)
+COLOR_LUT = np.array([props['color'] for props in Config.TERRAIN_TYPES.values()], dtype=np.uint8)
+FLAMMABLE_MASK_LUT = np.array([name not in ['water', 'urban'] for name in TERRAIN_NAMES], dtype=bool)
+# Terrain types that random_ignite may start fires on
+IGNITABLE_IDS = np.array([TERRAIN_IDS[name] for name in ['forest', 'grass', 'shrub', 'agriculture']], dtype=np.uint8)
+
+# On grids of at least this many cells, and while less than this share of them is burning,
+# the NumPy step only touches the fire front; otherwise whole-grid masks are cheaper
+_SPARSE_STEP_MIN_CELLS = 200 * 200
+_SPARSE_STEP_FRACTION = 0.05
+
+# Fire state names indexed by fire state code
+_STATE_NAMES = np.array(['normal', 'burning', 'burned', 'smoldering'], dtype=object)
+
+def _sqdist(a: Tuple[int, int, int], b: Tuple[int, int, int]) -> int:
+    """Squared RGB distance between two colors"""
+    dr, dg, db = a[0] - b[0], a[1] - b[1], a[2] - b[2]
+    return dr * dr + dg * dg + db * db
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _ca_step_numba(fire_state, next_state, burn_time, max_burn_time, fuel_load,
+                       spread_rate, terrain_id, flammable_lut, directions, wind_multipliers,
+                       spread_factor, ignition_probability, heavy_rain, uniforms):
+        """
+        Whole CA step in one fused pass over the grid.
+        
+        Reads fire_state and writes next_state, so rows can update in parallel
+        without racing. uniforms holds one [0, 1) draw per cell, so results do not
+        depend on how rows are scheduled across threads. Returns (new_ignitions, burned_out).
+        """
+        height, width = fire_state.shape
+        new_ignitions = 0
+        burned_out = 0
+        
+        for y in prange(height):
+            for x in range(width):
+                state = fire_state[y, x]
+                next_value = state
+                
+                if state == 1:  # Currently burning
+                    burn_time[y, x] += 1
+                    if heavy_rain or burn_time[y, x] >= max_burn_time[y, x]:
+                        next_value = 2
+                        fuel_load[y, x] = 0
+                        burned_out += 1
+                
+                elif state == 0 and fuel_load[y, x] > 0 and flammable_lut[terrain_id[y, x]]:
+                    survival = 1.0
+                    for k in range(directions.shape[0]):
+                        # Source cell for direction (dx, dy) sits at (x - dx, y - dy)
+                        sx = x - directions[k, 0]
+                        sy = y - directions[k, 1]
+                        if 0 <= sx < width and 0 <= sy < height and fire_state[sy, sx] == 1:
+                            p = spread_rate[sy, sx] * spread_rate[y, x] * spread_factor * wind_multipliers[k]
+                            survival *= 1.0 - min(1.0, max(0.0, p))
+                    
+                    if uniforms[y, x] < 1.0 - survival * (1.0 - ignition_probability):
+                        next_value = 1
+                        burn_time[y, x] = 0
+                        new_ignitions += 1
+                
+                next_state[y, x] = next_value
+        
+        return new_ignitions, burned_out
+
 class FireCell:
     """Individual cell in the fire simulation grid"""
     
@@ -69,13 +152,39 @@ class FireCell:
 class FireSimulation:
     """Main fire simulation engine"""
     
-    def __init__(self, width: int, height: int):
+    # Unit vector for every stencil direction, so wind alignment needs no sqrt or trig
+    _DIR_TABLE = {
+        (dx, dy): (dx / math.hypot(dx, dy), dy / math.hypot(dx, dy)) for dx, dy in SPREAD_DIRECTIONS['8']
+    }
+    
+    def __init__(self, width: int, height: int, seed: Optional[int] = None):
         self.width = width
         self.height = height
-        self.grid = [[FireCell() for _ in range(width)] for _ in range(height)]
+        self.rng = np.random.default_rng(seed)
         self.weather = WeatherConditions()
+        self._weather_cache = None
+        self._flammable_count = None  # Cached get_flammable_cell_count, None when stale
         self.step_count = 0
         
+        # Spread stencil is fixed for the lifetime of the simulation
+        self._dirs = np.array(SPREAD_DIRECTIONS[Config.SPREAD_NEIGHBORHOOD], dtype=np.int64)
+        
+        # Per-cell state stored as parallel arrays (structure of arrays)
+        shape = (height, width)
+        self.terrain_id = np.full(shape, TERRAIN_IDS['grass'], dtype=np.uint8)
+        # Fire state: 0=normal, 1=burning, 2=burned, 3=smoldering
+        # Two persistent buffers: the Numba step writes the next state into _fs_b, then they swap;
+        # the NumPy step updates _fs_a in place
+        self._fs_a = np.zeros(shape, dtype=np.uint8)
+        self._fs_b = np.zeros_like(self._fs_a)
+        self.fire_state = self._fs_a
+        self.burn_time = np.zeros(shape, dtype=np.uint16)
+        self.max_burn_time = np.full(shape, Config.BURN_TIME, dtype=np.uint16)
+        self.fuel_load = FUEL_LOAD_LUT[self.terrain_id]
+        self.spread_rate = SPREAD_RATE_LUT[self.terrain_id]
+        self.moisture = np.full(shape, 0.3, dtype=np.float32)
+        self.elevation = np.zeros(shape, dtype=np.float32)
+        
         # Statistics tracking
         self.burning_cells = 0
         self.burned_cells = 0
@@ -90,17 +199,71 @@ class FireSimulation:
             img = img.resize((self.width, self.height), Image.NEAREST)
             terrain_bitmap = np.array(img)
         
-        for y in range(self.height):
-            for x in range(self.width):
-                pixel_color = tuple(terrain_bitmap[y, x][:3])  # RGB only
-                
-                # Find closest matching terrain type
-                terrain_type = self._find_closest_terrain_type(pixel_color, terrain_map)
-                self.grid[y][x] = FireCell(terrain_type)
+        pixels = terrain_bitmap[..., :3].reshape(-1, 3)  # RGB only
+        self.terrain_id[...] = self._match_terrain_colors(pixels, terrain_map).reshape(self.height, self.width)
+        
+        # Fresh cells for the new terrain
+        self.fire_state.fill(0)
+        self.burn_time.fill(0)
+        self.max_burn_time.fill(Config.BURN_TIME)
+        self.fuel_load = FUEL_LOAD_LUT[self.terrain_id]
+        self.spread_rate = SPREAD_RATE_LUT[self.terrain_id]
+        self.moisture.fill(0.3)
+        self.elevation.fill(0.0)
+        self._flammable_count = None
+    
+    def _match_terrain_colors(self, pixels: np.ndarray,
+                              terrain_map: Dict[Tuple[int, int, int], str]) -> np.ndarray:
+        """Map an (N, 3) array of RGB pixels to terrain ids by closest terrain_map color"""
+        grass_id = TERRAIN_IDS['grass']
+        if not terrain_map:
+            return np.full(len(pixels), grass_id, dtype=np.uint8)
+        
+        colors = np.array(list(terrain_map.keys()), dtype=np.int32)
+        ids = np.array([TERRAIN_IDS.get(terrain_type, grass_id) for terrain_type in terrain_map.values()],
+                       dtype=np.uint8)
+        pixels = pixels.astype(np.int32)
+        
+        # Exact palette hits: pack RGB into one 24-bit code and binary-search the sorted palette codes
+        codes = (pixels[:, 0] << 16) | (pixels[:, 1] << 8) | pixels[:, 2]
+        palette_codes = (colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]
+        order = np.argsort(palette_codes)
+        sorted_codes = palette_codes[order]
+        slot = np.minimum(np.searchsorted(sorted_codes, codes), len(sorted_codes) - 1)
+        exact = sorted_codes[slot] == codes
+        
+        result = np.empty(len(pixels), dtype=np.uint8)
+        result[exact] = ids[order[slot[exact]]]
+        misses = ~exact
+        if misses.any():
+            result[misses] = ids[self._nearest_palette_color(pixels[misses], colors)]
+        return result
+    
+    def _nearest_palette_color(self, pixels: np.ndarray, colors: np.ndarray) -> np.ndarray:
+        """Index of the closest palette color for each (N, 3) int32 pixel"""
+        if len(colors) > 64:
+            try:
+                from scipy.spatial import cKDTree
+                return cKDTree(colors).query(pixels)[1]
+            except ImportError:
+                pass
+        
+        # One pass per palette color keeps memory at O(pixels); ties go to the first color
+        best_distance = np.full(len(pixels), np.iinfo(np.int32).max, dtype=np.int32)
+        nearest = np.zeros(len(pixels), dtype=np.intp)
+        for i, color in enumerate(colors):
+            distance = ((pixels - color) ** 2).sum(axis=1)
+            closer = distance < best_distance
+            best_distance[closer] = distance[closer]
+            nearest[closer] = i
+        
+        return nearest
     
     def _find_closest_terrain_type(self, pixel_color: Tuple[int, int, int], 
                                  terrain_map: Dict[Tuple[int, int, int], str]) -> str:
-        """Find the closest matching terrain type for a pixel color"""
+        """Find the closest matching terrain type for a single pixel color"""
+        # Plain ints so uint8 pixel channels cannot wrap around when subtracted
+        pixel_color = (int(pixel_color[0]), int(pixel_color[1]), int(pixel_color[2]))
         if pixel_color in terrain_map:
             return terrain_map[pixel_color]
         
@@ -109,195 +272,256 @@ class FireSimulation:
         closest_terrain = 'grass'
         
         for color, terrain_type in terrain_map.items():
-            distance = sum((a - b) ** 2 for a, b in zip(pixel_color, color))
+            distance = _sqdist(pixel_color, color)
             if distance < min_distance:
                 min_distance = distance
                 closest_terrain = terrain_type
         
         return closest_terrain
     
+    def _can_ignite(self, x: int, y: int) -> bool:
+        """Check if the cell at (x, y) can catch fire"""
+        return (self.fire_state[y, x] == 0 and
+                self.fuel_load[y, x] > 0 and
+                FLAMMABLE_MASK_LUT[self.terrain_id[y, x]])
+    
+    def _ignite(self, x: int, y: int):
+        """Set the cell at (x, y) on fire if it can burn"""
+        if self._can_ignite(x, y):
+            self.fire_state[y, x] = 1
+            self.burn_time[y, x] = 0
+            self._flammable_count = None
+    
+    def get_cell(self, row: int, col: int) -> FireCell:
+        """Get a snapshot of a single cell as a FireCell"""
+        cell = FireCell(TERRAIN_NAMES[self.terrain_id[row, col]])
+        cell.fire_state = int(self.fire_state[row, col])
+        cell.fuel_load = float(self.fuel_load[row, col])
+        cell.burn_time = int(self.burn_time[row, col])
+        cell.max_burn_time = int(self.max_burn_time[row, col])
+        cell.moisture_content = float(self.moisture[row, col])
+        cell.elevation = float(self.elevation[row, col])
+        return cell
+    
     def ignite_at(self, x: int, y: int) -> bool:
         """Start a fire at specific coordinates"""
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.grid[y][x].ignite()
+            self._ignite(x, y)
             return True
         return False
     
     def step(self) -> Dict:
         """Advance simulation by one time step using cellular automata approach"""
         self.step_count += 1
-        new_ignitions = []
-        state_changes = 0
+        self._flammable_count = None
         
-        # Create a copy of the current grid state for simultaneous updates (CA approach)
-        next_grid_states = {}
-        
-        # First pass: Update all cell states and determine fire spread
-        for y in range(self.height):
-            for x in range(self.width):
-                current_cell = self.grid[y][x]
-                next_grid_states[(x, y)] = current_cell.fire_state
-                
-                # Update burning cells (similar to CA: burning -> burned)
-                if current_cell.fire_state == 1:  # Currently burning
-                    # Update burn time
-                    current_cell.burn_time += 1
-                    
-                    # Check if cell should burn out (like CA: burning becomes ash)
-                    if (current_cell.burn_time >= current_cell.max_burn_time or 
-                        self.weather.precipitation > 5.0):  # Heavy rain extinguishes
-                        next_grid_states[(x, y)] = 2  # Becomes burned
-                        current_cell.fuel_load = 0
-                        state_changes += 1
-                    
-                    # Spread fire to neighbors (CA fire spread logic)
-                    self._spread_fire_to_neighbors(x, y, new_ignitions)
-                
-                elif current_cell.fire_state == 0:  # Normal cell
-                    # Check for spontaneous ignition (like CA spontaneous ignition)
-                    if (current_cell.can_ignite() and 
-                        random.random() < Config.IGNITION_PROBABILITY):
-                        new_ignitions.append((x, y))
-        
-        # Second pass: Apply all state changes simultaneously (CA approach)
-        for (x, y), new_state in next_grid_states.items():
-            if self.grid[y][x].fire_state != new_state:
-                self.grid[y][x].fire_state = new_state
-                state_changes += 1
-        
-        # Apply new ignitions from fire spread
-        for x, y in new_ignitions:
-            if self.grid[y][x].can_ignite():
-                self.grid[y][x].ignite()
-                state_changes += 1
+        if NUMBA_AVAILABLE:
+            new_ignition_count, burned_out_count = self._step_numba()
+        else:
+            new_ignition_count, burned_out_count = self._step_numpy()
         
         # Update statistics
         self._update_statistics()
         
         return {
             'step': self.step_count,
-            'new_ignitions': len(new_ignitions),
-            'state_changes': state_changes,
+            'new_ignitions': new_ignition_count,
+            'state_changes': burned_out_count + new_ignition_count,
             'burning_cells': self.burning_cells,
             'burned_cells': self.burned_cells,
             'total_burned_area_km2': self.total_burned_area
         }
     
-    def _spread_fire_to_neighbors(self, x: int, y: int, new_ignitions: List[Tuple[int, int]]):
-        """Spread fire to neighboring cells using CA-style rules"""
-        # CA-style 4-directional spread (or 8-directional for more realistic spread)
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # 4-directional like basic CA
-        # For 8-directional: directions = [(-1,-1), (-1,0), (-1,1), (0,-1), (0,1), (1,-1), (1,0), (1,1)]
+    def _step_numba(self) -> Tuple[int, int]:
+        """Run one step with the compiled kernel, returns (new_ignitions, burned_out)"""
+        weather = self._get_weather_factors()
+        
+        counts = _ca_step_numba(
+            self._fs_a, self._fs_b, self.burn_time, self.max_burn_time,
+            self.fuel_load, self.spread_rate, self.terrain_id, FLAMMABLE_MASK_LUT,
+            self._dirs,
+            weather['wind_multipliers'],
+            weather['humidity_factor'] * weather['temp_factor'] * Config.SPREAD_PROBABILITY,
+            Config.IGNITION_PROBABILITY,
+            self.weather.precipitation > 5.0,  # Heavy rain extinguishes
+            self.rng.random(self._fs_a.shape)
+        )
+        
+        self._swap_fire_state_buffers()
+        return int(counts[0]), int(counts[1])
+    
+    def _step_numpy(self) -> Tuple[int, int]:
+        """Run one step with NumPy, returns (new_ignitions, burned_out)"""
+        # Every transition is decided from the current state before any cell is written,
+        # so fire_state can be updated in place without copying it into the other buffer
+        if self.fire_state.size < _SPARSE_STEP_MIN_CELLS:
+            return self._step_numpy_dense()
+        
+        burning_idx = np.flatnonzero(self.fire_state == 1)
+        if burning_idx.size > self.fire_state.size * _SPARSE_STEP_FRACTION:
+            return self._step_numpy_dense()
+        return self._step_numpy_sparse(burning_idx)
+    
+    def _step_numpy_dense(self) -> Tuple[int, int]:
+        """Whole-grid masked update, taken on grids below _SPARSE_STEP_MIN_CELLS cells or
+        when more than _SPARSE_STEP_FRACTION of the cells are burning"""
+        state = self.fire_state
+        burning = state == 1
+        can_ignite = (state == 0) & (self.fuel_load > 0) & FLAMMABLE_MASK_LUT[self.terrain_id]
+        
+        # Ignite when any burning neighbor spreads to the cell, or spontaneously
+        survival = self._spread_survival(burning, can_ignite)
+        ignition_prob = 1.0 - survival * (1.0 - Config.IGNITION_PROBABILITY)
+        new_ignitions = can_ignite & (self.rng.random(state.shape) < ignition_prob)
+        
+        # Burning cells burn out after max_burn_time (like CA: burning becomes ash)
+        heavy_rain = self.weather.precipitation > 5.0  # Heavy rain extinguishes
+        np.add(self.burn_time, 1, out=self.burn_time, where=burning)
+        burned_out = burning & ((self.burn_time >= self.max_burn_time) | heavy_rain)
+        np.putmask(state, burned_out, 2)
+        np.putmask(self.fuel_load, burned_out, 0)
+        
+        np.putmask(state, new_ignitions, 1)
+        np.putmask(self.burn_time, new_ignitions, 0)
+        
+        return int(np.count_nonzero(new_ignitions)), int(np.count_nonzero(burned_out))
+    
+    def _step_numpy_sparse(self, burning_idx: np.ndarray) -> Tuple[int, int]:
+        """Update only burning cells and their neighbors, addressed by flat index"""
+        state = self.fire_state.reshape(-1)
+        fuel_load = self.fuel_load.reshape(-1)
+        burn_time = self.burn_time.reshape(-1)
+        
+        # Ignite when any burning neighbor spreads to the cell, or spontaneously
+        candidates, survival = self._sparse_spread_survival(burning_idx)
+        spread_ignited = candidates[self.rng.random(candidates.size) < 1.0 - survival]
+        
+        # Spontaneous ignition hits every cell independently, so draw how many cells it hits
+        # and which ones, then keep those that can burn
+        spontaneous = self.rng.choice(state.size, size=self.rng.binomial(state.size, Config.IGNITION_PROBABILITY),
+                                      replace=False)
+        spontaneous = spontaneous[self._can_ignite_flat(spontaneous)]
+        new_ignitions = np.union1d(spread_ignited, spontaneous)
+        
+        # Burning cells burn out after max_burn_time (like CA: burning becomes ash)
+        burn_time[burning_idx] += 1
+        if self.weather.precipitation > 5.0:  # Heavy rain extinguishes
+            burned_out = burning_idx
+        else:
+            burned_out = burning_idx[burn_time[burning_idx] >= self.max_burn_time.reshape(-1)[burning_idx]]
+        state[burned_out] = 2
+        fuel_load[burned_out] = 0
         
-        current_cell = self.grid[y][x]
-        base_spread_rate = current_cell.terrain_props['spread_rate']
+        state[new_ignitions] = 1
+        burn_time[new_ignitions] = 0
         
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
+        return int(new_ignitions.size), int(burned_out.size)
+    
+    def _can_ignite_flat(self, idx: np.ndarray) -> np.ndarray:
+        """Vectorized _can_ignite for flat cell indices"""
+        return ((self.fire_state.reshape(-1)[idx] == 0) & (self.fuel_load.reshape(-1)[idx] > 0) &
+                FLAMMABLE_MASK_LUT[self.terrain_id.reshape(-1)[idx]])
+    
+    def _sparse_spread_survival(self, burning_idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Flat indices of cells next to a fire, and the probability that no burning neighbor ignites each"""
+        h, w = self.height, self.width
+        weather = self._get_weather_factors()
+        spread_factor = weather['humidity_factor'] * weather['temp_factor'] * Config.SPREAD_PROBABILITY
+        spread_rate = self.spread_rate.reshape(-1)
+        ys, xs = np.divmod(burning_idx, w)
+        
+        targets, escapes = [], []
+        for (dx, dy), wind_multiplier in zip(self._dirs.tolist(), weather['wind_multipliers']):
+            tx, ty = xs + dx, ys + dy
+            inside = (tx >= 0) & (tx < w) & (ty >= 0) & (ty < h)
+            source, target = burning_idx[inside], ty[inside] * w + tx[inside]
             
-            # Check bounds
-            if 0 <= nx < self.width and 0 <= ny < self.height:
-                neighbor_cell = self.grid[ny][nx]
-                
-                # Can only spread to flammable cells (like CA: only spread to trees)
-                if neighbor_cell.can_ignite():
-                    # Calculate spread probability based on terrain and weather
-                    spread_prob = self._calculate_spread_probability(x, y, nx, ny, base_spread_rate)
-                    
-                    # CA-style probabilistic spread
-                    if random.random() < spread_prob:
-                        new_ignitions.append((nx, ny))
-    
-    def _get_spread_candidates(self, x: int, y: int) -> List[Tuple[int, int, float]]:
-        """Get neighboring cells with spread probabilities"""
-        candidates = []
-        base_spread_rate = self.grid[y][x].terrain_props['spread_rate']
-        
-        # 8-directional spread with wind influence
-        directions = [
-            (-1, -1), (-1, 0), (-1, 1),
-            (0, -1),           (0, 1),
-            (1, -1),  (1, 0),  (1, 1)
-        ]
-        
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
+            open_target = self._can_ignite_flat(target)
+            source, target = source[open_target], target[open_target]
             
-            if 0 <= nx < self.width and 0 <= ny < self.height:
-                # Calculate wind influence
-                spread_prob = self._calculate_spread_probability(
-                    x, y, nx, ny, base_spread_rate
-                )
-                candidates.append((nx, ny, spread_prob))
-        
-        return candidates
+            spread_prob = np.clip(spread_rate[source] * spread_rate[target] * spread_factor * wind_multiplier, 0.0, 1.0)
+            targets.append(target)
+            escapes.append(1.0 - spread_prob)
+        
+        candidates, inverse = np.unique(np.concatenate(targets), return_inverse=True)
+        survival = np.ones(candidates.size, dtype=np.float32)
+        np.multiply.at(survival, inverse, np.concatenate(escapes))
+        return candidates, survival
     
-    def _calculate_spread_probability(self, from_x: int, from_y: int, 
-                                    to_x: int, to_y: int, base_rate: float) -> float:
-        """Calculate fire spread probability considering wind and terrain"""
-        
-        # Direction of spread
-        dx, dy = to_x - from_x, to_y - from_y
-        spread_angle = np.arctan2(dy, dx) * 180 / np.pi
+    def _swap_fire_state_buffers(self):
+        """Make the freshly written buffer the current fire state"""
+        self._fs_a, self._fs_b = self._fs_b, self._fs_a
+        self.fire_state = self._fs_a
+    
+    def _spread_survival(self, burning: np.ndarray, can_ignite: np.ndarray) -> np.ndarray:
+        """Probability per cell that no burning neighbor spreads fire into it"""
+        h, w = self.height, self.width
+        weather = self._get_weather_factors()
+        
+        target_factor = np.where(can_ignite, self.spread_rate, 0.0).astype(np.float32)
+        target_factor *= weather['humidity_factor'] * weather['temp_factor'] * Config.SPREAD_PROBABILITY
+        source_rate = np.where(burning, self.spread_rate, 0.0).astype(np.float32)
+        
+        survival = np.ones((h, w), dtype=np.float32)
+        shifted = np.empty((h, w), dtype=np.float32)
+        
+        for (dx, dy), wind_multiplier in zip(self._dirs.tolist(), weather['wind_multipliers']):
+            # shifted[y, x] holds the spread rate of a burning source at (x - dx, y - dy)
+            shifted.fill(0.0)
+            shifted[max(0, dy):h + min(0, dy), max(0, dx):w + min(0, dx)] = \
+                source_rate[max(0, -dy):h + min(0, -dy), max(0, -dx):w + min(0, -dx)]
+            
+            spread_prob = np.clip(shifted * target_factor * wind_multiplier, 0.0, 1.0)
+            survival *= 1.0 - spread_prob
         
-        # Wind influence
-        wind_radians = np.radians(self.weather.wind_direction)
-        wind_dx, wind_dy = np.sin(wind_radians), np.cos(wind_radians)
+        return survival
+    
+    def _get_weather_factors(self) -> Dict:
+        """Weather-derived scalars, recomputed only after the weather changes"""
+        if self._weather_cache is None:
+            wind_radians = math.radians(self.weather.wind_direction)
+            wind_dx, wind_dy = math.sin(wind_radians), math.cos(wind_radians)
+            
+            self._weather_cache = {
+                'humidity_factor': max(0.1, 1.0 - self.weather.humidity / 100.0),
+                'temp_factor': min(2.0, max(0.5, (self.weather.temperature - 10) / 30.0)),
+                'wind_multipliers': np.array(
+                    [self._wind_multiplier(dx, dy, wind_dx, wind_dy) for dx, dy in self._dirs.tolist()],
+                    dtype=np.float64
+                )
+            }
+        return self._weather_cache
+    
+    def _wind_multiplier(self, dx: int, dy: int, wind_dx: float, wind_dy: float) -> float:
+        """Wind multiplier for fire spreading in direction (dx, dy)"""
+        unit_dx, unit_dy = self._DIR_TABLE[(dx, dy)]
         
         # Dot product for wind alignment (-1 to 1)
-        wind_alignment = (dx * wind_dx + dy * wind_dy) / np.sqrt(dx*dx + dy*dy)
-        wind_multiplier = 1.0 + (wind_alignment * self.weather.wind_speed / 20.0)
-        
-        # Terrain factors
-        target_cell = self.grid[to_y][to_x]
-        terrain_factor = target_cell.terrain_props['spread_rate']
-        
-        # Weather factors
-        humidity_factor = max(0.1, 1.0 - self.weather.humidity / 100.0)
-        temp_factor = min(2.0, max(0.5, (self.weather.temperature - 10) / 30.0))
-        
-        # Combine all factors
-        final_probability = (base_rate * terrain_factor * wind_multiplier * 
-                           humidity_factor * temp_factor * Config.SPREAD_PROBABILITY)
-        
-        return min(1.0, max(0.0, final_probability))
+        wind_alignment = unit_dx * wind_dx + unit_dy * wind_dy
+        return 1.0 + (wind_alignment * self.weather.wind_speed / 20.0)
     
     def _update_statistics(self):
         """Update simulation statistics"""
-        self.burning_cells = 0
-        self.burned_cells = 0
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x].fire_state == 1:
-                    self.burning_cells += 1
-                elif self.grid[y][x].fire_state == 2:
-                    self.burned_cells += 1
+        # Single pass over the state array counts every fire state at once
+        counts = np.bincount(self.fire_state.ravel(), minlength=4)
+        self.burning_cells = int(counts[1])
+        self.burned_cells = int(counts[2])
         
         # Estimate burned area (assuming each cell represents ~25m²)
         cell_area_km2 = 0.000025  # 25m² in km²
         self.total_burned_area = self.burned_cells * cell_area_km2
     
-    def get_fire_state_array(self) -> np.ndarray:
-        """Get current fire state as numpy array for visualization"""
-        state_array = np.zeros((self.height, self.width), dtype=np.uint8)
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                state_array[y, x] = self.grid[y][x].fire_state
-        
-        return state_array
+    def get_fire_state_array(self, copy: bool = False) -> np.ndarray:
+        """Get current fire state as numpy array for visualization (read-only view unless copy=True)"""
+        if copy:
+            return self.fire_state.copy()
+        view = self.fire_state.view()
+        view.flags.writeable = False
+        return view
     
     def get_terrain_state_array(self) -> np.ndarray:
         """Get terrain types as numpy array"""
-        terrain_array = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                color = self.grid[y][x].terrain_props['color']
-                terrain_array[y, x] = color
-        
-        return terrain_array
+        return COLOR_LUT[self.terrain_id]
     
     def reset(self):
         """Reset simulation to initial state"""
@@ -306,17 +530,17 @@ class FireSimulation:
         self.burned_cells = 0
         self.total_burned_area = 0.0
         
-        for y in range(self.height):
-            for x in range(self.width):
-                cell = self.grid[y][x]
-                cell.fire_state = 0
-                cell.burn_time = 0
-                # Restore fuel load based on terrain type
-                cell.fuel_load = cell.terrain_props['fuel_load']
+        self.fire_state.fill(0)
+        self.burn_time.fill(0)
+        # Restore fuel load based on terrain type
+        self.fuel_load = FUEL_LOAD_LUT[self.terrain_id]
+        self._flammable_count = None
     
     def set_weather(self, weather: WeatherConditions):
         """Update weather conditions"""
         self.weather = weather
+        self._weather_cache = None
+        self._get_weather_factors()
     
     def is_active(self) -> bool:
         """Check if simulation has active fires"""
@@ -325,32 +549,18 @@ class FireSimulation:
     def get_cell_state(self, row: int, col: int) -> str:
         """Get the fire state of a specific cell"""
         if (0 <= row < self.height and 0 <= col < self.width):
-            cell = self.grid[row][col]
-            if cell.fire_state == 0:
-                return 'normal'
-            elif cell.fire_state == 1:
-                return 'burning'
-            elif cell.fire_state == 2:
-                return 'burned'
-            elif cell.fire_state == 3:
-                return 'smoldering'
+            return _STATE_NAMES[self.fire_state[row, col]]
         return 'normal'
     
     def get_cell_terrain(self, row: int, col: int) -> str:
         """Get the terrain type of a specific cell"""
         if (0 <= row < self.height and 0 <= col < self.width):
-            return self.grid[row][col].terrain_type
+            return TERRAIN_NAMES[self.terrain_id[row, col]]
         return 'grass'
     
     def get_all_fire_states(self) -> List[List[str]]:
         """Get fire states for all cells in the grid"""
-        states = []
-        for row in range(self.height):
-            row_states = []
-            for col in range(self.width):
-                row_states.append(self.get_cell_state(row, col))
-            states.append(row_states)
-        return states
+        return _STATE_NAMES[self.fire_state].tolist()
     
     def random_ignite(self, num_ignitions: int = None, ignition_probability: float = 0.02) -> int:
         """
@@ -363,40 +573,26 @@ class FireSimulation:
         Returns:
             Number of cells actually ignited
         """
-        flammable_cells = []
-        
-        # Find all flammable cells (similar to CA implementation)
-        for y in range(self.height):
-            for x in range(self.width):
-                cell = self.grid[y][x]
-                # Only ignite cells that can burn (like trees in CA)
-                if (cell.can_ignite() and 
-                    cell.terrain_type in ['forest', 'grass', 'shrub', 'agriculture']):
-                    flammable_cells.append((y, x))
-        
-        if not flammable_cells:
-            return 0
+        # Only ignite cells that can burn (like trees in CA)
+        flammable_mask = ((self.fire_state == 0) & (self.fuel_load > 0) &
+                          np.isin(self.terrain_id, IGNITABLE_IDS))
+        flammable_idx = np.flatnonzero(flammable_mask)
         
-        ignited_count = 0
+        if flammable_idx.size == 0:
+            return 0
         
         if num_ignitions is not None:
             # Ignite a specific number of random cells (like manual ignition in CA)
-            num_to_ignite = min(num_ignitions, len(flammable_cells))
-            selected_cells = random.sample(flammable_cells, num_to_ignite)
-            
-            for y, x in selected_cells:
-                cell = self.grid[y][x]
-                if cell.can_ignite():
-                    cell.ignite()  # Set fire state to burning (like state 2 in CA)
-                    ignited_count += 1
+            selected = self.rng.choice(flammable_idx, size=min(num_ignitions, flammable_idx.size), replace=False)
         else:
             # Use probability-based ignition (like spontaneous ignition in CA)
-            for y, x in flammable_cells:
-                if random.random() < ignition_probability:
-                    cell = self.grid[y][x]
-                    if cell.can_ignite():
-                        cell.ignite()
-                        ignited_count += 1
+            selected = flammable_idx[self.rng.random(flammable_idx.size) < ignition_probability]
+        
+        # Set fire state to burning (like state 2 in CA)
+        self.fire_state.flat[selected] = 1
+        self.burn_time.flat[selected] = 0
+        self._flammable_count = None
+        ignited_count = int(selected.size)
         
         # Update statistics after ignition
         self._update_statistics()
@@ -405,9 +601,7 @@ class FireSimulation:
 
     def get_flammable_cell_count(self) -> int:
         """Get the total number of flammable cells in the grid"""
-        count = 0
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x].can_ignite():
-                    count += 1
-        return count
+        if self._flammable_count is None:
+            flammable = (self.fire_state == 0) & (self.fuel_load > 0) & FLAMMABLE_MASK_LUT[self.terrain_id]
+            self._flammable_count = int(np.count_nonzero(flammable))
+        return self._flammable_count
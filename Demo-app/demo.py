@@ -5,20 +5,27 @@ Demonstrates how to use the simulation API programmatically
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
-import time
-import base64
+import binascii
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import io
 
 # Configuration
 API_BASE_URL = "http://localhost:5000/api"
 DEMO_LOCATION = {"lat": 39.8283, "lon": -98.5795}  # Center of USA
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Shared session so every call reuses the same keep-alive connection
+SESSION = requests.Session()
+SESSION.mount(API_BASE_URL.replace('/api', ''), HTTPAdapter(pool_connections=4, pool_maxsize=8))
+SESSION.headers.update({'Content-Type': 'application/json'})
 
 def test_api_connection():
     """Test if the API is accessible"""
     try:
-        response = requests.get(f"{API_BASE_URL.replace('/api', '')}/health", timeout=5)
+        response = SESSION.get(f"{API_BASE_URL.replace('/api', '')}/health", timeout=5)
         return response.status_code == 200
     except requests.RequestException:
         return False
@@ -34,7 +41,7 @@ def extract_terrain(lat, lon):
         "grid_size": [100, 100]  # Smaller grid for demo
     }
     
-    response = requests.post(f"{API_BASE_URL}/map/select-area", json=payload)
+    response = SESSION.post(f"{API_BASE_URL}/map/select-area", json=payload)
     
     if response.status_code == 200:
         data = response.json()
@@ -61,7 +68,7 @@ def create_simulation(terrain_data):
         }
     }
     
-    response = requests.post(f"{API_BASE_URL}/simulation/create", json=payload)
+    response = SESSION.post(f"{API_BASE_URL}/simulation/create", json=payload)
     
     if response.status_code == 200:
         data = response.json()
@@ -85,7 +92,7 @@ def ignite_fire(sim_id, x, y):
         "y": y
     }
     
-    response = requests.post(f"{API_BASE_URL}/simulation/ignite", json=payload)
+    response = SESSION.post(f"{API_BASE_URL}/simulation/ignite", json=payload)
     
     if response.status_code == 200:
         data = response.json()
@@ -100,43 +107,35 @@ def ignite_fire(sim_id, x, y):
     return None
 
 def run_simulation_steps(sim_id, num_steps=10):
-    """Run simulation for specified number of steps"""
+    """Run simulation for specified number of steps in a single request"""
     print(f"⏭️  Running {num_steps} simulation steps...")
     
-    results = []
+    payload = {
+        "simulation_id": sim_id,
+        "steps": num_steps
+    }
     
-    for step in range(num_steps):
-        payload = {
-            "simulation_id": sim_id,
-            "steps": 1
-        }
-        
-        response = requests.post(f"{API_BASE_URL}/simulation/step", json=payload)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data["success"]:
-                stats = data["statistics"]
-                print(f"   Step {step + 1}: Burning={stats['burning_cells']}, "
+    response = SESSION.post(f"{API_BASE_URL}/simulation/step", json=payload)
+    
+    if response.status_code == 200:
+        data = response.json()
+        if data["success"]:
+            for stats in data["step_results"]:
+                print(f"   Step {stats['step']}: Burning={stats['burning_cells']}, "
                       f"Burned={stats['burned_cells']}, "
                       f"Area={stats.get('total_burned_area_km2', 0):.4f} km²")
-                
-                results.append(data)
-                
-                # Stop if no more active fires
-                if not stats.get("is_active", True):
-                    print("🏁 Simulation completed - no more active fires")
-                    break
-            else:
-                print(f"❌ Step failed: {data.get('error', 'Unknown error')}")
-                break
+            
+            # The server stops early once there are no more active fires
+            if not data["statistics"].get("is_active", True):
+                print("🏁 Simulation completed - no more active fires")
+            
+            return data
         else:
-            print(f"❌ API request failed: {response.status_code}")
-            break
-        
-        time.sleep(0.5)  # Small delay between steps
+            print(f"❌ Step failed: {data.get('error', 'Unknown error')}")
+    else:
+        print(f"❌ API request failed: {response.status_code}")
     
-    return results
+    return None
 
 def set_weather_conditions(sim_id):
     """Set custom weather conditions"""
@@ -151,7 +150,7 @@ def set_weather_conditions(sim_id):
         "precipitation": 0.0      # mm/h
     }
     
-    response = requests.post(f"{API_BASE_URL}/simulation/weather", json=payload)
+    response = SESSION.post(f"{API_BASE_URL}/simulation/weather", json=payload)
     
     if response.status_code == 200:
         data = response.json()
@@ -167,7 +166,7 @@ def set_weather_conditions(sim_id):
 
 def get_simulation_status(sim_id):
     """Get current simulation status"""
-    response = requests.get(f"{API_BASE_URL}/simulation/status/{sim_id}")
+    response = SESSION.get(f"{API_BASE_URL}/simulation/status/{sim_id}")
     
     if response.status_code == 200:
         data = response.json()
@@ -180,7 +179,7 @@ def export_simulation_data(sim_id):
     """Export simulation data"""
     print("💾 Exporting simulation data...")
     
-    response = requests.get(f"{API_BASE_URL}/simulation/export/{sim_id}")
+    response = SESSION.get(f"{API_BASE_URL}/simulation/export/{sim_id}")
     
     if response.status_code == 200:
         data = response.json()
@@ -202,14 +201,17 @@ def export_simulation_data(sim_id):
 def save_visualization(image_base64, filename):
     """Save visualization image to file"""
     try:
-        # Remove data URL prefix
-        if ',' in image_base64:
-            image_base64 = image_base64.split(',')[1]
+        # Remove data URL prefix and decode
+        img_data = binascii.a2b_base64(image_base64.split(',', 1)[-1])
         
-        # Decode and save
-        img_data = base64.b64decode(image_base64)
-        img = Image.open(io.BytesIO(img_data))
-        img.save(filename)
+        if img_data.startswith(PNG_SIGNATURE) and filename.lower().endswith('.png'):
+            # Already PNG bytes, write them as-is
+            with open(filename, 'wb') as f:
+                f.write(img_data)
+        else:
+            # Format conversion required
+            img = Image.open(io.BytesIO(img_data))
+            img.save(filename)
         
         print(f"💾 Visualization saved to {filename}")
         return True
@@ -249,17 +251,19 @@ def main():
     # Ignite fires at multiple locations
     fire_locations = [(25, 25), (75, 75), (50, 25)]
     
-    for x, y in fire_locations:
-        result = ignite_fire(sim_id, x, y)
-        if result and "visualization" in result:
-            save_visualization(result["visualization"], f"ignition_{x}_{y}.png")
+    # Write images in the background while the next request is in flight
+    with ThreadPoolExecutor(max_workers=2) as writer:
+        for x, y in fire_locations:
+            result = ignite_fire(sim_id, x, y)
+            if result and "visualization" in result:
+                writer.submit(save_visualization, result["visualization"], f"ignition_{x}_{y}.png")
     
     # Run simulation
-    results = run_simulation_steps(sim_id, 15)
+    result = run_simulation_steps(sim_id, 15)
     
     # Save final visualization
-    if results and "visualization" in results[-1]:
-        save_visualization(results[-1]["visualization"], "final_result.png")
+    if result and "visualization" in result:
+        save_visualization(result["visualization"], "final_result.png")
     
     # Get final status
     final_status = get_simulation_status(sim_id)
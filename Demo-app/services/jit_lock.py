@@ -0,0 +1,10 @@
+"""
+Lock shared by the numba-accelerated tile services
+"""
+
+import threading
+
+# Tiles and grids are classified on executor threads; each parallel kernel already spreads its
+# work over all cores, and numba's default workqueue layer cannot run parallel kernels from
+# several threads at once
+JIT_LOCK = threading.Lock()
@@ -7,20 +7,142 @@ import numpy as np
 import requests
 from PIL import Image
 import io
+import os
 import math
-from typing import Tuple, Dict, List, Optional
+from typing import Callable, Tuple, Dict, List, Optional
 import asyncio
 import aiohttp
-from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared request settings; tiles are already-compressed PNG/JPEG, so ask servers not to gzip them again
+TILE_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_read=8)
+WORLDCOVER_TIMEOUT = aiohttp.ClientTimeout(total=60)
+IMAGE_HEADERS = {'Accept-Encoding': 'identity'}
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
+try:
+    from numba import njit, prange, set_num_threads
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    from services.jit_lock import JIT_LOCK
+
+_AMBIGUOUS_CLASS = 255  # Pixel inside several classifier ranges, settled by scoring
+
+# Process and thread pools shared by all classifiers, and the classifier each worker process decodes with
+_decode_pool = None
+_decode_threads = None
+_worker_classifier = None
+
+def _shared_decode_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Lazily start the decode process pool; spawned, since forking a threaded server is unsafe"""
+    global _decode_pool
+    if _decode_pool is None:
+        _decode_pool = ProcessPoolExecutor(max_workers=max_workers,
+                                           mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=_init_decode_worker)
+    return _decode_pool
+
+def _shared_decode_threads(max_workers: int) -> ThreadPoolExecutor:
+    """Lazily start the decode thread pool, used when process decoding is off and for WorldCover images"""
+    global _decode_threads
+    if _decode_threads is None:
+        _decode_threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tile-decode')
+    return _decode_threads
+
+def _init_decode_worker():
+    """Build the worker's classifier once; one numba thread each, the pool already uses every core"""
+    global _worker_classifier
+    if NUMBA_AVAILABLE:
+        set_num_threads(1)
+    _worker_classifier = MapTileClassifier()
+
+def _decode_classify_worker(image_data: bytes, content_type: str, cache_path: str) -> np.ndarray:
+    """Process-pool entry point for MapTileClassifier._decode_classify_and_cache"""
+    return _worker_classifier._decode_classify_and_cache(image_data, content_type, cache_path)
+
+@functools.lru_cache(maxsize=4096)
+def _tile_box(x: int, y: int, zoom: int) -> Tuple[float, float, float, float]:
+    """(north, west, south, east) bounds of a tile, memoized since neighbouring cells share tiles"""
+    n = 2.0 ** zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return north, west, south, east
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True, boundscheck=False)
+    def _classify_rgb_tile(tile_rgb, range_min, range_max, centers, max_distances,
+                           priorities, default_id):
+        """Per-pixel classify_pixel_terrain scoring over an (H, W, 3) uint8 tile"""
+        height, width = tile_rgb.shape[0], tile_rgb.shape[1]
+        class_ids = np.empty((height, width), dtype=np.uint8)
+        
+        for y in prange(height):
+            for x in range(width):
+                r = np.int16(tile_rgb[y, x, 0])
+                g = np.int16(tile_rgb[y, x, 1])
+                b = np.int16(tile_rgb[y, x, 2])
+                best_id = default_id
+                best_score = np.float32(0.0)
+                
+                for k in range(range_min.shape[0]):
+                    if (range_min[k, 0] <= r <= range_max[k, 0] and
+                            range_min[k, 1] <= g <= range_max[k, 1] and
+                            range_min[k, 2] <= b <= range_max[k, 2]):
+                        dr = np.float32(r) - centers[k, 0]
+                        dg = np.float32(g) - centers[k, 1]
+                        db = np.float32(b) - centers[k, 2]
+                        distance = np.sqrt(dr * dr + dg * dg + db * db)
+                        score = (np.float32(1.0) - distance / max_distances[k]) * priorities[k]
+                        if score > best_score:
+                            best_score = score
+                            best_id = k
+                
+                class_ids[y, x] = best_id
+        
+        return class_ids
+
 class MapTileClassifier:
     """Classifies terrain types from map tile imagery"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None):
         self.tile_size = 256  # Standard map tile size
+        self.max_concurrent_downloads = 10  # Open requests per tile server at any time
+        
+        # Decoding and classification run on a dedicated pool, fed through a bounded queue;
+        # worker processes sidestep the GIL, threads are the fallback
+        self.decode_in_processes = True
+        self.decode_workers = os.cpu_count() or 4
+        self.decode_queue_size = 32
+        self._decode_executor = _shared_decode_threads(self.decode_workers)
+        
+        # Classified tiles are cached on disk per source/zoom/x/y
+        self.tile_source = 'osm'
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser('~'), '.cache', 'fire-sim', 'tiles')
+        
+        # libjpeg-turbo decodes JPEG tiles straight into a NumPy array
+        self._turbojpeg = None
+        if TURBOJPEG_AVAILABLE:
+            try:
+                self._turbojpeg = TurboJPEG()
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"libjpeg-turbo not usable, decoding JPEG tiles with Pillow: {e}")
         
         # Color ranges for terrain classification from satellite imagery
         self.terrain_classifiers = {
@@ -54,6 +176,42 @@ class MapTileClassifier:
             }
         }
         
+        # Integer class ids for per-pixel classification rasters
+        self._id_to_name = list(self.terrain_classifiers.keys())
+        self._class_ids = {name: i for i, name in enumerate(self._id_to_name)}
+        self._missing_tile_id = len(self._id_to_name)  # Mosaic fill where no tile arrived
+        
+        # Classifier ranges as arrays for the JIT tile kernel, indexed by class id
+        ranges = np.array([classifier['rgb_ranges'] for classifier in self.terrain_classifiers.values()])
+        self._range_min = ranges[:, 0].astype(np.int16)
+        self._range_max = ranges[:, 1].astype(np.int16)
+        self._range_centers = ((ranges[:, 0] + ranges[:, 1]) / 2).astype(np.float32)
+        self._range_max_distances = np.sqrt(((ranges[:, 1] - ranges[:, 0]) ** 2).sum(axis=1)).astype(np.float32)
+        self._priorities = np.array([classifier['priority'] for classifier in self.terrain_classifiers.values()],
+                                    dtype=np.float32)
+        
+        # Per-channel bitmask of the classes whose range holds each value; ANDing the three channels
+        # gives a pixel's candidate classes, and a 256-entry table resolves masks with one candidate
+        values = np.arange(256)[:, np.newaxis]
+        class_bits = (1 << np.arange(len(self._id_to_name))).astype(np.uint8)
+        self._channel_class_bits = [
+            np.bitwise_or.reduce(np.where((values >= self._range_min[:, c]) & (values <= self._range_max[:, c]),
+                                          class_bits, 0), axis=1).astype(np.uint8)
+            for c in range(3)
+        ]
+        self._class_bits_lut = np.full(256, _AMBIGUOUS_CLASS, dtype=np.uint8)
+        self._class_bits_lut[0] = self._class_ids['grass']
+        self._class_bits_lut[class_bits] = np.arange(len(class_bits))
+        
+        if NUMBA_AVAILABLE:
+            # Compile before the first tile, for decoder output, read-only Pillow RGB arrays and
+            # channel views of read-only Pillow RGBA arrays
+            self.classify_tile_array(np.zeros((4, 4, 3), dtype=np.uint8))
+            for channels in (3, 4):
+                warmup = np.zeros((4, 4, channels), dtype=np.uint8)
+                warmup.flags.writeable = False
+                self.classify_tile_array(warmup[..., :3])
+        
         # Map legend colors for visualization
         self.legend_colors = {
             'forest': '#228B22',      # Forest green
@@ -64,6 +222,30 @@ class MapTileClassifier:
             'shrub': '#9ACD32',       # Yellow green
             'bare_ground': '#D2B48C'   # Tan
         }
+        
+        # ESA WorldCover WMS: one GetMap request covers the whole grid area
+        self.worldcover_wms_url = 'https://services.terrascope.be/wms/v2'
+        self.worldcover_layer = 'WORLDCOVER_2021_MAP'
+        self.worldcover_pixels_per_cell = 4
+        
+        # WorldCover legend colors mapped to terrain types
+        self.worldcover_colors = {
+            (0, 100, 0): 'forest',           # Tree cover
+            (255, 187, 34): 'shrub',         # Shrubland
+            (255, 255, 76): 'grass',         # Grassland
+            (240, 150, 255): 'agriculture',  # Cropland
+            (250, 0, 0): 'urban',            # Built-up
+            (180, 180, 180): 'bare_ground',  # Bare / sparse vegetation
+            (240, 240, 240): 'bare_ground',  # Snow and ice
+            (0, 100, 200): 'water',          # Permanent water bodies
+            (0, 150, 160): 'water',          # Herbaceous wetland
+            (0, 207, 117): 'forest',         # Mangroves
+            (250, 230, 160): 'grass'         # Moss and lichen
+        }
+        worldcover_codes = {(r << 16) | (g << 8) | b: self._class_ids[terrain_type]
+                            for (r, g, b), terrain_type in self.worldcover_colors.items()}
+        self._worldcover_codes = np.array(sorted(worldcover_codes), dtype=np.int64)
+        self._worldcover_ids = np.array([worldcover_codes[code] for code in sorted(worldcover_codes)], dtype=np.uint8)
     
     def deg2num(self, lat_deg: float, lon_deg: float, zoom: int) -> Tuple[int, int]:
         """Convert lat/lon to tile coordinates"""
@@ -75,34 +257,119 @@ class MapTileClassifier:
     
     def num2deg(self, x: int, y: int, zoom: int) -> Tuple[float, float]:
         """Convert tile coordinates to lat/lon"""
-        n = 2.0 ** zoom
-        lon_deg = x / n * 360.0 - 180.0
-        lat_rad = math.atan(math.sinh(math.pi * (1 - 2 * y / n)))
-        lat_deg = math.degrees(lat_rad)
+        lat_deg, lon_deg = _tile_box(x, y, zoom)[:2]
         return (lat_deg, lon_deg)
     
-    async def download_tile(self, session: aiohttp.ClientSession, x: int, y: int, zoom: int) -> Optional[np.ndarray]:
-        """Download a single map tile"""
+    async def download_tile(self, session: aiohttp.ClientSession, x: int, y: int, zoom: int,
+                            semaphore: Optional[asyncio.Semaphore] = None) -> Optional[np.ndarray]:
+        """Download a single map tile and classify it, returns its uint8 class-id raster"""
+        cache_path = self._tile_cache_path(x, y, zoom)
+        tile_classes = self._load_cached_tile(cache_path)
+        if tile_classes is not None:
+            return tile_classes
+        
+        payload = await self._fetch_tile(session, x, y, zoom, semaphore)
+        if payload is None:
+            return None
+        return await self._classify_payload(cache_path, *payload)
+    
+    async def _fetch_tile(self, session: aiohttp.ClientSession, x: int, y: int, zoom: int,
+                          semaphore: Optional[asyncio.Semaphore] = None) -> Optional[Tuple[bytes, str]]:
+        """Download a tile's encoded image, returns (image_data, content_type)"""
         try:
             # Using OpenStreetMap tiles - in production consider using satellite imagery
             url = f"https://tile.openstreetmap.org/{zoom}/{x}/{y}.png"
             
-            async with session.get(url) as response:
-                if response.status == 200:
-                    image_data = await response.read()
-                    image = Image.open(io.BytesIO(image_data))
-                    return np.array(image.convert('RGB'))
-                else:
-                    logger.warning(f"Failed to download tile {x},{y},{zoom}: {response.status}")
-                    return None
+            async with semaphore or contextlib.nullcontext():
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        logger.warning(f"Failed to download tile {x},{y},{zoom}: {response.status}")
+                        return None
+                    return await response.read(), response.content_type
                     
         except Exception as e:
             logger.error(f"Error downloading tile {x},{y},{zoom}: {e}")
             return None
     
+    async def _classify_payload(self, cache_path: str, image_data: bytes,
+                                content_type: str) -> Optional[np.ndarray]:
+        """Decode, classify and cache a downloaded tile on the decode pool, off the event loop"""
+        loop = asyncio.get_running_loop()
+        if self.decode_in_processes:
+            try:
+                pool = _shared_decode_pool(self.decode_workers)
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Decode process pool unavailable, decoding tiles on threads: {e}")
+                self.decode_in_processes = False
+        
+        try:
+            if self.decode_in_processes:
+                return await loop.run_in_executor(pool, _decode_classify_worker,
+                                                  image_data, content_type, cache_path)
+            return await loop.run_in_executor(self._decode_executor, self._decode_classify_and_cache,
+                                              image_data, content_type, cache_path)
+        except Exception as e:
+            logger.error(f"Error classifying tile {cache_path}: {e}")
+            return None
+    
+    def _decode_classify_and_cache(self, image_data: bytes, content_type: str,
+                                   cache_path: str) -> np.ndarray:
+        """Decode and classify a tile, then write it to the disk cache"""
+        tile_classes = self._decode_and_classify(image_data, content_type)
+        self._save_cached_tile(cache_path, tile_classes)
+        return tile_classes
+    
+    def _decode_and_classify(self, image_data: bytes, content_type: str) -> np.ndarray:
+        """Decode a downloaded tile and return its class-id raster"""
+        if content_type == 'image/jpeg' and self._turbojpeg is not None:
+            return self.classify_tile_array(self._turbojpeg.decode(image_data, pixel_format=TJPF_RGB))
+        
+        image = Image.open(io.BytesIO(image_data))
+        if image.mode == 'P':
+            return self.classify_palette_image(image)
+        
+        # Classify 4-channel tiles through a view of their first three channels, not an RGB copy
+        if image.mode not in ('RGB', 'RGBA', 'RGBX'):
+            image = image.convert('RGB')
+        return self.classify_tile_array(np.asarray(image)[..., :3])
+    
+    def classify_palette_image(self, image: Image.Image) -> np.ndarray:
+        """Classify a paletted ('P' mode) tile by classifying its palette once and indexing it per pixel"""
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        colors = np.asarray(image.getpalette() or [], dtype=np.uint8).reshape(-1, 3)[:256]
+        palette[:len(colors)] = colors
+        
+        palette_classes = self.classify_tile_array(palette[np.newaxis])[0]
+        return palette_classes[np.asarray(image, dtype=np.uint8)]
+    
+    def _tile_cache_path(self, x: int, y: int, zoom: int) -> str:
+        """On-disk location of a classified tile"""
+        return os.path.join(self.cache_dir, self.tile_source, str(zoom), str(x), f"{y}.u8.npy")
+    
+    def _load_cached_tile(self, cache_path: str) -> Optional[np.ndarray]:
+        """Memory-map a classified tile from the disk cache, None if it is not cached"""
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            return np.load(cache_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cached tile {cache_path}: {e}")
+            return None
+    
+    def _save_cached_tile(self, cache_path: str, tile_classes: np.ndarray):
+        """Write a classified tile to the disk cache via a temp file, so readers never see partial files"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                np.save(f, tile_classes)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache tile {cache_path}: {e}")
+    
     async def get_area_tiles(self, lat: float, lon: float, grid_size: int, 
-                           cell_size_degrees: float = 0.001) -> List[List[np.ndarray]]:
-        """Download tiles for the entire grid area"""
+                           cell_size_degrees: float = 0.001) -> Tuple[Optional[np.ndarray], int, Tuple]:
+        """Download and classify tiles for the entire grid area into one class-id mosaic"""
         
         # Calculate the area bounds
         half_size = grid_size * cell_size_degrees / 2
@@ -114,29 +381,63 @@ class MapTileClassifier:
         # Determine zoom level for good resolution
         zoom = 16  # Good balance between detail and download time
         
-        # Get tile coordinates for corners
-        min_x, max_y = self.deg2num(north, west, zoom)
-        max_x, min_y = self.deg2num(south, east, zoom)
-        
-        # Download all tiles in the area
-        tiles = {}
-        
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for x in range(min_x, max_x + 1):
-                for y in range(min_y, max_y + 1):
-                    task = self.download_tile(session, x, y, zoom)
-                    tasks.append((x, y, task))
-            
-            # Wait for all downloads
-            results = await asyncio.gather(*[task for _, _, task in tasks])
-            
-            # Organize tiles by coordinates
-            for i, (x, y, _) in enumerate(tasks):
-                if results[i] is not None:
-                    tiles[(x, y)] = results[i]
-        
-        return tiles, zoom, (min_x, min_y, max_x, max_y)
+        # Get tile coordinates for corners (tile y grows southwards)
+        min_x, min_y = self.deg2num(north, west, zoom)
+        max_x, max_y = self.deg2num(south, east, zoom)
+        
+        # Class-id mosaic of all tiles in the area, stitched in as they arrive
+        tile_size = self.tile_size
+        mosaic = np.full(((max_y - min_y + 1) * tile_size, (max_x - min_x + 1) * tile_size),
+                         self._missing_tile_id, dtype=np.uint8)
+        tile_count = 0
+        semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_concurrent_downloads,
+                                         ttl_dns_cache=300, keepalive_timeout=60)
+        
+        # Downloads feed a bounded queue of encoded tiles; decode workers drain it into the mosaic
+        queue = asyncio.Queue(maxsize=self.decode_queue_size)
+        
+        def place(x: int, y: int, tile_classes: np.ndarray):
+            nonlocal tile_count
+            row0 = (y - min_y) * tile_size
+            col0 = (x - min_x) * tile_size
+            mosaic[row0:row0 + tile_size, col0:col0 + tile_size] = tile_classes
+            tile_count += 1
+        
+        async def download(x: int, y: int):
+            cache_path = self._tile_cache_path(x, y, zoom)
+            tile_classes = self._load_cached_tile(cache_path)
+            if tile_classes is not None:
+                place(x, y, tile_classes)
+                return
+            payload = await self._fetch_tile(session, x, y, zoom, semaphore)
+            if payload is not None:
+                await queue.put((x, y, cache_path, payload))  # Waits while the decoders are behind
+        
+        async def decode_worker():
+            while True:
+                x, y, cache_path, payload = await queue.get()
+                try:
+                    tile_classes = await self._classify_payload(cache_path, *payload)
+                    if tile_classes is not None:
+                        place(x, y, tile_classes)
+                finally:
+                    queue.task_done()
+        
+        workers = [asyncio.create_task(decode_worker()) for _ in range(self.decode_workers)]
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=TILE_TIMEOUT,
+                                             headers=IMAGE_HEADERS) as session:
+                await asyncio.gather(*(download(x, y) for x in range(min_x, max_x + 1)
+                                       for y in range(min_y, max_y + 1)))
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+        
+        if tile_count == 0:
+            mosaic = None
+        return mosaic, zoom, (min_x, min_y, max_x, max_y)
     
     def classify_pixel_terrain(self, rgb: Tuple[int, int, int]) -> str:
         """Classify a single pixel's terrain type based on RGB values"""
@@ -146,175 +447,370 @@ class MapTileClassifier:
         best_score = 0
         
         for terrain_type, classifier in self.terrain_classifiers.items():
-            for rgb_min, rgb_max in classifier['rgb_ranges']:
-                r_min, g_min, b_min = rgb_min
-                r_max, g_max, b_max = rgb_max
+            rgb_min, rgb_max = classifier['rgb_ranges']
+            r_min, g_min, b_min = rgb_min
+            r_max, g_max, b_max = rgb_max
+            
+            # Check if pixel falls within this range
+            if (r_min <= r <= r_max and 
+                g_min <= g <= g_max and 
+                b_min <= b <= b_max):
                 
-                # Check if pixel falls within this range
-                if (r_min <= r <= r_max and 
-                    g_min <= g <= g_max and 
-                    b_min <= b <= b_max):
-                    
-                    # Calculate confidence score based on how centered the color is
-                    r_center = (r_min + r_max) / 2
-                    g_center = (g_min + g_max) / 2
-                    b_center = (b_min + b_max) / 2
-                    
-                    distance = math.sqrt((r - r_center)**2 + (g - g_center)**2 + (b - b_center)**2)
-                    max_distance = math.sqrt((r_max - r_min)**2 + (g_max - g_min)**2 + (b_max - b_min)**2)
-                    
-                    score = (1 - distance / max_distance) * classifier['priority']
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_match = terrain_type
+                # Calculate confidence score based on how centered the color is
+                r_center = (r_min + r_max) / 2
+                g_center = (g_min + g_max) / 2
+                b_center = (b_min + b_max) / 2
+                
+                distance = math.sqrt((r - r_center)**2 + (g - g_center)**2 + (b - b_center)**2)
+                max_distance = math.sqrt((r_max - r_min)**2 + (g_max - g_min)**2 + (b_max - b_min)**2)
+                
+                score = (1 - distance / max_distance) * classifier['priority']
+                
+                if score > best_score:
+                    best_score = score
+                    best_match = terrain_type
         
         return best_match
     
-    def classify_grid_cell(self, tiles: Dict, zoom: int, tile_bounds: Tuple,
-                          cell_lat: float, cell_lon: float, 
-                          cell_size_degrees: float) -> str:
-        """Classify terrain type for a single grid cell"""
-        
-        # Get tile coordinate for this cell
-        tile_x, tile_y = self.deg2num(cell_lat, cell_lon, zoom)
-        
-        if (tile_x, tile_y) not in tiles:
-            return 'grass'  # Default if no tile available
-        
-        tile_image = tiles[(tile_x, tile_y)]
-        
-        # Calculate pixel coordinates within the tile
-        # Convert cell bounds to tile pixel coordinates
-        north_lat = cell_lat + cell_size_degrees / 2
-        south_lat = cell_lat - cell_size_degrees / 2
-        east_lon = cell_lon + cell_size_degrees / 2
-        west_lon = cell_lon - cell_size_degrees / 2
-        
-        # Get tile boundaries in lat/lon
-        tile_north, tile_west = self.num2deg(tile_x, tile_y, zoom)
-        tile_south, tile_east = self.num2deg(tile_x + 1, tile_y + 1, zoom)
-        
-        # Calculate pixel boundaries within the tile
-        x_min = max(0, int((west_lon - tile_west) / (tile_east - tile_west) * self.tile_size))
-        x_max = min(self.tile_size, int((east_lon - tile_west) / (tile_east - tile_west) * self.tile_size))
-        y_min = max(0, int((tile_north - north_lat) / (tile_north - tile_south) * self.tile_size))
-        y_max = min(self.tile_size, int((tile_north - south_lat) / (tile_north - tile_south) * self.tile_size))
-        
-        if x_max <= x_min or y_max <= y_min:
-            return 'grass'  # Default if invalid bounds
-        
-        # Sample pixels from the cell area
-        cell_pixels = tile_image[y_min:y_max, x_min:x_max]
-        
-        if cell_pixels.size == 0:
-            return 'grass'
-        
-        # Classify based on dominant terrain type in the cell
-        terrain_votes = {}
+    def classify_tile_array(self, tile_rgb: np.ndarray) -> np.ndarray:
+        """Classify every pixel of an (H, W, 3) RGB tile, returns an (H, W) uint8 class-id raster"""
+        if NUMBA_AVAILABLE:
+            with JIT_LOCK:
+                return _classify_rgb_tile(np.asarray(tile_rgb, dtype=np.uint8), self._range_min,
+                                          self._range_max, self._range_centers, self._range_max_distances,
+                                          self._priorities, self._class_ids['grass'])
+        
+        # Pixels inside a single range take that class outright; a class's score never drops to zero
+        # inside its own range, so only pixels matching several ranges need scoring
+        masks = (self._channel_class_bits[0][tile_rgb[..., 0]] &
+                 self._channel_class_bits[1][tile_rgb[..., 1]] &
+                 self._channel_class_bits[2][tile_rgb[..., 2]])
+        class_ids = self._class_bits_lut[masks]
+        
+        ambiguous = np.flatnonzero(class_ids == _AMBIGUOUS_CLASS)
+        if ambiguous.size:
+            class_ids.flat[ambiguous] = self._score_pixels(tile_rgb.reshape(-1, 3)[ambiguous])
+        return class_ids
+    
+    def _score_pixels(self, pixels: np.ndarray) -> np.ndarray:
+        """classify_pixel_terrain scoring for an (N, 3) array of RGB pixels"""
+        r = pixels[:, 0].astype(np.float32)
+        g = pixels[:, 1].astype(np.float32)
+        b = pixels[:, 2].astype(np.float32)
         
-        # Sample pixels (downsample if too many)
-        sample_step = max(1, cell_pixels.shape[0] // 10)  # Sample up to 100 pixels
+        class_ids = np.full(len(pixels), self._class_ids['grass'], dtype=np.uint8)  # Default
+        best_score = np.zeros(len(pixels), dtype=np.float32)
         
-        for y in range(0, cell_pixels.shape[0], sample_step):
-            for x in range(0, cell_pixels.shape[1], sample_step):
-                pixel_rgb = tuple(cell_pixels[y, x])
-                terrain = self.classify_pixel_terrain(pixel_rgb)
-                terrain_votes[terrain] = terrain_votes.get(terrain, 0) + 1
+        for terrain_type, classifier in self.terrain_classifiers.items():
+            rgb_min, rgb_max = classifier['rgb_ranges']
+            r_min, g_min, b_min = rgb_min
+            r_max, g_max, b_max = rgb_max
+            
+            in_range = ((r >= r_min) & (r <= r_max) &
+                        (g >= g_min) & (g <= g_max) &
+                        (b >= b_min) & (b <= b_max))
+            if not in_range.any():
+                continue
+            
+            distance = np.sqrt((r - (r_min + r_max) / 2) ** 2 +
+                               (g - (g_min + g_max) / 2) ** 2 +
+                               (b - (b_min + b_max) / 2) ** 2)
+            max_distance = math.sqrt((r_max - r_min)**2 + (g_max - g_min)**2 + (b_max - b_min)**2)
+            score = (1 - distance / max_distance) * classifier['priority']
+            
+            better = in_range & (score > best_score)
+            best_score[better] = score[better]
+            class_ids[better] = self._class_ids[terrain_type]
         
-        # Return the most common terrain type
-        if terrain_votes:
-            return max(terrain_votes, key=terrain_votes.get)
-        else:
-            return 'grass'
+        return class_ids
+    
+    def classify_grid_cell(self, mosaic: np.ndarray, zoom: int, tile_bounds: Tuple,
+                          cell_lat: float, cell_lon: float, 
+                          cell_size_degrees: float) -> str:
+        """Classify terrain type for a single grid cell from the area's class-id mosaic"""
+        return self.make_cell_classifier(mosaic, zoom, tile_bounds, cell_size_degrees)(cell_lat, cell_lon)
+    
+    def make_cell_classifier(self, mosaic: np.ndarray, zoom: int, tile_bounds: Tuple,
+                             cell_size_degrees: float) -> Callable[[float, float], str]:
+        """Build a classify_grid_cell specialized to one mosaic, for repeated (cell_lat, cell_lon) lookups"""
+        n = 2.0 ** zoom
+        half_cell = cell_size_degrees / 2
+        tile_size = self.tile_size
+        min_x, min_y, max_x, max_y = tile_bounds
+        missing_tile_id = self._missing_tile_id
+        names = self._id_to_name
+        
+        def classify(cell_lat: float, cell_lon: float) -> str:
+            # Get tile coordinate for this cell
+            tile_x = int((cell_lon + 180.0) / 360.0 * n)
+            tile_y = int((1.0 - math.asinh(math.tan(math.radians(cell_lat))) / math.pi) / 2.0 * n)
+            
+            if not (min_x <= tile_x <= max_x and min_y <= tile_y <= max_y):
+                return 'grass'  # Default if no tile available
+            
+            # Pixel boundaries of the cell within its tile
+            tile_north, tile_west, tile_south, tile_east = _tile_box(tile_x, tile_y, zoom)
+            x_min = max(0, int((cell_lon - half_cell - tile_west) / (tile_east - tile_west) * tile_size))
+            x_max = min(tile_size, int((cell_lon + half_cell - tile_west) / (tile_east - tile_west) * tile_size))
+            y_min = max(0, int((tile_north - (cell_lat + half_cell)) / (tile_north - tile_south) * tile_size))
+            y_max = min(tile_size, int((tile_north - (cell_lat - half_cell)) / (tile_north - tile_south) * tile_size))
+            
+            if x_max <= x_min or y_max <= y_min:
+                return 'grass'  # Default if invalid bounds
+            
+            # Dominant terrain type among the cell's pixels
+            row0 = (tile_y - min_y) * tile_size
+            col0 = (tile_x - min_x) * tile_size
+            cell_classes = mosaic[row0 + y_min:row0 + y_max, col0 + x_min:col0 + x_max]
+            class_id = np.bincount(cell_classes.ravel(), minlength=missing_tile_id + 1).argmax()
+            if class_id == missing_tile_id:
+                return 'grass'
+            return names[class_id]
+        
+        return classify
     
     async def classify_grid_area(self, lat: float, lon: float, grid_size: int = 50,
                                cell_size_degrees: float = 0.001) -> List[List[Dict]]:
-        """Classify terrain for an entire grid area"""
+        """Classify terrain for an entire grid area, as one dict per cell"""
+        grid = await self.classify_grid_arrays(lat, lon, grid_size, cell_size_degrees)
+        return self.grid_to_cells(grid)
+    
+    async def classify_grid_arrays(self, lat: float, lon: float, grid_size: int = 50,
+                                   cell_size_degrees: float = 0.001) -> Dict[str, np.ndarray]:
+        """
+        Classify terrain for an entire grid area as arrays: 'terrain_id' (grid_size x grid_size
+        class ids), 'lats' and 'lons' (cell centers per row / column), and 'names' and 'colors'
+        indexed by id
+        """
         
         logger.info(f"Starting grid classification for {grid_size}x{grid_size} grid at {lat}, {lon}")
         
-        # Download tiles for the area
-        tiles, zoom, tile_bounds = await self.get_area_tiles(lat, lon, grid_size, cell_size_degrees)
+        # Cell centers: latitude varies by row and longitude by column
+        offsets = (np.arange(grid_size) + 0.5) * cell_size_degrees - grid_size * cell_size_degrees / 2
+        row_lats = lat + offsets
+        col_lons = lon + offsets
         
-        if not tiles:
-            logger.warning("No tiles downloaded, using synthetic terrain")
-            return self._generate_synthetic_grid(grid_size)
+        # Single WorldCover image for the whole area, map tiles as a fallback
+        class_ids = await self.classify_grid_worldcover(lat, lon, grid_size, cell_size_degrees)
         
-        # Classify each grid cell
-        grid_classification = []
+        if class_ids is None:
+            mosaic, zoom, tile_bounds = await self.get_area_tiles(lat, lon, grid_size, cell_size_degrees)
+            
+            if mosaic is None:
+                logger.warning("No tiles downloaded, using synthetic terrain")
+                return self._generate_synthetic_grid(grid_size)
+            
+            class_ids = self._classify_cells(mosaic, zoom, tile_bounds, row_lats, col_lons,
+                                             cell_size_degrees)
         
-        for row in range(grid_size):
-            grid_row = []
-            for col in range(grid_size):
-                # Calculate cell center coordinates
-                cell_lat = lat - (grid_size * cell_size_degrees / 2) + (row + 0.5) * cell_size_degrees
-                cell_lon = lon - (grid_size * cell_size_degrees / 2) + (col + 0.5) * cell_size_degrees
-                
-                # Classify the cell
-                terrain_type = self.classify_grid_cell(tiles, zoom, tile_bounds, 
-                                                     cell_lat, cell_lon, cell_size_degrees)
-                
-                cell_data = {
-                    'terrain_type': terrain_type,
-                    'color': self.legend_colors[terrain_type],
+        logger.info(f"Grid classification completed")
+        return self._grid_arrays(class_ids, row_lats, col_lons)
+    
+    def _grid_arrays(self, class_ids: np.ndarray, row_lats: np.ndarray,
+                     col_lons: np.ndarray) -> Dict[str, np.ndarray]:
+        """Bundle a class-id grid with its coordinates and the per-id name/color tables"""
+        return {
+            'terrain_id': class_ids,
+            'lats': row_lats,
+            'lons': col_lons,
+            'names': np.array(self._id_to_name),
+            'colors': np.array([self.legend_colors[name] for name in self._id_to_name])
+        }
+    
+    def grid_to_cells(self, grid: Dict[str, np.ndarray]) -> List[List[Dict]]:
+        """Expand classify_grid_arrays output into the per-cell dicts served by the API"""
+        names = grid['names'].tolist()
+        colors = grid['colors'].tolist()
+        lat_values = grid['lats'].tolist()
+        lon_values = grid['lons'].tolist()
+        
+        grid_classification = []
+        for row, row_ids in enumerate(grid['terrain_id'].tolist()):
+            grid_classification.append([
+                {
+                    'terrain_type': names[class_id],
+                    'color': colors[class_id],
                     'row': row,
                     'col': col,
-                    'lat': cell_lat,
-                    'lon': cell_lon
+                    'lat': lat_values[row],
+                    'lon': lon_values[col]
                 }
-                
-                grid_row.append(cell_data)
-            
-            grid_classification.append(grid_row)
-            
-            # Log progress
-            if (row + 1) % 10 == 0:
-                logger.info(f"Classified {row + 1}/{grid_size} rows")
+                for col, class_id in enumerate(row_ids)
+            ])
         
-        logger.info(f"Grid classification completed")
         return grid_classification
     
-    def _generate_synthetic_grid(self, grid_size: int) -> List[List[Dict]]:
+    async def fetch_worldcover_bbox(self, session: aiohttp.ClientSession, north: float, south: float,
+                                    east: float, west: float, width: int, height: int) -> Optional[np.ndarray]:
+        """Fetch one WorldCover WMS image for a bounding box, returns its (height, width) class-id raster"""
+        params = {
+            'SERVICE': 'WMS',
+            'VERSION': '1.1.1',
+            'REQUEST': 'GetMap',
+            'LAYERS': self.worldcover_layer,
+            'STYLES': '',
+            'SRS': 'EPSG:4326',
+            'BBOX': f"{west},{south},{east},{north}",
+            'WIDTH': str(width),
+            'HEIGHT': str(height),
+            'FORMAT': 'image/png'
+        }
+        
+        try:
+            async with session.get(self.worldcover_wms_url, params=params) as response:
+                if response.status != 200 or response.content_type != 'image/png':
+                    logger.warning(f"WorldCover request failed: {response.status} {response.content_type}")
+                    return None
+                image_data = await response.read()
+            
+            return await asyncio.get_running_loop().run_in_executor(self._decode_executor, self._classify_worldcover_image, image_data)
+        
+        except Exception as e:
+            logger.error(f"Error fetching WorldCover image: {e}")
+            return None
+    
+    def _classify_worldcover_image(self, image_data: bytes) -> np.ndarray:
+        """Map WorldCover legend colors to class ids; unknown colors become grass"""
+        image = Image.open(io.BytesIO(image_data))
+        if image.mode == 'P':
+            # Classify the palette once, then index it per pixel
+            palette = np.zeros((256, 3), dtype=np.uint8)
+            colors = np.asarray(image.getpalette() or [], dtype=np.uint8).reshape(-1, 3)[:256]
+            palette[:len(colors)] = colors
+            return self._worldcover_rgb_to_ids(palette)[np.asarray(image, dtype=np.uint8)]
+        
+        rgb = np.asarray(image if image.mode == 'RGB' else image.convert('RGB'))
+        return self._worldcover_rgb_to_ids(rgb.reshape(-1, 3)).reshape(rgb.shape[:2])
+    
+    def _worldcover_rgb_to_ids(self, rgb: np.ndarray) -> np.ndarray:
+        """Class ids for an (N, 3) array of WorldCover legend colors"""
+        rgb = rgb.astype(np.int64)
+        codes = (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+        slot = np.minimum(np.searchsorted(self._worldcover_codes, codes), len(self._worldcover_codes) - 1)
+        return np.where(self._worldcover_codes[slot] == codes, self._worldcover_ids[slot],
+                        self._class_ids['grass']).astype(np.uint8)
+    
+    async def classify_grid_worldcover(self, lat: float, lon: float, grid_size: int,
+                                       cell_size_degrees: float) -> Optional[np.ndarray]:
+        """Dominant WorldCover class id per grid cell from a single WMS request, or None if it fails"""
+        half_size = grid_size * cell_size_degrees / 2
+        pixels_per_cell = self.worldcover_pixels_per_cell
+        size = grid_size * pixels_per_cell
+        
+        async with aiohttp.ClientSession(timeout=WORLDCOVER_TIMEOUT, headers=IMAGE_HEADERS) as session:
+            image_classes = await self.fetch_worldcover_bbox(session, lat + half_size, lat - half_size,
+                                                             lon + half_size, lon - half_size, size, size)
+        if image_classes is None or image_classes.shape != (size, size):
+            return None
+        
+        # Every cell is a pixels_per_cell x pixels_per_cell block; image rows run north to south
+        return self._block_mode(image_classes, pixels_per_cell)[::-1]
+    
+    def _block_mode(self, classes: np.ndarray, block_size: int) -> np.ndarray:
+        """Most common class id in each block_size x block_size block of a class-id raster"""
+        rows, cols = classes.shape[0] // block_size, classes.shape[1] // block_size
+        num_classes = len(self._id_to_name)
+        blocks = classes[:rows * block_size, :cols * block_size].reshape(rows, block_size, cols, block_size)
+        
+        # Label each pixel with (block, class) in place of the blocks, then count all labels at once
+        block_index = np.arange(rows * cols).reshape(rows, 1, cols, 1) * num_classes
+        votes = np.bincount((block_index + blocks).ravel(), minlength=rows * cols * num_classes)
+        return votes.reshape(rows, cols, num_classes).argmax(axis=2).astype(np.uint8)
+    
+    def _cell_pixel_spans(self, centers: np.ndarray, half_cell: float,
+                          tile_start: np.ndarray, tile_end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Pixel [start, end) span of each cell along one axis, clipped to the tile holding its center"""
+        tile_extent = tile_end - tile_start
+        start = ((centers - half_cell - tile_start) / tile_extent * self.tile_size).astype(np.int64)
+        end = ((centers + half_cell - tile_start) / tile_extent * self.tile_size).astype(np.int64)
+        return np.maximum(0, start), np.minimum(self.tile_size, end)
+    
+    def _classify_cells(self, mosaic: np.ndarray, zoom: int, tile_bounds: Tuple,
+                        row_lats: np.ndarray, col_lons: np.ndarray,
+                        cell_size_degrees: float) -> np.ndarray:
+        """Dominant class id of every grid cell, computed with one bincount per mosaic tile row"""
+        n = 2.0 ** zoom
+        half_cell = cell_size_degrees / 2
+        min_x, min_y = tile_bounds[:2]
+        tile_size = self.tile_size
+        
+        # Tile holding each cell center (deg2num); columns only depend on longitude, rows on latitude
+        tile_xs = ((col_lons + 180.0) / 360.0 * n).astype(np.int64)
+        tile_ys = ((1.0 - np.arcsinh(np.tan(np.radians(row_lats))) / np.pi) / 2.0 * n).astype(np.int64)
+        
+        # Tile bounds (num2deg); pixel rows count down from the tile's north edge
+        tile_west = tile_xs / n * 360.0 - 180.0
+        tile_east = (tile_xs + 1) / n * 360.0 - 180.0
+        tile_north = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * tile_ys / n))))
+        tile_south = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (tile_ys + 1) / n))))
+        
+        x_min, x_max = self._cell_pixel_spans(col_lons, half_cell, tile_west, tile_east)
+        y_min, y_max = self._cell_pixel_spans(-row_lats, half_cell, -tile_north, -tile_south)
+        
+        # Column spans in mosaic pixels, still clipped to the tile holding each cell center
+        mosaic_rows, mosaic_cols = mosaic.shape
+        col_offset = (tile_xs - min_x) * tile_size
+        cols = np.flatnonzero((x_max > x_min) & (col_offset >= 0) & (col_offset < mosaic_cols))
+        cols = cols[np.argsort(col_offset[cols] + x_min[cols], kind='stable')]
+        col_start = (col_offset + x_min)[cols]
+        col_end = (col_offset + x_max)[cols]
+        
+        class_ids = np.full((len(row_lats), len(col_lons)), self._class_ids['grass'], dtype=np.uint8)
+        if cols.size == 0:
+            return class_ids
+        
+        pixels = np.arange(mosaic_cols)
+        col_index = np.searchsorted(col_end, pixels, side='right')
+        col_outside = (col_index >= cols.size) | (pixels < col_start[np.minimum(col_index, cols.size - 1)])
+        
+        # Missing tiles vote for an extra label, which falls back to grass
+        num_labels = self._missing_tile_id + 1
+        pixels = np.arange(tile_size)
+        
+        for band in range(mosaic_rows // tile_size):
+            rows = np.flatnonzero((tile_ys == min_y + band) & (y_max > y_min))
+            if rows.size == 0:
+                continue
+            
+            # Rows run south to north, pixel rows north to south
+            rows = rows[np.argsort(y_min[rows], kind='stable')]
+            
+            # Code every band pixel as (cell, label); pixels outside all cell boxes land past the last cell
+            num_bins = rows.size * cols.size * num_labels
+            col_code = np.where(col_outside, num_bins, col_index * num_labels)
+            row_code = np.searchsorted(y_max[rows], pixels, side='right')
+            row_outside = (row_code >= rows.size) | (pixels < y_min[rows][np.minimum(row_code, rows.size - 1)])
+            row_code = np.where(row_outside, num_bins, row_code * cols.size * num_labels)
+            
+            band_classes = mosaic[band * tile_size:(band + 1) * tile_size]
+            codes = row_code[:, None] + col_code[None, :] + band_classes
+            votes = np.bincount(codes.ravel(), minlength=num_bins)[:num_bins]
+            winners = votes.reshape(rows.size, cols.size, num_labels).argmax(axis=2)
+            winners[winners == self._missing_tile_id] = self._class_ids['grass']
+            class_ids[np.ix_(rows, cols)] = winners
+        
+        return class_ids
+    
+    def _generate_synthetic_grid(self, grid_size: int) -> Dict[str, np.ndarray]:
         """Generate synthetic terrain grid as fallback"""
         
         logger.info("Generating synthetic terrain grid")
         
-        grid = []
-        center = grid_size // 2
+        offsets = np.arange(grid_size) - grid_size // 2
         
-        for row in range(grid_size):
-            grid_row = []
-            for col in range(grid_size):
-                # Distance from center
-                dist = math.sqrt((row - center)**2 + (col - center)**2)
-                
-                # Generate terrain based on patterns
-                rand = np.random.random()
-                
-                if rand < 0.1:
-                    terrain_type = 'water'
-                elif dist < grid_size * 0.15 and rand < 0.3:
-                    terrain_type = 'urban'
-                elif rand < 0.4:
-                    terrain_type = 'forest'
-                elif rand < 0.6:
-                    terrain_type = 'agriculture'
-                elif rand < 0.8:
-                    terrain_type = 'grass'
-                else:
-                    terrain_type = 'shrub'
-                
-                cell_data = {
-                    'terrain_type': terrain_type,
-                    'color': self.legend_colors[terrain_type],
-                    'row': row,
-                    'col': col,
-                    'lat': 0,  # Placeholder
-                    'lon': 0   # Placeholder
-                }
-                
-                grid_row.append(cell_data)
-            grid.append(grid_row)
+        # Distance from center, broadcast from the row and column offsets
+        dist = np.hypot(offsets[:, np.newaxis], offsets[np.newaxis, :])
+        
+        # Generate terrain based on patterns
+        rand = np.random.random((grid_size, grid_size))
+        
+        ids = self._class_ids
+        class_ids = np.select(
+            [rand < 0.1, (dist < grid_size * 0.15) & (rand < 0.3), rand < 0.4, rand < 0.6, rand < 0.8],
+            [ids['water'], ids['urban'], ids['forest'], ids['agriculture'], ids['grass']],
+            default=ids['shrub']
+        ).astype(np.uint8)
         
-        return grid
+        # Synthetic cells carry placeholder coordinates
+        placeholder = np.zeros(grid_size)
+        return self._grid_arrays(class_ids, placeholder, placeholder)
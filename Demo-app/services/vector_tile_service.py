@@ -9,22 +9,144 @@ import requests
 import json
 import math
 import sqlite3
-import geopandas as gpd
-from shapely.geometry import Point, Polygon, box
 from typing import Tuple, Dict, List, Optional, Any
 import asyncio
 import aiohttp
 import tempfile
 import os
+import time
+import hashlib
+import zlib
+import weakref
+from collections import Counter, OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
 logger = logging.getLogger(__name__)
 
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+OVERPASS_TIMEOUT = aiohttp.ClientTimeout(total=30)
+OVERPASS_CACHE_SIZE = 32  # Overpass responses kept in memory, keyed by bbox
+OVERPASS_CACHE_MAX_AGE = 7 * 24 * 3600  # Seconds before an on-disk response is fetched again
+OVERPASS_BBOX_STEP = 1e-4  # Query bboxes are widened to this grid so nearby requests share cache rows
+OVERPASS_TILE_DEGREES = 0.05  # Larger areas are fetched as a grid of subregions of about this size
+OVERPASS_CONCURRENCY = 2  # The public endpoint serializes requests per IP
+_ELEMENT_TYPE_ORDER = {'node': 0, 'way': 1, 'relation': 2}  # Overpass output order
+TERRAIN_PROPERTY_FIELDS = ('flammability', 'burn_rate', 'moisture_retention', 'wind_resistance')
+
+try:
+    import shapely
+    SHAPELY_AVAILABLE = True
+except ImportError:
+    SHAPELY_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    from services.jit_lock import JIT_LOCK
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def _point_in_polygon(x, y, xs, ys, start, end):
+        """Ray casting test of (x, y) against the polygon with vertices xs[start:end], ys[start:end]"""
+        n = end - start
+        inside = False
+        
+        p1x, p1y = xs[start], ys[start]
+        for i in range(1, n + 1):
+            p2x, p2y = xs[start + i % n], ys[start + i % n]
+            if min(p1y, p2y) < y <= max(p1y, p2y) and x <= max(p1x, p2x):
+                # p1y != p2y here, a horizontal edge cannot pass the test above
+                if p1x == p2x or x <= (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x:
+                    inside = not inside
+            p1x, p1y = p2x, p2y
+        
+        return inside
+    
+    @njit(cache=True)
+    def _best_feature(x, y, xs, ys, offsets, priorities):
+        """Index of the highest priority polygon holding (x, y), the earliest on ties, or -1"""
+        best, best_priority = -1, 0
+        top_priority = priorities.max() if priorities.shape[0] else 0
+        for k in range(offsets.shape[0] - 1):
+            if priorities[k] > best_priority and _point_in_polygon(x, y, xs, ys, offsets[k], offsets[k + 1]):
+                best, best_priority = k, priorities[k]
+                if best_priority >= top_priority:
+                    break  # Nothing later can outrank it
+        return best
+    
+    @njit(parallel=True, cache=True)
+    def _classify_cell_grid(cell_xs, cell_ys, xs, ys, offsets, priorities, bounds):
+        """
+        _best_feature for every cell of the (len(cell_ys), len(cell_xs)) grid, rows spread across
+        threads. A cell outside a feature's bbox gets no ray crossings, so bboxes prune exactly
+        """
+        n_rows, n_cols, n_features = cell_ys.shape[0], cell_xs.shape[0], priorities.shape[0]
+        best = np.full((n_rows, n_cols), -1, dtype=np.int64)
+        top_priority = priorities.max() if n_features else 0
+        
+        for row in prange(n_rows):
+            y = cell_ys[row]
+            row_features = np.empty(n_features, dtype=np.int64)
+            count = 0
+            for k in range(n_features):
+                if bounds[k, 2] < y <= bounds[k, 3]:
+                    row_features[count] = k
+                    count += 1
+            
+            for col in range(n_cols):
+                x = cell_xs[col]
+                best_k, best_priority = -1, 0
+                for i in range(count):
+                    k = row_features[i]
+                    if (priorities[k] > best_priority and bounds[k, 0] <= x <= bounds[k, 1] and
+                            _point_in_polygon(x, y, xs, ys, offsets[k], offsets[k + 1])):
+                        best_k, best_priority = k, priorities[k]
+                        if best_priority >= top_priority:
+                            break
+                best[row, col] = best_k
+        
+        return best
+
+def _loads_json(payload) -> Any:
+    """Decode JSON text or bytes, with orjson when it is installed"""
+    return orjson.loads(payload) if ORJSON_AVAILABLE else json.loads(payload)
+
 class VectorTileClassifier:
     """Classifies terrain types from OSM vector tile data"""
     
-    def __init__(self):
+    # Shared across instances: one keep-alive session per event loop and recent Overpass responses
+    _sessions = weakref.WeakKeyDictionary()
+    _overpass_cache = OrderedDict()
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        # Overpass responses are cached on disk in SQLite, keyed by the query
+        cache_dir = cache_dir or os.path.join(os.path.expanduser('~'), '.cache', 'fire-sim')
+        self.overpass_cache_path = os.path.join(cache_dir, 'overpass_cache.sqlite')
+        
         # OSM landuse/landcover to our terrain type mapping
         self.osm_terrain_mapping = {
             # Forest and natural areas
@@ -102,6 +224,12 @@ class VectorTileClassifier:
             'unknown': 1
         }
         
+        # Integer terrain ids, for classifying whole grids as arrays
+        self._terrain_names = list(self.terrain_priority.keys())
+        self._terrain_ids = {name: i for i, name in enumerate(self._terrain_names)}
+        self._burn_state_names = ('unburned', 'burning', 'burned', 'ash')
+        self._prepared_osm = None  # (osm_data, features) of the last response parsed
+        
         # Color scheme for visualization
         self.terrain_colors = {
             'forest': '#228B22',      # Forest green
@@ -179,6 +307,18 @@ class VectorTileClassifier:
                 'wind_resistance': 0.5
             }
         }
+        
+        # Terrain properties as a (field, terrain id) float32 table, rows in TERRAIN_PROPERTY_FIELDS order,
+        # so array consumers gather a whole property grid with table[field][terrain_id]
+        id_properties = [self.terrain_properties.get(name, self.terrain_properties['unknown'])
+                         for name in self._terrain_names]
+        self.terrain_property_table = np.array([
+            [properties[field] for properties in id_properties] for field in TERRAIN_PROPERTY_FIELDS
+        ], dtype=np.float32)
+        
+        # Initial moisture per terrain id, matching the engine's float64 cell arrays
+        self._moisture_lut = np.array([properties['moisture_retention'] for properties in id_properties],
+                                      dtype=np.float64)
     
     def deg2num(self, lat_deg: float, lon_deg: float, zoom: int) -> Tuple[int, int]:
         """Convert lat/lon to tile coordinates"""
@@ -202,10 +342,44 @@ class VectorTileClassifier:
         south, east = self.num2deg(x + 1, y + 1, zoom)
         return (north, south, east, west)
     
+    @classmethod
+    def get_session(cls) -> aiohttp.ClientSession:
+        """Return the pooled Overpass session for the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        session = cls._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=8, keepalive_timeout=60)
+            session = aiohttp.ClientSession(connector=connector, timeout=OVERPASS_TIMEOUT)
+            cls._sessions[loop] = session
+        return session
+    
+    @classmethod
+    async def close_session(cls):
+        """Close the pooled session of the running event loop"""
+        session = cls._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+    
+    def cell_centers(self, lat: float, lon: float, grid_size: int,
+                     cell_size_degrees: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Cell center latitudes (by row) and longitudes (by column) of a grid centered on lat/lon"""
+        steps = (np.arange(grid_size) + 0.5) * cell_size_degrees
+        half_size = grid_size * cell_size_degrees / 2
+        return lat - half_size + steps, lon - half_size + steps
+    
     async def download_overpass_data(self, session: aiohttp.ClientSession, 
                                    bbox: Tuple[float, float, float, float]) -> Optional[Dict]:
-        """Download OSM data using Overpass API for a bounding box"""
-        north, south, east, west = bbox
+        """Download OSM data using Overpass API for a bounding box, reusing recent responses"""
+        # Widening to the step grid keeps the query covering the requested area
+        north, east = (math.ceil(value / OVERPASS_BBOX_STEP - 1e-6) * OVERPASS_BBOX_STEP for value in bbox[0::2])
+        south, west = (math.floor(value / OVERPASS_BBOX_STEP + 1e-6) * OVERPASS_BBOX_STEP for value in bbox[1::2])
+        north, south, east, west = (round(value, 6) for value in (north, south, east, west))
+        
+        key = (north, south, east, west)
+        cache = self._overpass_cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
         
         # Overpass query for landuse, natural, water, and building data
         overpass_query = f"""
@@ -222,20 +396,257 @@ class VectorTileClassifier:
         );
         out geom;
         """
+        query_hash = hashlib.sha1(overpass_query.encode()).hexdigest()
+        loop = asyncio.get_running_loop()
         
         try:
-            url = "https://overpass-api.de/api/interpreter"
-            async with session.post(url, data=overpass_query) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                else:
-                    logger.warning(f"Overpass API request failed: {response.status}")
-                    return None
+            payload = await loop.run_in_executor(None, self._load_cached_overpass, query_hash)
+            if payload is not None:
+                data = _loads_json(payload)
+            else:
+                # An earlier, larger download may already hold every feature of this area
+                data = await loop.run_in_executor(None, self._load_indexed_features, key)
+            
+            if data is None:
+                async with session.post(OVERPASS_URL, data=overpass_query) as response:
+                    if response.status != 200:
+                        logger.warning(f"Overpass API request failed: {response.status}")
+                        return None
+                    data, codec, blob = await self._read_overpass_response(response)
+                await loop.run_in_executor(None, self._save_cached_overpass, query_hash, key, codec, blob)
+                await loop.run_in_executor(None, self._index_osm_features, query_hash, key, data)
+            
+            cache[key] = data
+            if len(cache) > OVERPASS_CACHE_SIZE:
+                cache.popitem(last=False)
+            return data
         except Exception as e:
             logger.error(f"Error fetching Overpass data: {e}")
             return None
     
+    async def _read_overpass_response(self, response: aiohttp.ClientResponse) -> Tuple[Dict, str, bytes]:
+        """
+        Decode an Overpass response and compress it for the cache as it downloads, so the raw JSON
+        is never held whole when ijson is installed; returns (data, codec, compressed payload)
+        """
+        if ZSTD_AVAILABLE:
+            codec, compressor = 'zstd', zstandard.ZstdCompressor(level=3).compressobj()
+        else:
+            codec, compressor = 'zlib', zlib.compressobj(6)
+        
+        blob = []
+        if IJSON_AVAILABLE:
+            # Elements are parsed chunk by chunk while the rest of the body is still arriving
+            items = ijson.sendable_list()
+            parser = ijson.items_coro(items, 'elements.item', use_float=True)
+            elements = []
+            async for chunk in response.content.iter_chunked(64 << 10):
+                blob.append(compressor.compress(chunk))
+                parser.send(chunk)
+                elements.extend(items)
+                del items[:]
+            parser.close()
+            elements.extend(items)
+            data = {'elements': elements}
+        else:
+            payload = await response.read()
+            blob.append(compressor.compress(payload))
+            data = _loads_json(payload)
+        
+        blob.append(compressor.flush())
+        return data, codec, b''.join(blob)
+    
+    def _open_overpass_cache(self) -> sqlite3.Connection:
+        """Open the Overpass cache database in WAL mode, so several processes can read while one writes"""
+        os.makedirs(os.path.dirname(self.overpass_cache_path), exist_ok=True)
+        conn = sqlite3.connect(self.overpass_cache_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS overpass_cache (
+                query_hash TEXT PRIMARY KEY,
+                bbox TEXT NOT NULL,
+                fetched_at INTEGER NOT NULL,
+                codec TEXT NOT NULL,
+                payload BLOB NOT NULL
+            )
+        """)
+        
+        # Feature index: polygons of every downloaded area, searchable by bbox through an R*Tree
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS osm_areas (
+                query_hash TEXT PRIMARY KEY,
+                north REAL NOT NULL, south REAL NOT NULL, east REAL NOT NULL, west REAL NOT NULL,
+                fetched_at INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS osm_features (
+                id INTEGER PRIMARY KEY,
+                tags TEXT NOT NULL,
+                geometry BLOB NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS osm_feature_rtree
+            USING rtree(id, min_lon, max_lon, min_lat, max_lat)
+        """)
+        return conn
+    
+    def _load_cached_overpass(self, query_hash: str) -> Optional[bytes]:
+        """Raw JSON of a cached Overpass response, None if it is missing, stale or unreadable"""
+        try:
+            conn = self._open_overpass_cache()
+            try:
+                row = conn.execute(
+                    "SELECT codec, payload FROM overpass_cache WHERE query_hash = ? AND fetched_at >= ?",
+                    (query_hash, int(time.time()) - OVERPASS_CACHE_MAX_AGE)
+                ).fetchone()
+            finally:
+                conn.close()
+            if row is None:
+                return None
+            
+            codec, payload = row
+            if codec == 'zstd':
+                if not ZSTD_AVAILABLE:
+                    return None
+                # Streamed frames carry no content size, which one-shot decompress() requires
+                return zstandard.ZstdDecompressor().decompressobj().decompress(payload)
+            return zlib.decompress(payload)
+        except (sqlite3.Error, OSError, zlib.error) as e:
+            logger.warning(f"Ignoring Overpass cache entry {query_hash}: {e}")
+            return None
+    
+    def _save_cached_overpass(self, query_hash: str, bbox: Tuple[float, float, float, float],
+                              codec: str, blob: bytes):
+        """Store a compressed Overpass response in the cache database"""
+        try:
+            conn = self._open_overpass_cache()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO overpass_cache VALUES (?, ?, ?, ?, ?)",
+                        (query_hash, ','.join(map(str, bbox)), int(time.time()), codec, blob)
+                    )
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not cache Overpass response {query_hash}: {e}")
+    
+    def _index_osm_features(self, query_hash: str, bbox: Tuple[float, float, float, float], osm_data: Dict):
+        """Store the polygons of a downloaded area in the feature index, in one transaction"""
+        features, bounds = [], []
+        for element in osm_data.get('elements', []):
+            geometry = element.get('geometry')
+            if not geometry or len(geometry) < 3 or element.get('type') not in _ELEMENT_TYPE_ORDER:
+                continue
+            
+            # Row ids encode (type, id), so features shared by overlapping areas are stored once
+            row_id = element['id'] * 4 + _ELEMENT_TYPE_ORDER[element['type']]
+            coords = np.array([(node['lon'], node['lat']) for node in geometry], dtype=np.float64)
+            lon_min, lat_min = coords.min(axis=0).tolist()
+            lon_max, lat_max = coords.max(axis=0).tolist()
+            features.append((row_id, json.dumps(element.get('tags', {})), coords.tobytes()))
+            bounds.append((row_id, lon_min, lon_max, lat_min, lat_max))
+        
+        # Bulk-loading in spatial order keeps R*Tree node splits cheap
+        bounds.sort(key=lambda row: (row[1], row[3]))
+        try:
+            conn = self._open_overpass_cache()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO osm_features VALUES (?, ?, ?)", features)
+                    conn.executemany("INSERT OR REPLACE INTO osm_feature_rtree VALUES (?, ?, ?, ?, ?)", bounds)
+                    conn.execute("INSERT OR REPLACE INTO osm_areas VALUES (?, ?, ?, ?, ?, ?)",
+                                 (query_hash, *bbox, int(time.time())))
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not index OSM features of {query_hash}: {e}")
+    
+    def _load_indexed_features(self, bbox: Tuple[float, float, float, float]) -> Optional[Dict]:
+        """
+        Overpass-shaped data for a bbox from the feature index, None unless a fresh
+        indexed area covers the whole bbox
+        """
+        north, south, east, west = bbox
+        try:
+            conn = self._open_overpass_cache()
+            try:
+                covered = conn.execute(
+                    "SELECT 1 FROM osm_areas WHERE north >= ? AND south <= ? AND east >= ? AND west <= ? "
+                    "AND fetched_at >= ? LIMIT 1",
+                    (north, south, east, west, int(time.time()) - OVERPASS_CACHE_MAX_AGE)
+                ).fetchone()
+                if covered is None:
+                    return None
+                rows = conn.execute(
+                    "SELECT f.id, f.tags, f.geometry FROM osm_feature_rtree r JOIN osm_features f ON f.id = r.id "
+                    "WHERE r.min_lon <= ? AND r.max_lon >= ? AND r.min_lat <= ? AND r.max_lat >= ?",
+                    (east, west, north, south)
+                ).fetchall()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Ignoring OSM feature index: {e}")
+            return None
+        
+        # Overpass order (type, then id), which settles ties between equal-priority features
+        type_names = {rank: name for name, rank in _ELEMENT_TYPE_ORDER.items()}
+        rows.sort(key=lambda row: (row[0] % 4, row[0] // 4))
+        elements = []
+        for row_id, tags, geometry in rows:
+            coords = np.frombuffer(geometry, dtype=np.float64).reshape(-1, 2).tolist()
+            elements.append({
+                'type': type_names[row_id % 4],
+                'id': row_id // 4,
+                'tags': _loads_json(tags),
+                'geometry': [{'lat': lat, 'lon': lon} for lon, lat in coords]
+            })
+        return {'elements': elements}
+    
+    def split_bbox(self, bbox: Tuple[float, float, float, float],
+                   tiles: int) -> List[Tuple[float, float, float, float]]:
+        """Split a (north, south, east, west) bbox into tiles x tiles subregions"""
+        north, south, east, west = bbox
+        lat_edges = np.linspace(south, north, tiles + 1).tolist()
+        lon_edges = np.linspace(west, east, tiles + 1).tolist()
+        return [(lat_edges[i + 1], lat_edges[i], lon_edges[j + 1], lon_edges[j])
+                for i in range(tiles) for j in range(tiles)]
+    
+    async def download_overpass_area(self, session: aiohttp.ClientSession,
+                                     bbox: Tuple[float, float, float, float],
+                                     tiles: Optional[int] = None) -> Optional[Dict]:
+        """
+        Download OSM data for a bbox as concurrent subregion queries, merging elements by id.
+        Returns None if any subregion fails, since its cells would otherwise read as unknown
+        """
+        north, south, east, west = bbox
+        if tiles is None:
+            tiles = max(1, math.ceil(max(north - south, east - west) / OVERPASS_TILE_DEGREES - 1e-9))
+        if tiles == 1:
+            return await self.download_overpass_data(session, bbox)
+        
+        semaphore = asyncio.Semaphore(OVERPASS_CONCURRENCY)
+        
+        async def fetch(sub_bbox):
+            async with semaphore:
+                return await self.download_overpass_data(session, sub_bbox)
+        
+        # Features crossing subregion edges come back from several queries
+        elements = {}
+        for payload in asyncio.as_completed([fetch(sub_bbox) for sub_bbox in self.split_bbox(bbox, tiles)]):
+            data = await payload
+            if not data:
+                return None
+            for element in data.get('elements', []):
+                elements.setdefault((element.get('type'), element.get('id')), element)
+        
+        # Restore the order a single query returns, which settles ties between equal-priority features
+        ordered = sorted(elements.items(), key=lambda item: (_ELEMENT_TYPE_ORDER.get(item[0][0], 3), item[0][1]))
+        return {'elements': [element for _, element in ordered]}
+    
     def classify_osm_feature(self, feature: Dict) -> str:
         """Classify an OSM feature into our terrain types"""
         tags = feature.get('tags', {})
@@ -266,6 +677,11 @@ class VectorTileClassifier:
                         polygon_coords: List[List[float]]) -> bool:
         """Check if a point is inside a polygon using ray casting"""
         x, y = point
+        if NUMBA_AVAILABLE:
+            coords = np.asarray(polygon_coords, dtype=np.float64)
+            return bool(_point_in_polygon(float(x), float(y), np.ascontiguousarray(coords[:, 0]),
+                                          np.ascontiguousarray(coords[:, 1]), 0, len(coords)))
+        
         n = len(polygon_coords)
         inside = False
         
@@ -283,42 +699,211 @@ class VectorTileClassifier:
         
         return inside
     
+    def points_in_polygon(self, xs: np.ndarray, ys: np.ndarray,
+                          px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        """Ray casting test of the points (xs, ys) against one polygon's vertices (px, py), as a mask"""
+        p1x, p1y = px[np.newaxis, :], py[np.newaxis, :]
+        p2x, p2y = np.roll(px, -1)[np.newaxis, :], np.roll(py, -1)[np.newaxis, :]
+        x, y = xs[:, np.newaxis], ys[:, np.newaxis]
+        
+        # Same crossing rule as point_in_polygon, for every (point, edge) pair
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
+        crosses = ((y > np.minimum(p1y, p2y)) & (y <= np.maximum(p1y, p2y)) &
+                   (x <= np.maximum(p1x, p2x)) & ((p1x == p2x) | (x <= xinters)))
+        return np.logical_xor.reduce(crosses, axis=1)
+    
+    def prepare_osm_features(self, osm_data: Dict) -> Dict[str, np.ndarray]:
+        """
+        Polygon features of an Overpass response as flat arrays: vertices 'xs'/'ys' (lon/lat),
+        feature k spanning offsets[k]:offsets[k + 1], and per-feature 'terrain_ids'/'priorities'
+        and 'bounds' (min lon, max lon, min lat, max lat);
+        'rings' holds the same vertices as [lon, lat] lists for the pure-Python ray caster and
+        'strtree' is added on first use. The last response's features are kept, so per-cell lookups parse it only once
+        """
+        if self._prepared_osm is not None and self._prepared_osm[0] is osm_data:
+            return self._prepared_osm[1]
+        
+        xs, ys, offsets, rings, terrain_ids, priorities = [], [], [0], [], [], []
+        for element in osm_data.get('elements', []):
+            if element['type'] not in ['way', 'relation'] or len(element.get('geometry', ())) < 3:
+                continue
+            
+            xs.extend(node['lon'] for node in element['geometry'])
+            ys.extend(node['lat'] for node in element['geometry'])
+            offsets.append(len(xs))
+            rings.append([[node['lon'], node['lat']] for node in element['geometry']])
+            
+            terrain_type = self.classify_osm_feature(element)
+            terrain_ids.append(self._terrain_ids[terrain_type])
+            priorities.append(self.terrain_priority.get(terrain_type, 0))
+        
+        xs = np.array(xs, dtype=np.float64)
+        ys = np.array(ys, dtype=np.float64)
+        starts = np.array(offsets[:-1], dtype=np.int64)
+        bounds = np.empty((len(starts), 4), dtype=np.float64)
+        if len(starts):
+            bounds[:, 0], bounds[:, 1] = np.minimum.reduceat(xs, starts), np.maximum.reduceat(xs, starts)
+            bounds[:, 2], bounds[:, 3] = np.minimum.reduceat(ys, starts), np.maximum.reduceat(ys, starts)
+        
+        features = {
+            'xs': xs,
+            'ys': ys,
+            'offsets': np.array(offsets, dtype=np.int64),
+            'terrain_ids': np.array(terrain_ids, dtype=np.uint8),
+            'priorities': np.array(priorities, dtype=np.int64),
+            'bounds': bounds,
+            'rings': rings
+        }
+        self._prepared_osm = (osm_data, features)
+        return features
+    
     def classify_grid_cell_from_osm(self, osm_data: Dict, 
                                   cell_lat: float, cell_lon: float) -> str:
         """Classify a grid cell based on OSM data"""
         if not osm_data or 'elements' not in osm_data:
             return 'unknown'
         
-        cell_point = (cell_lon, cell_lat)  # Note: lon, lat order for Point
-        matching_features = []
+        features = self.prepare_osm_features(osm_data)
+        priorities = features['priorities']
+        if len(priorities) == 0:
+            return 'unknown'
+        
+        if NUMBA_AVAILABLE:
+            best = _best_feature(float(cell_lon), float(cell_lat), features['xs'], features['ys'],
+                                 features['offsets'], priorities)
+        elif SHAPELY_AVAILABLE:
+            _, hits = self._query_features(features, np.array([cell_lon], dtype=np.float64),
+                                           np.array([cell_lat], dtype=np.float64))
+            hits = hits[priorities[hits] > 0]
+            best = hits[np.lexsort((hits, -priorities[hits]))[0]] if len(hits) else -1
+        else:
+            # Highest priority polygon holding the cell center, the earliest on ties
+            best, best_priority = -1, 0
+            top_priority = int(priorities.max())
+            cell_point = (cell_lon, cell_lat)  # Note: lon, lat order for Point
+            for k, (ring, priority) in enumerate(zip(features['rings'], priorities.tolist())):
+                if priority > best_priority and self.point_in_polygon(cell_point, ring):
+                    best, best_priority = k, priority
+                    if best_priority >= top_priority:
+                        break
+        
+        if best < 0:
+            return 'unknown'
+        return self._terrain_names[features['terrain_ids'][best]]
+    
+    def classify_cells_from_osm(self, osm_data: Dict, cell_lats: np.ndarray,
+                                cell_lons: np.ndarray) -> np.ndarray:
+        """
+        Terrain id of every grid cell (rows by cell_lats, columns by cell_lons), testing all cell
+        centers against each OSM polygon at once; the highest priority feature wins
+        """
+        lon_grid, lat_grid = np.meshgrid(cell_lons, cell_lats)
+        terrain_ids = np.full(lat_grid.shape, self._terrain_ids['unknown'], dtype=np.uint8)
+        
+        features = self.prepare_osm_features(osm_data)
+        if len(features['priorities']) == 0:
+            return terrain_ids
+        
+        if NUMBA_AVAILABLE:
+            with JIT_LOCK:
+                best = _classify_cell_grid(np.asarray(cell_lons, dtype=np.float64),
+                                           np.asarray(cell_lats, dtype=np.float64), features['xs'],
+                                           features['ys'], features['offsets'], features['priorities'],
+                                           features['bounds'])
+            found = best >= 0
+            terrain_ids[found] = features['terrain_ids'][best[found]]
+            return terrain_ids
+        
+        if SHAPELY_AVAILABLE:
+            cells, hits = self._query_features(features, lon_grid.ravel(), lat_grid.ravel())
+        else:
+            cells, hits = self._ray_cast_features(features, lon_grid.ravel(), lat_grid.ravel())
+        
+        # Per cell, the highest priority hit; ties keep the earlier feature
+        priorities = features['priorities']
+        order = np.lexsort((hits, -priorities[hits], cells))
+        cells, hits = cells[order], hits[order]
+        first = np.ones(len(cells), dtype=bool)
+        first[1:] = cells[1:] != cells[:-1]
+        terrain_ids.ravel()[cells[first]] = features['terrain_ids'][hits[first]]
         
-        for element in osm_data['elements']:
-            if element['type'] not in ['way', 'relation']:
+        return terrain_ids
+    
+    def _query_features(self, features: Dict[str, np.ndarray], xs: np.ndarray,
+                        ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(point, feature) index pairs for points inside or on a feature, through an STRtree"""
+        if 'strtree' not in features:
+            features['strtree'] = self._build_strtree(features)
+        tree, feature_index = features['strtree']
+        if tree is None:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        
+        # Bbox candidates from the tree, then exact tests against the prepared polygons
+        points, hits = tree.query(shapely.points(xs, ys))
+        inside = shapely.intersects_xy(tree.geometries[hits], xs[points], ys[points])
+        return points[inside], feature_index[hits[inside]]
+    
+    def _build_strtree(self, features: Dict[str, np.ndarray]) -> Tuple[Optional[Any], np.ndarray]:
+        """
+        STRtree over all feature polygons, built with one batch call and prepared for repeated
+        point tests, plus the feature index of each tree item
+        """
+        xs, ys, offsets = features['xs'], features['ys'], features['offsets']
+        starts, ends = offsets[:-1], offsets[1:]
+        
+        # Open rings get closed by shapely; rings still under 4 coordinates enclose no points
+        closed = (xs[starts] == xs[ends - 1]) & (ys[starts] == ys[ends - 1])
+        valid = (ends - starts) + ~closed >= 4
+        feature_index = np.flatnonzero(valid)
+        if not len(feature_index):
+            return None, feature_index
+        
+        counts = (ends - starts)[valid]
+        vertex_mask = np.repeat(valid, ends - starts)
+        ring_ids = np.repeat(np.arange(len(counts)), counts)
+        rings = shapely.linearrings(np.column_stack((xs[vertex_mask], ys[vertex_mask])), indices=ring_ids)
+        polygons = shapely.polygons(rings)
+        shapely.prepare(polygons)
+        return shapely.STRtree(polygons), feature_index
+    
+    def _ray_cast_features(self, features: Dict[str, np.ndarray], xs: np.ndarray,
+                           ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(point, feature) index pairs for points inside a feature, ray casting each feature's bbox"""
+        offsets = features['offsets']
+        
+        points, hits = [], []
+        for k, (lon_min, lon_max, lat_min, lat_max) in enumerate(features['bounds'].tolist()):
+            px = features['xs'][offsets[k]:offsets[k + 1]]
+            py = features['ys'][offsets[k]:offsets[k + 1]]
+            candidates = np.flatnonzero((xs >= lon_min) & (xs <= lon_max) &
+                                        (ys >= lat_min) & (ys <= lat_max))
+            if candidates.size == 0:
                 continue
             
-            # Get geometry coordinates
-            if 'geometry' in element:
-                coords = []
-                for node in element['geometry']:
-                    coords.append([node['lon'], node['lat']])
-                
-                # Check if point is inside this polygon
-                if len(coords) >= 3 and self.point_in_polygon(cell_point, coords):
-                    terrain_type = self.classify_osm_feature(element)
-                    priority = self.terrain_priority.get(terrain_type, 0)
-                    matching_features.append((terrain_type, priority))
-        
-        # Return the highest priority terrain type
-        if matching_features:
-            matching_features.sort(key=lambda x: x[1], reverse=True)
-            return matching_features[0][0]
+            inside = candidates[self.points_in_polygon(xs[candidates], ys[candidates], px, py)]
+            points.append(inside)
+            hits.append(np.full(len(inside), k, dtype=np.intp))
         
-        return 'unknown'
+        if not points:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        return np.concatenate(points), np.concatenate(hits)
     
     async def classify_grid_area(self, lat: float, lon: float, 
                                grid_size: int = 50,
                                cell_size_degrees: float = 0.001) -> List[List[Dict]]:
-        """Classify terrain for an entire grid area using OSM vector data"""
+        """Classify terrain for an entire grid area using OSM vector data, as one dict per cell"""
+        grid = await self.classify_grid_arrays(lat, lon, grid_size, cell_size_degrees)
+        return self.grid_to_cells(grid)
+    
+    async def classify_grid_arrays(self, lat: float, lon: float,
+                                   grid_size: int = 50,
+                                   cell_size_degrees: float = 0.001) -> Dict[str, np.ndarray]:
+        """
+        Classify terrain for an entire grid area using OSM vector data, as per-cell arrays
+        ('terrain_id', 'burn_state', 'burn_intensity', 'moisture'), cell centers ('lats', 'lons')
+        and per-terrain-id tables ('names', 'colors', 'properties')
+        """
         
         logger.info(f"Starting OSM vector tile classification for {grid_size}x{grid_size} grid at {lat}, {lon}")
         
@@ -332,8 +917,7 @@ class VectorTileClassifier:
         bbox = (north, south, east, west)
         
         # Download OSM data for the area
-        async with aiohttp.ClientSession() as session:
-            osm_data = await self.download_overpass_data(session, bbox)
+        osm_data = await self.download_overpass_area(self.get_session(), bbox)
         
         if not osm_data:
             logger.warning("No OSM data downloaded, using fallback classification")
@@ -341,113 +925,103 @@ class VectorTileClassifier:
         
         logger.info(f"Downloaded {len(osm_data.get('elements', []))} OSM features")
         
-        # Classify each grid cell
-        grid_classification = []
+        cell_lats, cell_lons = self.cell_centers(lat, lon, grid_size, cell_size_degrees)
+        
+        # Classify all grid cells against the OSM polygons, off the loop so other requests keep flowing
+        terrain_ids = await asyncio.get_running_loop().run_in_executor(
+            None, self.classify_cells_from_osm, osm_data, cell_lats, cell_lons)
+        
+        logger.info(f"OSM grid classification completed")
+        return self._grid_arrays(terrain_ids, cell_lats, cell_lons)
+    
+    def _grid_arrays(self, terrain_ids: np.ndarray, cell_lats: np.ndarray,
+                     cell_lons: np.ndarray) -> Dict[str, np.ndarray]:
+        """Initial per-cell state arrays for a terrain id grid, plus the per-id tables"""
+        return {
+            'terrain_id': terrain_ids,
+            'burn_state': np.zeros(terrain_ids.shape, dtype=np.uint8),  # Index into _burn_state_names
+            'burn_intensity': np.zeros(terrain_ids.shape, dtype=np.float64),
+            'moisture': self._moisture_lut[terrain_ids],
+            'lats': cell_lats,
+            'lons': cell_lons,
+            'names': np.array(self._terrain_names),
+            'colors': np.array([self.terrain_colors[name] for name in self._terrain_names]),
+            'properties': self.terrain_property_table
+        }
+    
+    def grid_to_cells(self, grid: Dict[str, np.ndarray]) -> List[List[Dict]]:
+        """Expand classify_grid_arrays output into the per-cell dicts served by the API"""
+        names = grid['names'].tolist()
+        colors = grid['colors'].tolist()
+        properties = [self.terrain_properties.get(name, self.terrain_properties['unknown']) for name in names]
+        lat_values = grid['lats'].tolist()
+        lon_values = grid['lons'].tolist()
         
-        for row in range(grid_size):
-            grid_row = []
-            for col in range(grid_size):
-                # Calculate cell center coordinates
-                cell_lat = lat - (grid_size * cell_size_degrees / 2) + (row + 0.5) * cell_size_degrees
-                cell_lon = lon - (grid_size * cell_size_degrees / 2) + (col + 0.5) * cell_size_degrees
-                
-                # Classify the cell using OSM data
-                terrain_type = self.classify_grid_cell_from_osm(osm_data, cell_lat, cell_lon)
-                
-                # Get terrain properties
-                properties = self.terrain_properties.get(terrain_type, self.terrain_properties['unknown'])
-                
-                cell_data = {
-                    'terrain_type': terrain_type,
-                    'color': self.terrain_colors[terrain_type],
+        grid_classification = []
+        for row, (row_ids, row_states, row_intensity, row_moisture) in enumerate(zip(
+                grid['terrain_id'].tolist(), grid['burn_state'].tolist(),
+                grid['burn_intensity'].tolist(), grid['moisture'].tolist())):
+            grid_classification.append([
+                {
+                    'terrain_type': names[terrain_id],
+                    'color': colors[terrain_id],
                     'row': row,
                     'col': col,
-                    'lat': cell_lat,
-                    'lon': cell_lon,
-                    'properties': properties,
-                    'burn_state': 'unburned',  # Initial state
-                    'burn_intensity': 0.0,
-                    'moisture': properties['moisture_retention']
+                    'lat': lat_values[row],
+                    'lon': lon_values[col],
+                    'properties': properties[terrain_id],
+                    'burn_state': self._burn_state_names[state],
+                    'burn_intensity': intensity,
+                    'moisture': moisture
                 }
-                
-                grid_row.append(cell_data)
-            
-            grid_classification.append(grid_row)
-            
-            # Log progress
-            if (row + 1) % 10 == 0:
-                logger.info(f"Classified {row + 1}/{grid_size} rows")
+                for col, (terrain_id, state, intensity, moisture) in enumerate(
+                    zip(row_ids, row_states, row_intensity, row_moisture))
+            ])
         
-        logger.info(f"OSM grid classification completed")
         return grid_classification
     
     def _generate_fallback_grid(self, lat: float, lon: float, 
-                              grid_size: int, cell_size_degrees: float) -> List[List[Dict]]:
+                              grid_size: int, cell_size_degrees: float) -> Dict[str, np.ndarray]:
         """Generate a fallback grid with basic terrain distribution"""
         
         logger.info("Generating fallback terrain grid with geographic patterns")
         
-        grid = []
+        rows, cols = np.ogrid[:grid_size, :grid_size]
         center_row = grid_size // 2
         center_col = grid_size // 2
         
-        for row in range(grid_size):
-            grid_row = []
-            for col in range(grid_size):
-                # Calculate cell coordinates
-                cell_lat = lat - (grid_size * cell_size_degrees / 2) + (row + 0.5) * cell_size_degrees
-                cell_lon = lon - (grid_size * cell_size_degrees / 2) + (col + 0.5) * cell_size_degrees
-                
-                # Distance from center
-                dist_from_center = math.sqrt((row - center_row)**2 + (col - center_col)**2)
-                normalized_dist = dist_from_center / (grid_size / 2)
-                
-                # Use some geographic patterns and randomness
-                rand = np.random.random()
-                edge_factor = min(1.0, normalized_dist)
-                
-                # Determine terrain type with geographic logic
-                if rand < 0.08:  # Water features (rivers, lakes)
-                    terrain_type = 'water'
-                elif edge_factor < 0.3 and rand < 0.2:  # Urban areas near center
-                    terrain_type = 'urban'
-                elif rand < 0.35:  # Forest areas
-                    terrain_type = 'forest'
-                elif rand < 0.55:  # Agricultural areas
-                    terrain_type = 'agriculture'
-                elif rand < 0.75:  # Grassland
-                    terrain_type = 'grass'
-                elif rand < 0.85:  # Shrubland
-                    terrain_type = 'shrub'
-                else:  # Bare ground
-                    terrain_type = 'bare_ground'
-                
-                # Get terrain properties
-                properties = self.terrain_properties.get(terrain_type, self.terrain_properties['unknown'])
-                
-                cell_data = {
-                    'terrain_type': terrain_type,
-                    'color': self.terrain_colors[terrain_type],
-                    'row': row,
-                    'col': col,
-                    'lat': cell_lat,
-                    'lon': cell_lon,
-                    'properties': properties,
-                    'burn_state': 'unburned',
-                    'burn_intensity': 0.0,
-                    'moisture': properties['moisture_retention']
-                }
-                
-                grid_row.append(cell_data)
-            grid.append(grid_row)
-        
-        return grid
-    
-    def get_terrain_statistics(self, grid: List[List[Dict]]) -> Dict[str, int]:
-        """Calculate terrain type statistics for the grid"""
-        stats = {}
-        for row in grid:
-            for cell in row:
-                terrain = cell['terrain_type']
-                stats[terrain] = stats.get(terrain, 0) + 1
-        return stats
+        # Distance from center, broadcast from a row and a column vector
+        dist_from_center = np.hypot(rows - center_row, cols - center_col)
+        normalized_dist = dist_from_center / (grid_size / 2)
+        
+        # Use some geographic patterns and randomness
+        rand = np.random.random((grid_size, grid_size))
+        edge_factor = np.minimum(1.0, normalized_dist)
+        
+        # Determine terrain type with geographic logic
+        ids = self._terrain_ids
+        terrain_ids = np.select(
+            [
+                rand < 0.08,                          # Water features (rivers, lakes)
+                (edge_factor < 0.3) & (rand < 0.2),   # Urban areas near center
+                rand < 0.35,                          # Forest areas
+                rand < 0.55,                          # Agricultural areas
+                rand < 0.75,                          # Grassland
+                rand < 0.85                           # Shrubland
+            ],
+            [ids['water'], ids['urban'], ids['forest'], ids['agriculture'], ids['grass'], ids['shrub']],
+            default=ids['bare_ground']  # Bare ground
+        ).astype(np.uint8)
+        
+        cell_lats, cell_lons = self.cell_centers(lat, lon, grid_size, cell_size_degrees)
+        return self._grid_arrays(terrain_ids, cell_lats, cell_lons)
+    
+    def get_terrain_statistics(self, grid: Any) -> Dict[str, int]:
+        """Calculate terrain type statistics for classify_grid_arrays output or a grid of cell dicts"""
+        if isinstance(grid, dict):
+            counts = np.bincount(grid['terrain_id'].ravel(), minlength=len(grid['names']))
+            return {
+                terrain: count
+                for terrain, count in zip(grid['names'].tolist(), counts.tolist()) if count
+            }
+        return dict(Counter(cell['terrain_type'] for row in grid for cell in row))
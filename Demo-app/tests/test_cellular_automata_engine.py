@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import ca_numba
+from core.cellular_automata_engine import CellularAutomatonEngine
+
+
+def _run(seed, grid_size=40, steps=10):
+    engine = CellularAutomatonEngine(grid_size=grid_size, seed=seed)
+    engine.initialize_from_terrain_grid(
+        [[{'terrain_type': 'forest' if (row + col) % 7 else 'grass'} for col in range(grid_size)]
+         for row in range(grid_size)])
+    engine.ignite_cell(grid_size // 2, grid_size // 2)
+    for _ in range(steps):
+        engine.step()
+    return engine.burn_state.copy()
+
+
+@pytest.mark.parametrize('use_numba', [True, False], ids=['numba', 'numpy'])
+def test_seeded_runs_are_reproducible(monkeypatch, use_numba):
+    if use_numba and not ca_numba.NUMBA_AVAILABLE:
+        pytest.skip('numba is not installed')
+    monkeypatch.setattr(ca_numba, 'NUMBA_AVAILABLE', use_numba)
+
+    first = _run(seed=1)
+    assert np.array_equal(first, _run(seed=1))
+    assert not np.array_equal(first, _run(seed=2))
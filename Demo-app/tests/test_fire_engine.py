@@ -0,0 +1,129 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import fire_engine
+from core.fire_engine import FireSimulation
+
+
+def _run(seed, steps=15):
+    sim = FireSimulation(64, 64, seed=seed)
+    sim.random_ignite(num_ignitions=5)
+    for _ in range(steps):
+        sim.step()
+    return sim.fire_state.copy()
+
+
+@pytest.mark.parametrize('use_numba', [True, False], ids=['numba', 'numpy'])
+def test_seeded_runs_are_reproducible(monkeypatch, use_numba):
+    if use_numba and not fire_engine.NUMBA_AVAILABLE:
+        pytest.skip('numba is not installed')
+    monkeypatch.setattr(fire_engine, 'NUMBA_AVAILABLE', use_numba)
+
+    first = _run(seed=1)
+    assert np.array_equal(first, _run(seed=1))
+    assert not np.array_equal(first, _run(seed=2))
+
+
+def _fire_sim(monkeypatch, sparse, seed=1, size=60):
+    """NumPy-backend simulation forced onto the sparse or the dense step"""
+    monkeypatch.setattr(fire_engine, 'NUMBA_AVAILABLE', False)
+    if sparse:
+        monkeypatch.setattr(fire_engine, '_SPARSE_STEP_MIN_CELLS', 0)
+        monkeypatch.setattr(fire_engine, '_SPARSE_STEP_FRACTION', 1.0)
+    else:
+        monkeypatch.setattr(fire_engine, '_SPARSE_STEP_MIN_CELLS', sys.maxsize)
+    return FireSimulation(size, size, seed=seed)
+
+
+def _set_terrain(sim, terrain_ids):
+    """Apply a grid of terrain ids through the public bitmap API"""
+    terrain_map = {tuple(color): name
+                   for name, color in zip(fire_engine.TERRAIN_NAMES, fire_engine.COLOR_LUT.tolist())}
+    sim.set_terrain_from_bitmap(fire_engine.COLOR_LUT[terrain_ids], terrain_map)
+
+
+def _no_spread(monkeypatch):
+    monkeypatch.setattr(fire_engine.Config, 'SPREAD_PROBABILITY', 0.0)
+    monkeypatch.setattr(fire_engine.Config, 'IGNITION_PROBABILITY', 0.0)
+
+
+@pytest.mark.parametrize('sparse', [True, False], ids=['sparse', 'dense'])
+def test_burn_out_timing(monkeypatch, sparse):
+    _no_spread(monkeypatch)
+    sim = _fire_sim(monkeypatch, sparse)
+    sim.ignite_at(10, 10)
+    sim.ignite_at(30, 40)
+    sim.step()
+    sim.step()
+    sim.ignite_at(50, 20)
+
+    # Cells burn for exactly BURN_TIME steps after they ignite, then turn to ash
+    for step in range(1, fire_engine.Config.BURN_TIME + 3):
+        sim.step()
+        first_out = step >= fire_engine.Config.BURN_TIME - 2
+        second_out = step >= fire_engine.Config.BURN_TIME
+        assert sim.fire_state[10, 10] == sim.fire_state[40, 30] == (2 if first_out else 1)
+        assert sim.fire_state[20, 50] == (2 if second_out else 1)
+        assert np.count_nonzero(sim.fire_state) == 3
+
+
+def test_sparse_and_dense_steps_agree_without_randomness(monkeypatch):
+    _no_spread(monkeypatch)
+    states = []
+    for sparse in (True, False):
+        sim = _fire_sim(monkeypatch, sparse)
+        for x, y in [(5, 5), (6, 5), (30, 31), (59, 0)]:
+            sim.ignite_at(x, y)
+        history = []
+        for step in range(fire_engine.Config.BURN_TIME + 2):
+            if step == 2:
+                sim.ignite_at(40, 40)
+            sim.step()
+            history.append((sim.fire_state.copy(), sim.burn_time.copy(), sim.fuel_load.copy()))
+        states.append(history)
+
+    for (sparse_state, sparse_time, sparse_fuel), (dense_state, dense_time, dense_fuel) in zip(*states):
+        assert np.array_equal(sparse_state, dense_state)
+        assert np.array_equal(sparse_time, dense_time)
+        assert np.array_equal(sparse_fuel, dense_fuel)
+
+
+@pytest.mark.parametrize('sparse', [True, False], ids=['sparse', 'dense'])
+def test_heavy_rain_burns_out_every_fire(monkeypatch, sparse):
+    _no_spread(monkeypatch)
+    sim = _fire_sim(monkeypatch, sparse)
+    sim.random_ignite(num_ignitions=20)
+    burning = sim.fire_state == 1
+
+    sim.set_weather(fire_engine.WeatherConditions(precipitation=10.0))
+    sim.step()
+
+    assert np.all(sim.fire_state[burning] == 2)
+    assert np.all(sim.fuel_load[burning] == 0)
+    assert not np.any(sim.fire_state == 1)
+
+
+@pytest.mark.parametrize('sparse', [True, False], ids=['sparse', 'dense'])
+def test_non_flammable_cells_never_ignite(monkeypatch, sparse):
+    monkeypatch.setattr(fire_engine.Config, 'SPREAD_PROBABILITY', 1.0)
+    monkeypatch.setattr(fire_engine.Config, 'IGNITION_PROBABILITY', 0.02)
+    sim = _fire_sim(monkeypatch, sparse, seed=3)
+
+    # Forest laced with water and urban cells, so every fire front borders them
+    rows, cols = np.indices((sim.height, sim.width))
+    terrain = np.full((sim.height, sim.width), fire_engine.TERRAIN_IDS['forest'], dtype=np.uint8)
+    terrain[(rows + cols) % 3 == 0] = fire_engine.TERRAIN_IDS['water']
+    terrain[(rows * 7 + cols) % 5 == 0] = fire_engine.TERRAIN_IDS['urban']
+    _set_terrain(sim, terrain)
+    non_flammable = ~fire_engine.FLAMMABLE_MASK_LUT[sim.terrain_id]
+
+    sim.random_ignite(num_ignitions=10)
+    for _ in range(10):
+        sim.step()
+        assert not np.any(sim.fire_state[non_flammable])
+    assert np.count_nonzero(sim.fire_state) > 10
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.map_tile_service import MapTileClassifier
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return MapTileClassifier()
+
+
+@pytest.mark.parametrize('zoom', [14, 15, 16])
+@pytest.mark.parametrize('lat, lon', [(-33.87, 151.21), (0.31, 32.58), (45.52, -122.68), (64.14, -21.94)])
+@pytest.mark.parametrize('cell_size', [0.0005, 0.001, 0.0023])
+def test_classify_cells_matches_cell_classifier(classifier, zoom, lat, lon, cell_size):
+    rng = np.random.default_rng(zoom * 1000 + int(abs(lat) * 10) + int(cell_size * 1e4))
+    grid_size = 24
+    half_size = grid_size * cell_size / 2
+    min_x, min_y = classifier.deg2num(lat + half_size, lon - half_size, zoom)
+    max_x, max_y = classifier.deg2num(lat - half_size, lon + half_size, zoom)
+    # Leave the last tile column and row out when there are several, so some cells fall off the mosaic
+    max_x = max(min_x, max_x - 1)
+    max_y = max(min_y, max_y - 1)
+    tile_bounds = (min_x, min_y, max_x, max_y)
+
+    # Mosaic of 8-pixel blocks of random classes, with one tile left missing
+    tile_size = classifier.tile_size
+    shape = ((max_y - min_y + 1) * tile_size, (max_x - min_x + 1) * tile_size)
+    blocks = rng.integers(0, classifier._missing_tile_id, size=(shape[0] // 8, shape[1] // 8))
+    mosaic = np.kron(blocks, np.ones((8, 8), dtype=np.int64)).astype(np.uint8)
+    mosaic[:tile_size, :tile_size] = classifier._missing_tile_id
+
+    offsets = (np.arange(grid_size) + 0.5) * cell_size - half_size
+    row_lats = lat + offsets
+    col_lons = lon + offsets
+
+    class_ids = classifier._classify_cells(mosaic, zoom, tile_bounds, row_lats, col_lons, cell_size)
+
+    classify = classifier.make_cell_classifier(mosaic, zoom, tile_bounds, cell_size)
+    expected = [[classify(cell_lat, cell_lon) for cell_lon in col_lons] for cell_lat in row_lats]
+    names = np.array(classifier._id_to_name)
+    assert names[class_ids].tolist() == expected
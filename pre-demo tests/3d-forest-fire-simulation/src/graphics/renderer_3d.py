@@ -34,7 +34,7 @@ class Renderer3D:
     def update_grid(self, grid_state):
         for y in range(self.grid_size):
             for x in range(self.grid_size):
-                state = grid_state[y][x]
+                state = grid_state[y, x]
                 self.update_cube_color(self.entities[y * self.grid_size + x], state)
 
     def update_cube_color(self, cube, state):
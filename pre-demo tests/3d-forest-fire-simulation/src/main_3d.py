@@ -184,7 +184,7 @@ def try_alternative_3d():
                 # Create 3D grid visualization
                 for y in range(grid_size):
                     for x in range(grid_size):
-                        state = grid_state[y][x]
+                        state = grid_state[y, x]
                         if state != 0:  # Don't show empty cells
                             # Create a cube at position (x, y, 0) with height based on state
                             height = 1 if state == 1 else (2 if state == 2 else 0.5)
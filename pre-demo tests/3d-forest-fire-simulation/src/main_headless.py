@@ -37,7 +37,7 @@ class HeadlessFireSimulation:
         self.ax.set_ylabel('Y')
         
         # Initialize the image
-        self.im = self.ax.imshow(np.array(self.fire_model.get_state()), 
+        self.im = self.ax.imshow(self.fire_model.get_state(), 
                                 cmap=self.cmap, vmin=0, vmax=3, animated=True)
         
         # Add colorbar
@@ -47,8 +47,7 @@ class HeadlessFireSimulation:
     def update_animation(self, frame):
         """Update function for animation"""
         self.fire_model.spread_fire()
-        grid_state = np.array(self.fire_model.get_state())
-        self.im.set_array(grid_state)
+        self.im.set_array(self.fire_model.get_state())
         return [self.im]
     
     def run_animation(self, interval=100, frames=1000):
@@ -68,7 +67,7 @@ class HeadlessFireSimulation:
                 print(f"Step {step}/{steps}")
         
         # Show final state
-        grid_state = np.array(self.fire_model.get_state())
+        grid_state = self.fire_model.get_state()
         plt.figure(figsize=(10, 10))
         plt.imshow(grid_state, cmap=self.cmap, vmin=0, vmax=3)
         plt.title(f'Forest Fire Simulation - Final State (Step {steps})')
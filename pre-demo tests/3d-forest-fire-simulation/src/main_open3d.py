@@ -64,7 +64,7 @@ class FireSimulation3DOpen3D:
         
         for y in range(self.grid_size):
             for x in range(self.grid_size):
-                state = grid_state[y][x]
+                state = grid_state[y, x]
                 
                 if state != 0:  # Don't show empty cells
                     # Create multiple points for each cell to make it more visible
@@ -156,7 +156,7 @@ class FireSimulation3DOpen3D:
                     
                     for y in range(self.grid_size):
                         for x in range(self.grid_size):
-                            state = grid_state[y][x]
+                            state = grid_state[y, x]
                             if state != 0:
                                 # Add multiple points for each cell
                                 for i in range(3):
@@ -6,6 +6,7 @@ This should work better with NVIDIA GPUs and modern OpenGL
 
 import sys
 import os
+import ctypes
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
@@ -19,6 +20,19 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from simulation.fire_model import FireModel
 
+# Unit cube as GL_QUADS: front, back, top, bottom, right, left faces
+CUBE_VERTICES = np.array([
+    (-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (-0.5, 0.5, 0.5),
+    (-0.5, -0.5, -0.5), (-0.5, 0.5, -0.5), (0.5, 0.5, -0.5), (0.5, -0.5, -0.5),
+    (-0.5, 0.5, -0.5), (-0.5, 0.5, 0.5), (0.5, 0.5, 0.5), (0.5, 0.5, -0.5),
+    (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, -0.5, 0.5), (-0.5, -0.5, 0.5),
+    (0.5, -0.5, -0.5), (0.5, 0.5, -0.5), (0.5, 0.5, 0.5), (0.5, -0.5, 0.5),
+    (-0.5, -0.5, -0.5), (-0.5, -0.5, 0.5), (-0.5, 0.5, 0.5), (-0.5, 0.5, -0.5),
+], dtype=np.float32)
+CUBE_NORMALS = np.repeat(np.array([
+    (0, 0, 1), (0, 0, -1), (0, 1, 0), (0, -1, 0), (1, 0, 0), (-1, 0, 0),
+], dtype=np.float32), 4, axis=0)
+
 class FireSimulation3DOpenGL:
     def __init__(self, grid_size=25):
         self.grid_size = grid_size
@@ -50,6 +64,12 @@ class FireSimulation3DOpenGL:
             3: (0.4, 0.4, 0.4)   # Burned - gray
         }
         
+        # Leaf heights are fixed per cell so tree cubes only change with state
+        self.leaf_heights = np.random.uniform(1.5, 2.5, (grid_size, grid_size))
+        self.static_dirty = True
+        self.static_count = 0
+        self.flame_count = 0
+        
         # Initialize pygame and OpenGL
         self.init_display()
         self.init_opengl()
@@ -81,61 +101,71 @@ class FireSimulation3DOpenGL:
         
         # Set background color
         glClearColor(0.5, 0.8, 1.0, 1.0)  # Sky blue
-
-    def draw_cube(self, x, y, z, size, color):
-        """Draw a cube at the specified position"""
-        glColor3f(*color)
-        glPushMatrix()
-        glTranslatef(x, z, y)  # Note: OpenGL Y is up, but our grid Y is forward
-        glScalef(size, size, size)
-        
-        # Draw cube faces
-        glBegin(GL_QUADS)
-        
-        # Front face
-        glNormal3f(0, 0, 1)
-        glVertex3f(-0.5, -0.5, 0.5)
-        glVertex3f(0.5, -0.5, 0.5)
-        glVertex3f(0.5, 0.5, 0.5)
-        glVertex3f(-0.5, 0.5, 0.5)
-        
-        # Back face
-        glNormal3f(0, 0, -1)
-        glVertex3f(-0.5, -0.5, -0.5)
-        glVertex3f(-0.5, 0.5, -0.5)
-        glVertex3f(0.5, 0.5, -0.5)
-        glVertex3f(0.5, -0.5, -0.5)
-        
-        # Top face
-        glNormal3f(0, 1, 0)
-        glVertex3f(-0.5, 0.5, -0.5)
-        glVertex3f(-0.5, 0.5, 0.5)
-        glVertex3f(0.5, 0.5, 0.5)
-        glVertex3f(0.5, 0.5, -0.5)
-        
-        # Bottom face
-        glNormal3f(0, -1, 0)
-        glVertex3f(-0.5, -0.5, -0.5)
-        glVertex3f(0.5, -0.5, -0.5)
-        glVertex3f(0.5, -0.5, 0.5)
-        glVertex3f(-0.5, -0.5, 0.5)
         
-        # Right face
-        glNormal3f(1, 0, 0)
-        glVertex3f(0.5, -0.5, -0.5)
-        glVertex3f(0.5, 0.5, -0.5)
-        glVertex3f(0.5, 0.5, 0.5)
-        glVertex3f(0.5, -0.5, 0.5)
-        
-        # Left face
-        glNormal3f(-1, 0, 0)
-        glVertex3f(-0.5, -0.5, -0.5)
-        glVertex3f(-0.5, -0.5, 0.5)
-        glVertex3f(-0.5, 0.5, 0.5)
-        glVertex3f(-0.5, 0.5, -0.5)
-        
-        glEnd()
-        glPopMatrix()
+        # Vertex buffers for the state-driven cubes and the animated flames
+        self.static_vbo, self.flame_vbo = glGenBuffers(2)
+
+    def _cubes(self, mask, z, size, color):
+        """Centers, sizes and colors of one cube per True cell in mask"""
+        ys, xs = np.nonzero(mask)
+        centers = np.empty((len(xs), 3), dtype=np.float32)
+        centers[:, 0] = xs
+        centers[:, 1] = z[ys, xs] if np.ndim(z) else z  # Note: OpenGL Y is up, but our grid Y is forward
+        centers[:, 2] = ys
+        sizes = np.full(len(xs), size, dtype=np.float32)
+        colors = np.broadcast_to(np.asarray(color, dtype=np.float32), (len(xs), 3))
+        return centers, sizes, colors
+
+    def _cube_vertex_data(self, cubes):
+        """Interleave position, normal and color for every vertex of the given cubes"""
+        centers = np.concatenate([c[0] for c in cubes])
+        sizes = np.concatenate([c[1] for c in cubes])
+        colors = np.concatenate([c[2] for c in cubes])
+        data = np.empty((len(centers), 24, 9), dtype=np.float32)
+        data[:, :, 0:3] = centers[:, None, :] + sizes[:, None, None] * CUBE_VERTICES
+        data[:, :, 3:6] = CUBE_NORMALS
+        data[:, :, 6:9] = colors[:, None, :]
+        return data.reshape(-1, 9)
+
+    def _upload(self, vbo, data):
+        """Copy vertex data into a VBO and return its vertex count"""
+        if len(data):
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_DYNAMIC_DRAW)
+        return len(data)
+
+    def _draw_vbo(self, vbo, count):
+        """Draw an interleaved VBO of cube quads in a single call"""
+        if not count:
+            return
+        stride = 9 * 4
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, stride, ctypes.c_void_p(12))
+        glColorPointer(3, GL_FLOAT, stride, ctypes.c_void_p(24))
+        glDrawArrays(GL_QUADS, 0, count)
+
+    def update_static_batch(self, grid_state):
+        """Rebuild the cubes that only change with the cell states"""
+        grid = np.asarray(grid_state)
+        cubes = [
+            self._cubes(grid == 0, 0.0, 0.9, self.colors[0]),                  # Empty - just ground
+            self._cubes(grid == 1, 0.5, 0.3, (0.6, 0.3, 0.1)),                 # Tree trunk
+            self._cubes(grid == 1, self.leaf_heights, 1.2, self.colors[1]),    # Tree leaves
+            self._cubes(grid == 2, 0.5, 0.8, (0.8, 0.4, 0.0)),                 # Burning base
+            self._cubes(grid == 3, 0.2, 0.8, self.colors[3]),                  # Burned - ash
+        ]
+        self.static_count = self._upload(self.static_vbo, self._cube_vertex_data(cubes))
+        self.static_dirty = False
+
+    def update_flame_batch(self, grid_state):
+        """Rebuild the animated flame cubes above burning cells"""
+        centers, sizes, colors = self._cubes(np.asarray(grid_state) == 2, 0.0, 0.6, (0, 0, 0))
+        now = time.time()
+        centers[:, 1] = 2.0 + 0.5 * np.sin(now * 5 + centers[:, 0] + centers[:, 2])
+        colors = np.array((1.0, 0.3 + 0.2 * math.sin(now * 3), 0.0), dtype=np.float32)
+        colors = np.broadcast_to(colors, (len(centers), 3))
+        self.flame_count = self._upload(self.flame_vbo, self._cube_vertex_data([(centers, sizes, colors)]))
 
     def render_forest(self):
         """Render the 3D forest"""
@@ -150,28 +180,20 @@ class FireSimulation3DOpenGL:
         # Get current grid state
         grid_state = self.fire_model.get_state()
         
-        # Draw grid
-        for y in range(self.grid_size):
-            for x in range(self.grid_size):
-                state = grid_state[y][x]
-                
-                if state == 0:  # Empty - just ground
-                    self.draw_cube(x, y, 0, 0.9, self.colors[0])
-                elif state == 1:  # Tree - trunk + leaves
-                    # Draw trunk
-                    self.draw_cube(x, y, 0.5, 0.3, (0.6, 0.3, 0.1))
-                    # Draw leaves
-                    height = np.random.uniform(1.5, 2.5)
-                    self.draw_cube(x, y, height, 1.2, self.colors[1])
-                elif state == 2:  # Burning - animated fire
-                    # Draw burning base
-                    self.draw_cube(x, y, 0.5, 0.8, (0.8, 0.4, 0.0))
-                    # Draw flames
-                    flame_height = 2.0 + 0.5 * math.sin(time.time() * 5 + x + y)
-                    flame_color = (1.0, 0.3 + 0.2 * math.sin(time.time() * 3), 0.0)
-                    self.draw_cube(x, y, flame_height, 0.6, flame_color)
-                elif state == 3:  # Burned - ash
-                    self.draw_cube(x, y, 0.2, 0.8, self.colors[3])
+        # Draw grid: static cubes are re-uploaded only after a state change
+        if self.static_dirty:
+            self.update_static_batch(grid_state)
+        self.update_flame_batch(grid_state)
+        
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        self._draw_vbo(self.static_vbo, self.static_count)
+        self._draw_vbo(self.flame_vbo, self.flame_count)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         
         # Draw ground plane
         glColor3f(0.3, 0.6, 0.2)  # Green grass
@@ -213,6 +235,7 @@ class FireSimulation3DOpenGL:
                     self.fire_model.reset()
                     self.fire_model.ignite(self.grid_size // 2, self.grid_size // 2)
                     self.step_count = 0
+                    self.static_dirty = True
                 elif event.key == K_SPACE:
                     self.auto_step = not self.auto_step
                     print(f"Auto-step: {'ON' if self.auto_step else 'OFF'}")
@@ -230,6 +253,7 @@ class FireSimulation3DOpenGL:
         current_time = time.time()
         if self.auto_step and current_time - self.last_step_time > self.step_delay:
             self.fire_model.spread_fire()
+            self.static_dirty = True
             self.step_count += 1
             self.last_step_time = current_time
             
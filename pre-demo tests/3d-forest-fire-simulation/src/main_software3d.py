@@ -16,6 +16,166 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from simulation.fire_model import FireModel
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Unit cube corners as +/-1 offsets from the center (Y is up)
+CUBE_CORNERS = np.array([
+    [-1, -1, -1], [1, -1, -1], [1, -1, 1], [-1, -1, 1],  # Bottom face
+    [-1, 1, -1], [1, 1, -1], [1, 1, 1], [-1, 1, 1],      # Top face
+], dtype=float)
+
+# Corner indices of the cube faces, low then high side along z, x and y:
+# front, back, left, right, bottom, top
+CUBE_FACES = np.array([
+    [0, 1, 5, 4], [2, 3, 7, 6],
+    [0, 3, 7, 4], [1, 2, 6, 5],
+    [0, 1, 2, 3], [4, 5, 6, 7],
+])
+# Brightness of each face relative to the depth-shaded base color
+FACE_SHADES = np.array([1.0, 0.7, 0.8, 0.8, 0.6, 1.0])
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _raster_face(pixels, zbuf, quad, inv_z, fill, outline, row_lo, row_hi):
+        """Z-buffered edge-walking fill of one convex quad, then its outline, within rows [row_lo, row_hi)"""
+        width = pixels.shape[0]
+        y_min = max(min(quad[0, 1], quad[1, 1], quad[2, 1], quad[3, 1]), row_lo)
+        y_max = min(max(quad[0, 1], quad[1, 1], quad[2, 1], quad[3, 1]), row_hi - 1)
+        for y in range(y_min, y_max + 1):
+            # Span between the leftmost and rightmost edge crossing this scanline,
+            # with 1/z interpolated along the edges (it is linear in screen space)
+            x_left = np.inf
+            x_right = -np.inf
+            iz_left = 0.0
+            iz_right = 0.0
+            for k in range(4):
+                x0, y0, iz0 = quad[k, 0], quad[k, 1], inv_z[k]
+                x1, y1, iz1 = quad[(k + 1) % 4, 0], quad[(k + 1) % 4, 1], inv_z[(k + 1) % 4]
+                if y < min(y0, y1) or y > max(y0, y1):
+                    continue
+                if y0 == y1:
+                    xs = (x0, x1)
+                    izs = (iz0, iz1)
+                else:
+                    t = (y - y0) / (y1 - y0)
+                    xs = (x0 + t * (x1 - x0), x0 + t * (x1 - x0))
+                    izs = (iz0 + t * (iz1 - iz0), iz0 + t * (iz1 - iz0))
+                for i in range(2):
+                    if xs[i] < x_left:
+                        x_left, iz_left = xs[i], izs[i]
+                    if xs[i] > x_right:
+                        x_right, iz_right = xs[i], izs[i]
+            if x_right < 0 or x_left > width - 1:
+                continue
+            x_start = max(int(round(x_left)), 0)
+            step = (iz_right - iz_left) / max(x_right - x_left, 1.0)
+            iz = iz_left + (x_start - x_left) * step
+            for x in range(x_start, min(int(round(x_right)), width - 1) + 1):
+                if iz > zbuf[x, y]:
+                    zbuf[x, y] = iz
+                    pixels[x, y, 0] = fill[0]
+                    pixels[x, y, 1] = fill[1]
+                    pixels[x, y, 2] = fill[2]
+                iz += step
+        
+        for k in range(4):
+            x0, y0, iz0 = quad[k, 0], quad[k, 1], inv_z[k]
+            x1, y1, iz1 = quad[(k + 1) % 4, 0], quad[(k + 1) % 4, 1], inv_z[(k + 1) % 4]
+            if max(x0, x1) < 0 or min(x0, x1) >= width or max(y0, y1) < row_lo or min(y0, y1) >= row_hi:
+                continue
+            steps = max(abs(x1 - x0), abs(y1 - y0), 1)
+            i_lo, i_hi = 0, steps
+            if y1 != y0:
+                # Only the steps whose row can fall inside the band
+                i_a = (row_lo - 1 - y0) * steps // (y1 - y0)
+                i_b = (row_hi - y0) * steps // (y1 - y0) + 1
+                i_lo = max(min(i_a, i_b) - 1, 0)
+                i_hi = min(max(i_a, i_b) + 1, steps)
+            for i in range(i_lo, i_hi + 1):
+                t = i / steps
+                x = x0 + int(round((x1 - x0) * t))
+                y = y0 + int(round((y1 - y0) * t))
+                # Small tolerance so edges win against the face they bound
+                if 0 <= x < width and row_lo <= y < row_hi and (iz0 + t * (iz1 - iz0)) * 1.001 >= zbuf[x, y]:
+                    zbuf[x, y] = max(zbuf[x, y], iz0 + t * (iz1 - iz0))
+                    pixels[x, y, 0] = outline[0]
+                    pixels[x, y, 1] = outline[1]
+                    pixels[x, y, 2] = outline[2]
+
+    @njit(parallel=True, cache=True)
+    def _render_cubes(pixels, zbuf, centers, half_sizes, colors, depths, cam_pos, basis, scale):
+        """Project, shade and z-buffer every cube straight into a pixels3d array"""
+        width, height = pixels.shape[0], pixels.shape[1]
+        n = centers.shape[0]
+        
+        # Up to 3 visible faces per cube (one per axis): screen quad, 1/z per corner and colors
+        quads = np.zeros((n, 3, 4, 2), dtype=np.int64)
+        inv_z = np.zeros((n, 3, 4))
+        fills = np.zeros((n, 3, 3), dtype=np.int64)
+        outlines = np.zeros((n, 3, 3), dtype=np.int64)
+        visible = np.zeros((n, 3), dtype=np.bool_)
+        rows = np.zeros((n, 3, 2), dtype=np.int64)
+        for c in prange(n):
+            screen_x = np.empty(8, dtype=np.int64)
+            screen_y = np.empty(8, dtype=np.int64)
+            corner_iz = np.empty(8)
+            behind = False
+            for k in range(8):
+                dx = centers[c, 0] + half_sizes[c] * CUBE_CORNERS[k, 0] - cam_pos[0]
+                dy = centers[c, 1] + half_sizes[c] * CUBE_CORNERS[k, 1] - cam_pos[1]
+                dz = centers[c, 2] + half_sizes[c] * CUBE_CORNERS[k, 2] - cam_pos[2]
+                z = dx * basis[2, 0] + dy * basis[2, 1] + dz * basis[2, 2]
+                if z <= 0.1:
+                    behind = True  # Skip if any vertex is behind camera
+                    break
+                x = dx * basis[0, 0] + dy * basis[0, 1] + dz * basis[0, 2]
+                y = dx * basis[1, 0] + dy * basis[1, 1] + dz * basis[1, 2]
+                screen_x[k] = int((x * scale / z) * (width / 2) + width / 2)
+                screen_y[k] = int((y * scale / z) * (height / 2) + height / 2)
+                corner_iz[k] = 1.0 / z
+            if behind:
+                continue
+            
+            depth_factor = min(1.0, max(0.3, 50.0 / depths[c]))
+            for axis in range(3):
+                # Faces are ordered along z, x and y
+                component = (axis + 2) % 3
+                rel = cam_pos[component] - centers[c, component]
+                if rel > half_sizes[c]:
+                    face = 2 * axis + 1
+                elif rel < -half_sizes[c]:
+                    face = 2 * axis
+                else:
+                    continue
+                visible[c, axis] = True
+                for k in range(4):
+                    corner = CUBE_FACES[face, k]
+                    quads[c, axis, k, 0] = screen_x[corner]
+                    quads[c, axis, k, 1] = screen_y[corner]
+                    inv_z[c, axis, k] = corner_iz[corner]
+                rows[c, axis, 0] = quads[c, axis, :, 1].min()
+                rows[c, axis, 1] = quads[c, axis, :, 1].max()
+                for i in range(3):
+                    fills[c, axis, i] = int(int(colors[c, i] * depth_factor) * FACE_SHADES[face])
+                    outlines[c, axis, i] = int(fills[c, axis, i] * 0.5)
+        
+        # Rasterize in horizontal bands, one band per task, so threads never share pixels
+        band_height = 16
+        for band in prange((height + band_height - 1) // band_height):
+            row_lo = band * band_height
+            row_hi = min(row_lo + band_height, height)
+            # Nearest cubes usually come last, so walking backwards rejects hidden pixels early
+            for c in range(n - 1, -1, -1):
+                for axis in range(3):
+                    if visible[c, axis] and rows[c, axis, 0] < row_hi and rows[c, axis, 1] >= row_lo:
+                        _raster_face(pixels, zbuf, quads[c, axis], inv_z[c, axis],
+                                     fills[c, axis], outlines[c, axis], row_lo, row_hi)
+
 class Camera:
     def __init__(self, pos, target):
         self.pos = np.array(pos, dtype=float)
@@ -26,42 +186,80 @@ class Camera:
         self.near = 1
         self.far = 1000
 
+    @property
+    def pos(self):
+        return self._pos
+
+    @pos.setter
+    def pos(self, value):
+        # In-place updates (camera.pos += ...) also pass through here
+        self._pos = value
+        self._basis = None
+
+    @property
+    def target(self):
+        return self._target
+
+    @target.setter
+    def target(self, value):
+        self._target = value
+        self._basis = None
+
+    @property
+    def fov(self):
+        return self._fov
+
+    @fov.setter
+    def fov(self, value):
+        # Perspective scale only changes with the field of view
+        self._fov = value
+        self.scale = 1.0 / math.tan(math.radians(value) / 2)
+
     def get_view_matrix(self):
-        """Calculate view matrix"""
-        forward = self.target - self.pos
-        forward = forward / np.linalg.norm(forward)
+        """Calculate view matrix, cached until the camera moves"""
+        if self._basis is None:
+            forward = self.target - self.pos
+            forward = forward / np.linalg.norm(forward)
+            
+            right = np.cross(forward, self.up)
+            right = right / np.linalg.norm(right)
+            
+            up = np.cross(right, forward)
+            
+            self._basis = (forward, right, up)
+            self._basis_matrix = np.stack([right, up, forward])
         
-        right = np.cross(forward, self.up)
-        right = right / np.linalg.norm(right)
+        return self._basis
+
+    def project_points(self, points, screen_width, screen_height):
+        """Project an (N, 3) array of 3D points to (N, 3) screen x, y and depth.
+
+        Screen coordinates are truncated to whole pixels; rows with depth <= 0.1
+        are behind the camera and should be skipped.
+        """
+        self.get_view_matrix()
         
-        up = np.cross(right, forward)
+        # Translate to camera space and transform to camera coordinate system
+        cam_space = (np.asarray(points, dtype=float) - self.pos) @ self._basis_matrix.T
+        z = cam_space[:, 2]
         
-        return forward, right, up
+        # Perspective projection
+        projected = np.empty_like(cam_space)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            projected[:, 0] = (cam_space[:, 0] * self.scale / z) * (screen_width / 2) + screen_width / 2
+            projected[:, 1] = (cam_space[:, 1] * self.scale / z) * (screen_height / 2) + screen_height / 2
+        np.trunc(projected[:, :2], out=projected[:, :2])
+        projected[:, 2] = z
+        return projected
 
     def project_point(self, point, screen_width, screen_height):
         """Project 3D point to 2D screen coordinates"""
-        # Translate to camera space
-        cam_space = point - self.pos
-        
-        # Get camera vectors
-        forward, right, up = self.get_view_matrix()
-        
-        # Transform to camera coordinate system
-        x = np.dot(cam_space, right)
-        y = np.dot(cam_space, up)
-        z = np.dot(cam_space, forward)
+        screen_x, screen_y, z = self.project_points(np.reshape(point, (1, 3)), screen_width, screen_height)[0]
         
         # Avoid division by zero
         if z <= 0.1:
             return None
         
-        # Perspective projection
-        fov_rad = math.radians(self.fov)
-        scale = 1.0 / math.tan(fov_rad / 2)
-        
-        screen_x = (x * scale / z) * (screen_width / 2) + screen_width / 2
-        screen_y = (y * scale / z) * (screen_height / 2) + screen_height / 2
-        
         return (int(screen_x), int(screen_y), z)
 
 class FireSimulation3DPygame:
@@ -76,6 +274,8 @@ class FireSimulation3DPygame:
         self.screen_height = 768
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         pygame.display.set_caption("3D Forest Fire Simulation - Software Rendering")
+        # Per-pixel 1/z, indexed [x, y] like pygame.surfarray
+        self._zbuf = np.zeros((self.screen_width, self.screen_height), dtype=np.float32)
         
         # Colors
         self.colors = {
@@ -85,6 +285,52 @@ class FireSimulation3DPygame:
             3: (105, 105, 105)  # Burned - gray
         }
         
+        # State -> RGB lookup table for the top-down map view
+        self._palette = np.array([self.colors[state] for state in range(4)], dtype=np.uint8)
+        self._map_surface = pygame.Surface((grid_size, grid_size))
+        map_size = min(self.screen_width, self.screen_height)
+        self._map_scaled = pygame.Surface((map_size, map_size))
+        
+        # World x/z coordinates of every cell, indexed [y, x]
+        self._xs, self._ys = np.meshgrid(np.arange(grid_size) * self.cell_size,
+                                         np.arange(grid_size) * self.cell_size)
+        
+        # Cube stack per state, bottom-up: ground/ash, then trunk or flame, then crown
+        cs = self.cell_size
+        self._stack_counts = np.array([1, 3, 2, 1])
+        self._stack_heights = np.array([[0.1, 0, 0], [0.1, 1.0, 2.2], [0.1, 2.0, 0], [0.3, 0, 0]])
+        self._stack_sizes = np.array([[cs * 0.8, 0, 0], [cs * 0.8, cs * 0.4, cs * 1.0],
+                                      [cs * 0.8, cs * 0.8, 0], [cs * 0.9, 0, 0]])
+        self._stack_colors = np.array([
+            [self.colors[0], (0, 0, 0), (0, 0, 0)],
+            [self.colors[0], (101, 67, 33), self.colors[1]],
+            [self.colors[0], (255, 0, 0), (0, 0, 0)],
+            [self.colors[3], (0, 0, 0), (0, 0, 0)],
+        ], dtype=np.uint8)
+        
+        # Draw list buffers sized for every cell holding its tallest stack, sliced each frame
+        max_cubes = grid_size * grid_size * int(self._stack_counts.max())
+        self._centers = np.empty((max_cubes, 3), dtype=np.float32)
+        self._sizes = np.empty(max_cubes, dtype=np.float32)
+        self._colors = np.empty((max_cubes, 3), dtype=np.uint8)
+        self._depths = np.empty(max_cubes, dtype=np.float32)
+        
+        # Bounding sphere of a cell's tallest stack (flames reach 2.5), for frustum culling
+        stacked = self._stack_sizes > 0
+        heights = np.where(self._stack_heights == 2.0, 2.5, self._stack_heights)
+        bottom = (self._stack_heights - self._stack_sizes / 2)[stacked].min()
+        top = (heights + self._stack_sizes / 2)[stacked].max()
+        half_width = self._stack_sizes.max() / 2
+        self._cell_centers = np.stack([self._xs.ravel(), np.full(grid_size * grid_size, (bottom + top) / 2),
+                                       self._ys.ravel()], axis=1)
+        self._cell_radius = math.sqrt(2 * half_width ** 2 + ((top - bottom) / 2) ** 2)
+        
+        # Precomputed back-to-front traversal orders, one per horizontal quadrant
+        self._traversal_orders = {
+            (camera_high_x, camera_high_z): self._morton_order(grid_size, camera_high_x, camera_high_z)
+            for camera_high_x in (False, True) for camera_high_z in (False, True)
+        }
+        
         # Camera setup
         center = grid_size * self.cell_size / 2
         self.camera = Camera(
@@ -95,6 +341,7 @@ class FireSimulation3DPygame:
         # Simulation state
         self.step_count = 0
         self.auto_step = True
+        self.top_down = False
         self.step_delay = 0.3
         self.last_step_time = time.time()
         
@@ -113,28 +360,12 @@ class FireSimulation3DPygame:
         """Draw a wireframe cube with proper 3D edges"""
         half_size = size / 2
         
-        # Define cube vertices (Y is up)
-        vertices = [
-            # Bottom face
-            [center[0] - half_size, center[1] - half_size, center[2] - half_size],  # 0
-            [center[0] + half_size, center[1] - half_size, center[2] - half_size],  # 1
-            [center[0] + half_size, center[1] - half_size, center[2] + half_size],  # 2
-            [center[0] - half_size, center[1] - half_size, center[2] + half_size],  # 3
-            # Top face
-            [center[0] - half_size, center[1] + half_size, center[2] - half_size],  # 4
-            [center[0] + half_size, center[1] + half_size, center[2] - half_size],  # 5
-            [center[0] + half_size, center[1] + half_size, center[2] + half_size],  # 6
-            [center[0] - half_size, center[1] + half_size, center[2] + half_size],  # 7
-        ]
-        
-        # Project vertices to screen
-        screen_vertices = []
-        for vertex in vertices:
-            projected = self.camera.project_point(np.array(vertex), self.screen_width, self.screen_height)
-            if projected:
-                screen_vertices.append(projected)
-            else:
-                return  # Skip if any vertex is behind camera
+        # Project all 8 corners in one batch
+        vertices = np.asarray(center, dtype=float) + half_size * CUBE_CORNERS
+        projected = self.camera.project_points(vertices, self.screen_width, self.screen_height)
+        if (projected[:, 2] <= 0.1).any():
+            return  # Skip if any vertex is behind camera
+        screen_vertices = projected[:, :2].astype(int).tolist()
         
         # Draw edges with depth-based color intensity
         depth_factor = max(0.2, min(1.0, 40.0 / depth))
@@ -162,81 +393,89 @@ class FireSimulation3DPygame:
             except (IndexError, TypeError):
                 continue
 
-    def draw_cube_filled(self, center, size, color, depth):
+    def draw_cube_filled(self, center, size, color, depth, projected=None):
         """Draw a filled cube with proper 3D faces"""
-        half_size = size / 2
-        
-        # Define cube vertices in proper 3D space (Y is up)
-        vertices = [
-            # Bottom face (Y = center[1] - half_size)
-            [center[0] - half_size, center[1] - half_size, center[2] - half_size],  # 0: bottom-left-front
-            [center[0] + half_size, center[1] - half_size, center[2] - half_size],  # 1: bottom-right-front
-            [center[0] + half_size, center[1] - half_size, center[2] + half_size],  # 2: bottom-right-back
-            [center[0] - half_size, center[1] - half_size, center[2] + half_size],  # 3: bottom-left-back
-            # Top face (Y = center[1] + half_size)
-            [center[0] - half_size, center[1] + half_size, center[2] - half_size],  # 4: top-left-front
-            [center[0] + half_size, center[1] + half_size, center[2] - half_size],  # 5: top-right-front
-            [center[0] + half_size, center[1] + half_size, center[2] + half_size],  # 6: top-right-back
-            [center[0] - half_size, center[1] + half_size, center[2] + half_size],  # 7: top-left-back
-        ]
+        if projected is not None:
+            projected = np.asarray(projected)[None]
+        self.draw_cubes_filled([center], [size], [color], [depth], projected)
+
+    def draw_cubes_filled(self, centers, sizes, colors, depths, projected=None):
+        """Draw filled cubes
+
+        With numba the cubes are depth-tested against each other, so their order
+        does not matter; otherwise they are painted in the given order.
+        projected optionally holds each cube's 8 corners already run through
+        Camera.project_points, shaped (N, 8, 3).
+        """
+        centers = np.asarray(centers, dtype=float)
+        half_sizes = np.asarray(sizes, dtype=float) / 2
+        
+        if NUMBA_AVAILABLE:
+            forward, right, up = self.camera.get_view_matrix()
+            self._zbuf.fill(0)  # Stores 1/z, so 0 is infinitely far
+            pixels = pygame.surfarray.pixels3d(self.screen)
+            _render_cubes(pixels, self._zbuf, centers, half_sizes, np.asarray(colors),
+                          np.asarray(depths, dtype=float), self.camera.pos,
+                          np.stack([right, up, forward]), self.camera.scale)
+            del pixels  # Unlock the screen for later blits
+            return
         
         # Project all vertices to screen
-        screen_vertices = []
-        for vertex in vertices:
-            projected = self.camera.project_point(np.array(vertex), self.screen_width, self.screen_height)
-            if projected:
-                screen_vertices.append(projected)
-            else:
-                return  # Skip if any vertex is behind camera
-        
-        # Depth-based color adjustment
-        depth_factor = max(0.3, min(1.0, 50.0 / depth))
-        base_color = tuple(int(c * depth_factor) for c in color)
-        
-        # Define cube faces (vertex indices for each face)
-        faces = [
-            # Each face is defined by 4 vertex indices in counter-clockwise order
-            ([0, 1, 5, 4], base_color, "front"),          # Front face
-            ([2, 3, 7, 6], tuple(int(c * 0.7) for c in base_color), "back"),   # Back face (darker)
-            ([0, 3, 7, 4], tuple(int(c * 0.8) for c in base_color), "left"),   # Left face
-            ([1, 2, 6, 5], tuple(int(c * 0.8) for c in base_color), "right"),  # Right face
-            ([4, 5, 6, 7], tuple(int(c * 1.0) for c in base_color), "top"),    # Top face (brightest)
-            ([0, 1, 2, 3], tuple(int(c * 0.6) for c in base_color), "bottom"), # Bottom face (darkest)
-        ]
-        
-        # Calculate face normals and draw visible faces
-        camera_pos = self.camera.pos
-        
-        for face_indices, face_color, face_name in faces:
-            try:
-                # Get 3D coordinates of face vertices
-                face_3d = [vertices[i] for i in face_indices]
-                
-                # Calculate face normal (simplified visibility check)
-                v1 = np.array(face_3d[1]) - np.array(face_3d[0])
-                v2 = np.array(face_3d[2]) - np.array(face_3d[0])
-                normal = np.cross(v1, v2)
-                normal = normal / np.linalg.norm(normal)
-                
-                # Vector from face center to camera
-                face_center = np.mean(face_3d, axis=0)
-                to_camera = camera_pos - face_center
-                to_camera = to_camera / np.linalg.norm(to_camera)
-                
-                # Only draw faces facing the camera
-                if np.dot(normal, to_camera) > 0:
-                    # Convert to screen coordinates
-                    screen_face = [screen_vertices[i][:2] for i in face_indices]
-                    
-                    # Draw the face
-                    if len(screen_face) >= 3:
-                        pygame.draw.polygon(self.screen, face_color, screen_face)
-                        # Add edge lines for better definition
-                        pygame.draw.polygon(self.screen, tuple(int(c * 0.5) for c in face_color), screen_face, 1)
-                        
-            except (ValueError, IndexError, ZeroDivisionError):
-                # If face calculation fails, skip this face
-                continue
+        if projected is None:
+            corners = centers[:, None, :] + half_sizes[:, None, None] * CUBE_CORNERS
+            projected = self.camera.project_points(corners.reshape(-1, 3), self.screen_width, self.screen_height)
+            projected = projected.reshape(-1, 8, 3)
+        
+        # Faces are axis-aligned, so a face is visible exactly when the camera
+        # lies beyond its plane; at most one face per axis can be seen
+        cam_rel = (self.camera.pos - centers)[:, [2, 0, 1]]
+        half = half_sizes[:, None]
+        low_faces = np.arange(0, 6, 2)
+        faces = np.where(cam_rel > half, low_faces + 1, np.where(cam_rel < -half, low_faces, -1))
+        faces[(projected[:, :, 2] <= 0.1).any(axis=1)] = -1  # Skip cubes with a vertex behind camera
+        
+        # Row-major nonzero keeps the cubes in drawing order
+        cube_idx, axis = np.nonzero(faces >= 0)
+        face_ids = faces[cube_idx, axis]
+        screen_vertices = projected[:, :, :2].astype(int)
+        quads = screen_vertices[cube_idx[:, None], CUBE_FACES[face_ids]]
+        
+        # Depth-based color adjustment, then per-face shading and a darker outline
+        depth_factor = np.clip(50.0 / np.asarray(depths, dtype=float), 0.3, 1.0)
+        base_colors = (np.asarray(colors) * depth_factor[:, None]).astype(int)
+        fills = (base_colors[cube_idx] * FACE_SHADES[face_ids, None]).astype(int)
+        outlines = (fills * 0.5).astype(int)
+        
+        screen = self.screen
+        for quad, fill, outline in zip(quads.tolist(), fills.tolist(), outlines.tolist()):
+            pygame.draw.polygon(screen, fill, quad)
+            pygame.draw.lines(screen, outline, True, quad)
+
+    def _visible_cells(self):
+        """Mask of cells whose bounding sphere may intersect the view frustum"""
+        forward, right, up = self.camera.get_view_matrix()
+        d = self._cell_centers - self.camera.pos
+        zc = d @ forward
+        xc = d @ right
+        yc = d @ up
+        # project_points maps |x| <= z / scale to the screen on both axes
+        tan_half_fov = 1.0 / self.camera.scale
+        r = self._cell_radius
+        margin = r * math.sqrt(1 + tan_half_fov ** 2)
+        limit = zc * tan_half_fov + margin
+        return (zc > 0.1 - r) & (np.abs(xc) <= limit) & (np.abs(yc) <= limit)
+
+    @staticmethod
+    def _morton_order(grid_size, camera_high_x, camera_high_z):
+        """Flat cell indices sorted by Morton code, starting from the corner farthest from the camera"""
+        ys, xs = np.divmod(np.arange(grid_size * grid_size), grid_size)
+        far_x = xs if camera_high_x else grid_size - 1 - xs
+        far_z = ys if camera_high_z else grid_size - 1 - ys
+        codes = np.zeros_like(xs)
+        for bit in range(int(grid_size - 1).bit_length()):
+            codes |= ((far_x >> bit) & 1) << (2 * bit)
+            codes |= ((far_z >> bit) & 1) << (2 * bit + 1)
+        return np.argsort(codes, kind='stable')
 
     def render_scene(self):
         """Render the 3D scene"""
@@ -244,64 +483,52 @@ class FireSimulation3DPygame:
         self.screen.fill((135, 206, 235))  # Sky blue
         
         # Get grid state
-        grid_state = self.fire_model.get_state()
-        
-        # Collect all cubes with their depths for sorting
-        cubes_to_draw = []
-        
-        for y in range(self.grid_size):
-            for x in range(self.grid_size):
-                state = grid_state[y][x]
-                
-                if state == 0:  # Empty - ground only
-                    center = [x * self.cell_size, 0.1, y * self.cell_size]  # Y=0.1 for ground level
-                    depth = np.linalg.norm(np.array(center) - self.camera.pos)
-                    cubes_to_draw.append((center, self.cell_size * 0.8, self.colors[0], depth, 'ground'))
-                    
-                elif state == 1:  # Tree
-                    # Ground
-                    center = [x * self.cell_size, 0.1, y * self.cell_size]
-                    depth = np.linalg.norm(np.array(center) - self.camera.pos)
-                    cubes_to_draw.append((center, self.cell_size * 0.8, self.colors[0], depth, 'ground'))
-                    
-                    # Tree trunk (grows UP from ground)
-                    trunk_center = [x * self.cell_size, 1.0, y * self.cell_size]  # Y=1.0 above ground
-                    depth = np.linalg.norm(np.array(trunk_center) - self.camera.pos)
-                    cubes_to_draw.append((trunk_center, self.cell_size * 0.4, (101, 67, 33), depth, 'trunk'))
-                    
-                    # Tree crown (grows UP from trunk)
-                    crown_center = [x * self.cell_size, 2.2, y * self.cell_size]  # Y=2.2 above ground
-                    depth = np.linalg.norm(np.array(crown_center) - self.camera.pos)
-                    cubes_to_draw.append((crown_center, self.cell_size * 1.0, self.colors[1], depth, 'crown'))
-                    
-                elif state == 2:  # Burning
-                    # Ground
-                    center = [x * self.cell_size, 0.1, y * self.cell_size]
-                    depth = np.linalg.norm(np.array(center) - self.camera.pos)
-                    cubes_to_draw.append((center, self.cell_size * 0.8, (139, 69, 19), depth, 'ground'))
-                    
-                    # Fire (animated, grows UP from ground)
-                    flame_height = 2.0 + 0.5 * math.sin(time.time() * 5 + x + y)
-                    flame_center = [x * self.cell_size, flame_height, y * self.cell_size]  # Grows upward
-                    depth = np.linalg.norm(np.array(flame_center) - self.camera.pos)
-                    # Animated fire color
-                    fire_intensity = 0.7 + 0.3 * math.sin(time.time() * 3 + x * 0.5 + y * 0.5)
-                    fire_color = (255, int(69 + 100 * fire_intensity), 0)
-                    cubes_to_draw.append((flame_center, self.cell_size * 0.8, fire_color, depth, 'fire'))
-                    
-                elif state == 3:  # Burned
-                    # Ash on ground (low height)
-                    center = [x * self.cell_size, 0.3, y * self.cell_size]  # Slightly above ground
-                    depth = np.linalg.norm(np.array(center) - self.camera.pos)
-                    cubes_to_draw.append((center, self.cell_size * 0.9, self.colors[3], depth, 'ash'))
-        
-        # Sort cubes by depth (back to front)
-        cubes_to_draw.sort(key=lambda x: x[3], reverse=True)
-        
-        # Draw all cubes
-        for center, size, color, depth, cube_type in cubes_to_draw:
-            # All cube types are drawn as filled cubes for better 3D appearance
-            self.draw_cube_filled(center, size, color, depth)
+        grid = np.asarray(self.fire_model.get_state())
+        cam = self.camera.pos
+        now = time.time()
+        
+        # Back-to-front cell order for the camera's quadrant around the grid center,
+        # with each cell's cube stack drawn bottom-up when looking from above
+        grid_center = (self.grid_size - 1) * self.cell_size / 2
+        cells = self._traversal_orders[(bool(cam[0] > grid_center), bool(cam[2] > grid_center))]
+        from_above = cam[1] > 0
+        
+        # Frustum cull whole cells before building any cubes
+        cells = cells[self._visible_cells()[cells]]
+        
+        # Lay out every cell's cube stack contiguously in traversal order
+        states = grid.ravel()[cells]
+        counts = self._stack_counts[states]
+        starts = np.cumsum(counts) - counts
+        total = int(counts.sum())
+        centers = self._centers[:total]
+        sizes = self._sizes[:total]
+        colors = self._colors[:total]
+        cell_xs = self._xs.ravel()[cells]
+        cell_zs = self._ys.ravel()[cells]
+        for slot in range(3):
+            has = counts > slot
+            idx = starts[has] + (slot if from_above else counts[has] - 1 - slot)
+            stack_states = states[has]
+            centers[idx, 0] = cell_xs[has]
+            centers[idx, 1] = self._stack_heights[stack_states, slot]
+            centers[idx, 2] = cell_zs[has]
+            sizes[idx] = self._stack_sizes[stack_states, slot]
+            colors[idx] = self._stack_colors[stack_states, slot]
+        
+        # Fire (animated height and color) sits above the burning ground
+        burning = states == 2
+        idx = starts[burning] + (1 if from_above else 0)
+        ys, xs = np.divmod(cells[burning], self.grid_size)
+        centers[idx, 1] = 2.0 + 0.5 * np.sin(now * 5 + xs + ys)
+        fire_intensity = 0.7 + 0.3 * np.sin(now * 3 + xs * 0.5 + ys * 0.5)
+        colors[idx, 1] = 69 + 100 * fire_intensity
+        
+        offsets = centers - cam
+        depths = np.sqrt(np.einsum('ij,ij->i', offsets, offsets), out=self._depths[:total])
+        
+        # Draw all cubes, filled for better 3D appearance
+        self.draw_cubes_filled(centers, sizes, colors, depths)
         
         # Draw ground plane
         self.draw_ground_plane()
@@ -311,6 +538,23 @@ class FireSimulation3DPygame:
         
         pygame.display.flip()
 
+    def render_top_down(self):
+        """Render the grid as a flat map: one palette lookup and one scaled blit"""
+        self.screen.fill((135, 206, 235))
+        
+        # surfarray is indexed [x, y], the grid [y, x]
+        image = self._palette[np.asarray(self.fire_model.get_state())]
+        pygame.surfarray.blit_array(self._map_surface, image.swapaxes(0, 1))
+        pygame.transform.scale(self._map_surface, self._map_scaled.get_size(), self._map_scaled)
+        
+        map_size = self._map_scaled.get_width()
+        self.screen.blit(self._map_scaled, ((self.screen_width - map_size) // 2,
+                                            (self.screen_height - map_size) // 2))
+        
+        self.draw_ui()
+        
+        pygame.display.flip()
+
     def draw_ground_plane(self):
         """Draw a ground plane beneath the forest"""
         ground_size = self.grid_size * self.cell_size + 4
@@ -325,11 +569,8 @@ class FireSimulation3DPygame:
         ]
         
         # Project to screen
-        screen_corners = []
-        for corner in ground_corners:
-            projected = self.camera.project_point(np.array(corner), self.screen_width, self.screen_height)
-            if projected:
-                screen_corners.append(projected[:2])
+        projected = self.camera.project_points(ground_corners, self.screen_width, self.screen_height)
+        screen_corners = projected[projected[:, 2] > 0.1, :2].astype(int).tolist()
         
         # Draw ground if all corners are visible
         if len(screen_corners) == 4:
@@ -347,6 +588,7 @@ class FireSimulation3DPygame:
             "WASD: Move camera",
             "Mouse: Look around", 
             "Space: Toggle auto-step",
+            "T: Toggle top-down view",
             "R: Restart simulation",
             "ESC: Quit",
             f"Step: {self.step_count}",
@@ -378,6 +620,8 @@ class FireSimulation3DPygame:
                 elif event.key == pygame.K_SPACE:
                     self.auto_step = not self.auto_step
                     print(f"Auto-step: {'ON' if self.auto_step else 'OFF'}")
+                elif event.key == pygame.K_t:
+                    self.top_down = not self.top_down
                 self.keys.add(event.key)
             elif event.type == pygame.KEYUP:
                 self.keys.discard(event.key)
@@ -460,6 +704,7 @@ class FireSimulation3DPygame:
         print("  WASD - Move camera")
         print("  Left click + drag - Rotate camera")
         print("  Space - Toggle auto-step")
+        print("  T - Toggle top-down view")
         print("  R - Restart simulation")
         print("  ESC - Quit")
         
@@ -474,7 +719,10 @@ class FireSimulation3DPygame:
             self.update_simulation()
             
             # Render
-            self.render_scene()
+            if self.top_down:
+                self.render_top_down()
+            else:
+                self.render_scene()
             
             # Control frame rate
             clock.tick(30)  # 30 FPS for good performance
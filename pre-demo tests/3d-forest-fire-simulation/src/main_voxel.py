@@ -44,7 +44,7 @@ class FireSimulation3DVoxel:
 
     def create_3d_voxels(self):
         """Create 3D voxel representation of the forest"""
-        grid_state = np.array(self.fire_model.get_state())
+        grid_state = self.fire_model.get_state()
         
         # Create a 3D array where each cell can have height
         voxels = np.zeros((self.grid_size, self.grid_size, 4), dtype=bool)
@@ -52,7 +52,7 @@ class FireSimulation3DVoxel:
         
         for y in range(self.grid_size):
             for x in range(self.grid_size):
-                state = grid_state[y][x]
+                state = grid_state[y, x]
                 
                 if state == 0:  # Empty - ground level only
                     voxels[x, y, 0] = True
@@ -126,7 +126,7 @@ class FireSimulation3DVoxel:
                     print(f"Step: {self.step_count}")
                     
                     # Print statistics
-                    grid_state = np.array(self.fire_model.get_state())
+                    grid_state = self.fire_model.get_state()
                     unique, counts = np.unique(grid_state, return_counts=True)
                     state_counts = dict(zip(unique, counts))
                     total_cells = grid_state.size
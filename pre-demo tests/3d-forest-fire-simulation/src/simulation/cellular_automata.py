@@ -1,39 +1,69 @@
+import numpy as np
+from utils.config import IGNITION_PROBABILITY
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _step(grid, new_grid, ignition_p):
+        height, width = grid.shape
+        for y in prange(height):
+            for x in range(width):
+                current_cell = grid[y, x]
+                if current_cell == 2:  # If burning, becomes burned
+                    new_grid[y, x] = 3
+                elif current_cell == 1:  # If tree, ignites from a burning neighbor
+                    if ((x > 0 and grid[y, x - 1] == 2) or (x < width - 1 and grid[y, x + 1] == 2)
+                            or (y > 0 and grid[y - 1, x] == 2) or (y < height - 1 and grid[y + 1, x] == 2)):
+                        new_grid[y, x] = 2
+                    # Small chance of spontaneous ignition
+                    elif np.random.random() < ignition_p:
+                        new_grid[y, x] = 2
+                    else:
+                        new_grid[y, x] = 1
+                else:
+                    new_grid[y, x] = current_cell
+
+
 class CellularAutomata:
     def __init__(self, width, height):
         self.width = width
         self.height = height
-        self.grid = [[1 for _ in range(width)] for _ in range(height)]  # Start with trees everywhere
+        self.grid = np.ones((height, width), dtype=np.int8)  # Start with trees everywhere
+        self._next_grid = np.empty_like(self.grid)
 
     def ignite(self, x, y):
-        if 0 <= x < self.width and 0 <= y < self.height and self.grid[y][x] == 1:
-            self.grid[y][x] = 2  # 2 represents burning
+        if 0 <= x < self.width and 0 <= y < self.height and self.grid[y, x] == 1:
+            self.grid[y, x] = 2  # 2 represents burning
 
     def spread_fire(self):
-        new_grid = [row[:] for row in self.grid]
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                current_cell = self.grid[y][x]
-                
-                if current_cell == 2:  # If burning
-                    new_grid[y][x] = 3  # Becomes burned
-                    
-                    # Spread to neighbors
-                    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        nx, ny = x + dx, y + dy
-                        if (0 <= nx < self.width and 0 <= ny < self.height and 
-                            self.grid[ny][nx] == 1):
-                            new_grid[ny][nx] = 2  # Ignite neighboring tree
-                
-                elif current_cell == 1:  # If tree (healthy)
-                    # Small chance of spontaneous ignition
-                    if random.random() < IGNITION_PROBABILITY:
-                        new_grid[y][x] = 2
-        
-        self.grid = new_grid
+        if NUMBA_AVAILABLE:
+            _step(self.grid, self._next_grid, IGNITION_PROBABILITY)
+        else:
+            grid = self.grid
+            burning = grid == 2
+            near_fire = np.zeros_like(burning)
+            near_fire[:, 1:] |= burning[:, :-1]
+            near_fire[:, :-1] |= burning[:, 1:]
+            near_fire[1:, :] |= burning[:-1, :]
+            near_fire[:-1, :] |= burning[1:, :]
+
+            new_grid = self._next_grid
+            np.copyto(new_grid, grid)
+            new_grid[burning] = 3  # Burning cells become burned
+            ignited = near_fire | (np.random.random(grid.shape) < IGNITION_PROBABILITY)
+            new_grid[(grid == 1) & ignited] = 2
+
+        # Swap buffers so the next step reuses the old grid
+        self.grid, self._next_grid = self._next_grid, self.grid
 
     def reset(self):
-        self.grid = [[1 for _ in range(self.width)] for _ in range(self.height)]
+        self.grid[:] = 1
 
     def get_state(self):
-        return self.grid
\ No newline at end of file
+        return self.grid
@@ -1,53 +1,54 @@
-import random
+import numpy as np
 from utils.config import IGNITION_PROBABILITY, SPREAD_PROBABILITY
 
 class FireModel:
     def __init__(self, width, height):
         self.width = width
         self.height = height
-        self.grid = [[1 for _ in range(width)] for _ in range(height)]  # Start with trees everywhere
-        
-        # Add some random empty spaces
-        for y in range(height):
-            for x in range(width):
-                if random.random() < 0.1:  # 10% chance of empty space
-                    self.grid[y][x] = 0
+        # 0 = empty, 1 = tree, 2 = burning, 3 = burned
+        self.grid = self._random_forest()
+
+    def _random_forest(self):
+        # Start with trees everywhere, 10% chance of empty space
+        grid = np.ones((self.height, self.width), dtype=np.uint8)
+        grid[np.random.random(grid.shape) < 0.1] = 0
+        return grid
 
     def ignite(self, x, y):
-        if 0 <= x < self.width and 0 <= y < self.height and self.grid[y][x] == 1:
-            self.grid[y][x] = 2  # 2 represents burning
+        if 0 <= x < self.width and 0 <= y < self.height and self.grid[y, x] == 1:
+            self.grid[y, x] = 2  # 2 represents burning
 
     def spread_fire(self):
-        new_grid = [row[:] for row in self.grid]
-        
-        for y in range(self.height):
-            for x in range(self.width):
-                current_cell = self.grid[y][x]
-                
-                if current_cell == 2:  # If burning
-                    new_grid[y][x] = 3  # Becomes burned
-                    
-                    # Spread to neighbors
-                    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        nx, ny = x + dx, y + dy
-                        if (0 <= nx < self.width and 0 <= ny < self.height and 
-                            self.grid[ny][nx] == 1 and random.random() < SPREAD_PROBABILITY):
-                            new_grid[ny][nx] = 2  # Ignite neighboring tree
-                
-                elif current_cell == 1:  # If tree (healthy)
-                    # Small chance of spontaneous ignition
-                    if random.random() < IGNITION_PROBABILITY:
-                        new_grid[y][x] = 2
-        
+        """Advance one step and return the (x, y, new_state) cells that changed."""
+        grid = self.grid
+        burning = grid == 2
+        trees = grid == 1
+        new_grid = grid.copy()
+        new_grid[burning] = 3  # Burning cells become burned
+
+        # Each burning cell tries to ignite each of its 4 neighbouring trees
+        ignited = np.zeros_like(trees)
+        ignited[:, 1:] |= burning[:, :-1] & (np.random.random((self.height, self.width - 1)) < SPREAD_PROBABILITY)
+        ignited[:, :-1] |= burning[:, 1:] & (np.random.random((self.height, self.width - 1)) < SPREAD_PROBABILITY)
+        ignited[1:, :] |= burning[:-1, :] & (np.random.random((self.height - 1, self.width)) < SPREAD_PROBABILITY)
+        ignited[:-1, :] |= burning[1:, :] & (np.random.random((self.height - 1, self.width)) < SPREAD_PROBABILITY)
+
+        # Small chance of spontaneous ignition
+        if IGNITION_PROBABILITY > 0:
+            ignited |= np.random.random(grid.shape) < IGNITION_PROBABILITY
+
+        new_grid[trees & ignited] = 2
         self.grid = new_grid
 
-    def reset(self):
-        self.grid = [[1 for _ in range(self.width)] for _ in range(self.height)]
-        # Add some random empty spaces
-        for y in range(self.height):
-            for x in range(self.width):
-                if random.random() < 0.1:
-                    self.grid[y][x] = 0
+        ys, xs = np.nonzero(new_grid != grid)
+        return list(zip(xs.tolist(), ys.tolist(), new_grid[ys, xs].tolist()))
+
+    def reset(self, grid=None):
+        """Restore a random forest, or copy grid into the existing buffer when given."""
+        if grid is None:
+            self.grid = self._random_forest()
+        else:
+            np.copyto(self.grid, grid, casting='unsafe')
 
     def get_state(self):
-        return self.grid
\ No newline at end of file
+        return self.grid
@@ -1,3 +1,4 @@
+import numpy as np
 import pygame
 
 class Renderer:
@@ -5,12 +6,67 @@ class Renderer:
         self.screen = screen
         self.grid_size = grid_size
         self.colors = colors
+        self.rect_grid = None
+        self.flat_rects = None
+        self.mapped_colors = None
+        self.color_surfaces = None
+        self.background = None
+        self.static_states = ()
+
+    def prepare(self, width, height):
+        """Build the per-cell rects and per-state cell surfaces once, reused every frame."""
+        size = self.grid_size
+        self.rect_grid = [[pygame.Rect(x * size, y * size, size, size) for x in range(width)]
+                          for y in range(height)]
+        self.flat_rects = [rect for row in self.rect_grid for rect in row]
+        # Colors pre-mapped to the screen's pixel format, and cell surfaces in
+        # that same format so blits are plain copies with no per-blit conversion
+        self.mapped_colors = {state: self.screen.map_rgb(color) for state, color in self.colors.items()}
+        self.color_surfaces = {}
+        for state, mapped in self.mapped_colors.items():
+            surface = pygame.Surface((size, size), 0, self.screen)
+            surface.fill(mapped)
+            self.color_surfaces[state] = surface
+
+    def _ensure_prepared(self, grid):
+        if (self.rect_grid is None or len(self.rect_grid) != len(grid)
+                or len(self.rect_grid[0]) != len(grid[0])):
+            self.prepare(len(grid[0]), len(grid))
+
+    def _blit_states(self, target, grid, states):
+        flat_rects = self.flat_rects
+        # One blits() call per state instead of one draw call per cell
+        for state in states:
+            indices = np.flatnonzero(grid == state).tolist()
+            if indices:
+                surface = self.color_surfaces[state]
+                target.blits([(surface, flat_rects[i]) for i in indices], doreturn=False)
+
+    def set_background(self, grid, static_states=(0, 1)):
+        """Pre-render the cells in static_states into a background that draw_grid blits first."""
+        self._ensure_prepared(grid)
+        self.background = pygame.Surface(self.screen.get_size(), 0, self.screen)
+        self._blit_states(self.background, np.asarray(grid), static_states)
+        self.static_states = static_states
 
     def draw_grid(self, grid):
-        for y in range(len(grid)):
-            for x in range(len(grid[y])):
-                color = self.colors[grid[y][x]]
-                pygame.draw.rect(self.screen, color, (x * self.grid_size, y * self.grid_size, self.grid_size, self.grid_size))
+        self._ensure_prepared(grid)
+        grid = np.asarray(grid)
+        if self.background is None:
+            self._blit_states(self.screen, grid, self.color_surfaces)
+        else:
+            # Static cells come from the background, only the fire states are drawn on top
+            self.screen.blit(self.background, (0, 0))
+            self._blit_states(self.screen, grid,
+                              [state for state in self.color_surfaces if state not in self.static_states])
+
+    def draw_cells(self, cells):
+        """Draw only the given (x, y, state) cells and return their dirty rects."""
+        surfaces = self.color_surfaces
+        rects = [self.rect_grid[y][x] for x, y, _ in cells]
+        self.screen.blits([(surfaces[cell[2]], rect) for cell, rect in zip(cells, rects)],
+                          doreturn=False)
+        return rects
 
     def update_display(self):
-        pygame.display.flip()
\ No newline at end of file
+        pygame.display.flip()
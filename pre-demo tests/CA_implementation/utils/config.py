@@ -2,6 +2,7 @@
 GRID_SIZE = 100  # Grid will be 100x100
 CELL_SIZE = 5    # Each cell will be 5x5 pixels
 FPS = 10         # Frames per second
+SIM_HZ = 10      # Simulation steps per second
 
 # Fire simulation parameters
 IGNITION_PROBABILITY = 0  # Probability of spontaneous ignition
@@ -12,11 +12,18 @@ import geopandas as gpd
 from pystac_client import Client
 from shapely.geometry import box, Point
 import stackstac
-import rioxarray
+import rasterio
+from rasterio.windows import from_bounds
 import matplotlib.pyplot as plt
-import numpy as np
 import xarray as xr
 
+# GDAL settings for range requests against Cloud-Optimized GeoTIFFs
+COG_ENV = {
+    'CPL_VSIL_CURL_ALLOWED_EXTENSIONS': '.tif',
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
+    'VSI_CACHE': 'TRUE',
+}
+
 def download_satellite_image(lat, lon, zoom=13, size=(512, 512), save_path='satellite_image.png'):
     # Use public Sentinel-2 WMS layer (from Sentinel Hub)
     tile_url = (
@@ -56,7 +63,7 @@ def visualize_on_map(lat, lon):
 def km_to_deg(km):
     return km / 111.0
 
-def get_worldcover_matrix(lat, lon, radius_km=1):
+def get_worldcover_matrix(lat, lon, radius_km=1, plot=False):
     # Convert to bounding box
     delta = km_to_deg(radius_km)
     min_lon = lon - delta
@@ -82,19 +89,16 @@ def get_worldcover_matrix(lat, lon, radius_km=1):
     signed_item = planetary_computer.sign(items[0])
     asset = signed_item.assets["map"]
 
-    # Load with rioxarray and clip
-    data = rioxarray.open_rasterio(asset.href, masked=True)
-    data = data.rio.write_crs("EPSG:4326")
-    clipped = data.rio.clip_box(*bbox)
-
-    # Convert to NumPy
-    matrix = clipped.squeeze().values.astype(np.uint8)
+    # Windowed read: only the COG blocks covering the bbox are fetched
+    with rasterio.Env(**COG_ENV), rasterio.open(asset.href) as src:
+        window = from_bounds(*bbox, transform=src.transform)
+        matrix = src.read(1, window=window, out_dtype='uint8')
 
-    # Plot
-    plt.imshow(matrix, cmap="tab20")
-    plt.title("ESA WorldCover Land Classification")
-    plt.colorbar()
-    plt.savefig("land_cover_matrix.png")
+    if plot:
+        plt.imshow(matrix, cmap="tab20")
+        plt.title("ESA WorldCover Land Classification")
+        plt.colorbar()
+        plt.savefig("land_cover_matrix.png")
 
     print("[✔] Matrix shape:", matrix.shape)
     return matrix
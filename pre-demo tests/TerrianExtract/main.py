@@ -12,7 +12,8 @@ import geopandas as gpd
 from pystac_client import Client
 from shapely.geometry import box, Point
 import stackstac
-import rioxarray
+import rasterio
+from rasterio.windows import from_bounds
 import matplotlib.pyplot as plt
 import numpy as np
 import xarray as xr
@@ -24,6 +25,13 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# GDAL settings for range requests against Cloud-Optimized GeoTIFFs
+COG_ENV = {
+    'CPL_VSIL_CURL_ALLOWED_EXTENSIONS': '.tif',
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
+    'VSI_CACHE': 'TRUE',
+}
+
 
 class TerrainExtractor:
     """
@@ -504,13 +512,10 @@ class TerrainExtractor:
             signed_item = planetary_computer.sign(items[0])
             asset = signed_item.assets["map"]
             
-            # Load with rioxarray and clip
-            data = rioxarray.open_rasterio(asset.href, masked=True)
-            data = data.rio.write_crs("EPSG:4326")
-            clipped = data.rio.clip_box(*bbox)
-            
-            # Convert to NumPy
-            matrix = clipped.squeeze().values.astype(np.uint8)
+            # Windowed read: only the COG blocks covering the bbox are fetched
+            with rasterio.Env(**COG_ENV), rasterio.open(asset.href) as src:
+                window = from_bounds(*bbox, transform=src.transform)
+                matrix = src.read(1, window=window, out_dtype='uint8')
             self.land_cover_matrix = matrix
             
             # Create and save plot if requested
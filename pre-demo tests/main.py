@@ -11,7 +11,6 @@ Author: AI Assistant
 Date: June 26, 2025
 """
 
-import pygame
 import numpy as np
 import sys
 import os
@@ -27,8 +26,7 @@ try:
     
     # Import CA implementation modules
     from CA_implementation.simulation.fire_model import FireModel
-    from CA_implementation.graphics.renderer import Renderer
-    from CA_implementation.utils.config import GRID_SIZE, CELL_SIZE, FPS
+    from CA_implementation.utils.config import GRID_SIZE, CELL_SIZE, FPS, SIM_HZ
     
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -40,6 +38,53 @@ except ImportError as e:
     print("  - CA-implementation/utils/config.py (configuration constants)")
     sys.exit(1)
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False)
+    def _convert(resized, out, rnd):
+        """Classify land cover into trees/empty in one pass, returning the tree count."""
+        tree_count = 0
+        for y in range(resized.shape[0]):
+            for x in range(resized.shape[1]):
+                land_cover_class = resized[y, x]
+                if (land_cover_class == 10 or land_cover_class == 95
+                        or (land_cover_class == 20 and rnd[y, x] < 0.5)):
+                    out[y, x] = 1
+                    tree_count += 1
+                else:
+                    out[y, x] = 0
+        return tree_count
+
+    @njit(cache=True, boundscheck=False)
+    def _add_random_trees(resized, out, rnd):
+        """Turn empty cells into trees with a 30% chance, returning how many were added."""
+        added = 0
+        for y in range(out.shape[0]):
+            for x in range(out.shape[1]):
+                if out[y, x] == 0:
+                    r = rnd[y, x]
+                    if resized[y, x] == 20:
+                        r = (r - 0.5) * 2.0
+                    if r < 0.3:
+                        out[y, x] = 1
+                        added += 1
+        return added
+
+    @njit(cache=True)
+    def _find_first_tree(grid):
+        """Return (x, y) of the first tree in row-major order, or (-1, -1)."""
+        for y in range(grid.shape[0]):
+            for x in range(grid.shape[1]):
+                if grid[y, x] == 1:
+                    return x, y
+        return -1, -1
+
 
 class ForestFireSimulation:
     """Main simulation class that integrates terrain extraction and fire simulation."""
@@ -48,12 +93,14 @@ class ForestFireSimulation:
         self.terrain_extractor = TerrainExtractor()
         self.fire_model = None
         self.renderer = None
+        self._pygame = None
         self.screen = None
         self.clock = None
         self.terrain_grid = None
         self.lat = None
         self.lon = None
         self.radius = None
+        self._rng = np.random.default_rng()
         
         # Color mapping for different cell states
         self.colors = {
@@ -149,40 +196,30 @@ class ForestFireSimulation:
         # Simple resize using numpy interpolation
         original_height, original_width = land_cover_matrix.shape
         
-        # Create indices for resampling
-        y_indices = np.linspace(0, original_height - 1, target_size).astype(int)
-        x_indices = np.linspace(0, original_width - 1, target_size).astype(int)
-        
-        # Resample the matrix
-        resized_matrix = land_cover_matrix[np.ix_(y_indices, x_indices)]
-        
-        # Convert to forest grid based on land cover classes
-        forest_grid = []
-        tree_count = 0
-        
-        for y in range(target_size):
-            row = []
-            for x in range(target_size):
-                land_cover_class = resized_matrix[y][x]
-                
-                # Map land cover classes to forest states
-                if land_cover_class == 10:  # Tree cover/Forest
-                    row.append(1)  # Tree
-                    tree_count += 1
-                elif land_cover_class == 20:  # Shrubland (50% chance of tree)
-                    if np.random.random() < 0.5:
-                        row.append(1)  # Tree
-                        tree_count += 1
-                    else:
-                        row.append(0)  # Empty
-                elif land_cover_class == 95:  # Mangroves
-                    row.append(1)  # Tree
-                    tree_count += 1
-                else:  # All other classes become empty
-                    row.append(0)  # Empty
+        sy, sx = original_height // target_size, original_width // target_size
+        if sy >= 1 and sx >= 1 and sy * target_size == original_height and sx * target_size == original_width:
+            # Evenly divisible: a strided view resamples without copying
+            resized_matrix = land_cover_matrix[::sy, ::sx]
+        else:
+            # Create indices for resampling
+            y_indices = np.linspace(0, original_height - 1, target_size).astype(int)
+            x_indices = np.linspace(0, original_width - 1, target_size).astype(int)
             
-            forest_grid.append(row)
+            # Resample the matrix
+            resized_matrix = land_cover_matrix[np.ix_(y_indices, x_indices)]
         
+        # One bulk float32 draw covers every shrubland cell
+        rnd = self._rng.random(resized_matrix.shape, dtype=np.float32)
+        if NUMBA_AVAILABLE:
+            forest_grid = np.empty(resized_matrix.shape, dtype=np.uint8)
+            tree_count = _convert(resized_matrix, forest_grid, rnd)
+        else:
+            # Forest and mangroves become trees, shrubland has a 50% chance of a tree
+            tree_mask = (resized_matrix == 10) | (resized_matrix == 95)
+            shrub = (resized_matrix == 20) & (rnd < 0.5)
+            forest_grid = (tree_mask | shrub).astype(np.uint8)
+            tree_count = int(forest_grid.sum())
+
         tree_percentage = (tree_count / (target_size * target_size)) * 100
         print(f"✅ Conversion complete!")
         print(f"   Trees: {tree_count}/{target_size*target_size} cells ({tree_percentage:.1f}%)")
@@ -190,12 +227,16 @@ class ForestFireSimulation:
         # If too few trees, add some randomly
         if tree_percentage < 5:
             print("⚠️  Very few trees detected. Adding random trees for better simulation...")
-            for y in range(target_size):
-                for x in range(target_size):
-                    if forest_grid[y][x] == 0 and np.random.random() < 0.3:
-                        forest_grid[y][x] = 1
-                        tree_count += 1
-            
+            # Reuse the same draw; rejected shrubland values are uniform on
+            # [0.5, 1) and are rescaled so the 30% chance stays unbiased
+            if NUMBA_AVAILABLE:
+                tree_count += _add_random_trees(resized_matrix, forest_grid, rnd)
+            else:
+                topup_rnd = np.where(resized_matrix == 20, (rnd - 0.5) * 2, rnd)
+                extra = (forest_grid == 0) & (topup_rnd < 0.3)
+                forest_grid |= extra.astype(np.uint8)
+                tree_count += int(extra.sum())
+
             new_percentage = (tree_count / (target_size * target_size)) * 100
             print(f"   Updated trees: {tree_count} ({new_percentage:.1f}%)")
         
@@ -206,8 +247,8 @@ class ForestFireSimulation:
         self.fire_model = FireModel(GRID_SIZE, GRID_SIZE)
         
         if terrain_grid is not None:
-            # Use terrain data
-            self.fire_model.grid = terrain_grid
+            # Use terrain data, copied so ignitions don't leak back into it
+            self.fire_model.grid = np.array(terrain_grid, dtype=np.uint8)
             print("✅ Fire model initialized with real terrain data")
         else:
             # Use default random forest
@@ -217,16 +258,29 @@ class ForestFireSimulation:
     
     def initialize_pygame(self):
         """Initialize pygame and create display."""
+        # Imported here so SDL only loads once the prompts are answered
+        import pygame
+        from CA_implementation.graphics.renderer import Renderer
+        
+        self._pygame = pygame
         pygame.init()
         
         # Create display
-        self.screen = pygame.display.set_mode((GRID_SIZE * CELL_SIZE, GRID_SIZE * CELL_SIZE))
+        size = (GRID_SIZE * CELL_SIZE, GRID_SIZE * CELL_SIZE)
+        try:
+            # GPU-backed, scalable window with tear-free flips
+            self.screen = pygame.display.set_mode(size, pygame.SCALED | pygame.DOUBLEBUF, vsync=1)
+        except pygame.error:
+            # vsync needs an accelerated renderer, which not every platform provides
+            self.screen = pygame.display.set_mode(size)
         title = f"Forest Fire Simulation - {self.lat:.4f}, {self.lon:.4f} ({self.radius}km)"
         pygame.display.set_caption(title)
+        self.screen.fill((0, 0, 0))  # Black background
         
         # Create clock and renderer
         self.clock = pygame.time.Clock()
         self.renderer = Renderer(self.screen, CELL_SIZE, self.colors)
+        self.renderer.prepare(GRID_SIZE, GRID_SIZE)
         
         print("✅ Pygame initialized")
     
@@ -235,18 +289,21 @@ class ForestFireSimulation:
         center_x, center_y = GRID_SIZE // 2, GRID_SIZE // 2
         
         # Try to start fire at center
-        if self.fire_model.grid[center_y][center_x] == 1:
+        if self.fire_model.grid[center_y, center_x] == 1:
             self.fire_model.ignite(center_x, center_y)
             print(f"🔥 Initial fire started at center ({center_x}, {center_y})")
             return True
         
         # Find the first tree and start fire there
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                if self.fire_model.grid[y][x] == 1:
-                    self.fire_model.ignite(x, y)
-                    print(f"🔥 Initial fire started at ({x}, {y})")
-                    return True
+        if NUMBA_AVAILABLE:
+            x, y = _find_first_tree(self.fire_model.grid)
+        else:
+            ys, xs = np.nonzero(self.fire_model.grid == 1)
+            x, y = (int(xs[0]), int(ys[0])) if ys.size else (-1, -1)
+        if x >= 0:
+            self.fire_model.ignite(x, y)
+            print(f"🔥 Initial fire started at ({x}, {y})")
+            return True
         
         print("❌ No trees found for initial fire!")
         return False
@@ -261,7 +318,7 @@ class ForestFireSimulation:
         print("⌨️  ESC key      : Exit simulation")
         print("⌨️  SPACE key    : Pause/unpause simulation")
         print("🖥️  Close window : Exit simulation")
-        print("⏰ Simulation runs automatically at", FPS, "FPS")
+        print("⏰ Simulation runs automatically at", SIM_HZ, "steps/s, rendered at", FPS, "FPS")
         print("=" * 50)
     
     def run_simulation(self):
@@ -282,7 +339,10 @@ class ForestFireSimulation:
         
         # Initialize simulation components
         self.initialize_pygame()
+        pygame = self._pygame
         self.create_fire_model_with_terrain(self.terrain_grid)
+        # Empty and tree cells only change by burning, so pre-render them once
+        self.renderer.set_background(self.fire_model.get_state())
         
         # Start initial fire
         if not self.start_initial_fire():
@@ -296,6 +356,11 @@ class ForestFireSimulation:
         # Simulation state
         running = True
         paused = False
+        # Cells to repaint this frame; None forces a full redraw
+        dirty = None
+        # Simulation steps at a fixed SIM_HZ regardless of the render rate
+        sim_step = 1.0 / SIM_HZ
+        sim_accum = 0.0
         
         print("\n🚀 Starting simulation...")
         
@@ -312,9 +377,12 @@ class ForestFireSimulation:
                     
                     elif event.key == pygame.K_r:
                         # Reset simulation
-                        self.create_fire_model_with_terrain(self.terrain_grid)
+                        self.fire_model.reset(self.terrain_grid)
+                        self.renderer.set_background(self.fire_model.get_state())
                         self.start_initial_fire()
                         paused = False
+                        dirty = None
+                        sim_accum = 0.0
                         print("🔄 Simulation reset")
                     
                     elif event.key == pygame.K_SPACE:
@@ -329,20 +397,35 @@ class ForestFireSimulation:
                     grid_x = mouse_x // CELL_SIZE
                     grid_y = mouse_y // CELL_SIZE
                     
-                    if (0 <= grid_x < GRID_SIZE and 0 <= grid_y < GRID_SIZE 
-                        and self.fire_model.grid[grid_y][grid_x] == 1):
+                    in_bounds = 0 <= grid_x < GRID_SIZE and 0 <= grid_y < GRID_SIZE
+                    if in_bounds and int(self.fire_model.grid[grid_y, grid_x]) == 1:
                         self.fire_model.ignite(grid_x, grid_y)
+                        if dirty is not None:
+                            dirty.append((grid_x, grid_y, 2))
                         print(f"🔥 Fire started at ({grid_x}, {grid_y})")
             
-            # Update simulation (if not paused)
+            # Update simulation (if not paused), catching up at most a few steps per frame
             if not paused:
-                self.fire_model.spread_fire()
+                steps = 0
+                while sim_accum >= sim_step and steps < 4:
+                    changes = self.fire_model.spread_fire()
+                    if dirty is not None:
+                        dirty.extend(changes)
+                    sim_accum -= sim_step
+                    steps += 1
+                sim_accum = min(sim_accum, sim_step)
             
-            # Render
-            self.screen.fill((0, 0, 0))  # Black background
-            self.renderer.draw_grid(self.fire_model.get_state())
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            # Render only the changed cells unless most of the grid changed
+            if dirty is None or len(dirty) > GRID_SIZE * GRID_SIZE // 4:
+                # draw_grid repaints every cell, so no clear is needed
+                self.renderer.draw_grid(self.fire_model.get_state())
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.renderer.draw_cells(dirty))
+            dirty = []
+            dt = self.clock.tick(FPS) / 1000.0
+            if not paused:
+                sim_accum += dt
         
         # Cleanup
         pygame.quit()